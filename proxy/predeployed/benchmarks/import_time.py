@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Measure import time of ima_predeployed.generator and enforce the budget
+
+Usage:
+    ./import_time.py [--budget-ms N] [--runs N]
+
+Every run imports the module in a fresh interpreter with `-X importtime`.
+The best cumulative time is compared with the budget.
+Heavy dependencies must not be imported together with the module.
+"""
+
+import argparse
+import subprocess
+import sys
+
+MODULE = 'ima_predeployed.generator'
+DEFAULT_BUDGET_MS = 50
+DEFAULT_RUNS = 5
+FORBIDDEN_MODULES = ['web3', 'predeployed_generator', 'pkg_resources']
+
+CHECK_MODULES = f'''
+import sys
+import {MODULE}
+loaded = [name for name in {FORBIDDEN_MODULES!r} if name in sys.modules]
+if loaded:
+    sys.exit('Imported together with {MODULE}: ' + ', '.join(loaded))
+'''
+
+
+def measure_import_time_us() -> int:
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHECK_MODULES],
+        check=True, capture_output=True, text=True)
+    for line in result.stderr.splitlines():
+        parts = [part.strip() for part in line.split('|')]
+        if len(parts) == 3 and parts[2] == MODULE:
+            return int(parts[1])
+    raise RuntimeError(f'Import time of {MODULE} is not reported')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=f'Check import time of {MODULE}')
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS)
+    args = parser.parse_args()
+
+    import_time_ms = min(measure_import_time_us() for _ in range(args.runs)) / 1000
+    print(f'{MODULE} import time: {import_time_ms:.1f} ms (budget {args.budget_ms} ms)')
+    if import_time_ms > args.budget_ms:
+        sys.exit(f'Import time of {MODULE} exceeds the budget')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""Benchmark ima_predeployed generators and compare results with the baselines
+
+Usage:
+    ./run_benchmarks.py [--threshold X] [--repeat N] [--filter TEXT] [--record] [--json path]
+
+Every case is measured without a node:
+    time_ms        best average time of one call out of `--repeat` batches
+    relative_time  time_ms divided by the time of a fixed reference workload
+                   which is measured in batches interleaved with the case
+    peak_kib       peak memory allocated during one call (tracemalloc)
+    allocations    memory blocks allocated by one call and alive at its end,
+                   the returned value included (tracemalloc snapshot)
+    keccak_calls   amount of keccak256 calculations with empty slots cache
+
+The run fails if keccak_calls exceed the baseline
+or relative_time, peak_kib or allocations exceed it more than by `--threshold` (a fraction).
+None of them depends on the machine speed.
+A case slower than its baseline is measured again before it is reported.
+time_ms depends on the machine the baselines were recorded on and is only printed.
+`--record` writes current results into baselines.json instead of comparing.
+"""
+
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from os.path import dirname, join
+from typing import Callable, Dict, List, Tuple
+
+from ima_predeployed import slots
+from ima_predeployed.generator import (
+    generate_abi, generate_contracts, generate_meta, get_abi,
+    _create_generators, _upgradeable_contracts  # pylint: disable=protected-access
+)
+from ima_predeployed.contracts import AccessControlEnumerableGenerator
+from ima_predeployed.storage import StorageBuilder
+from ima_predeployed.template import AllocationTemplate
+from ima_predeployed.constants import CHAIN_CONNECTOR_ROLE
+
+BASELINES_PATH = join(dirname(__file__), 'baselines.json')
+DEFAULT_THRESHOLD = 0.5
+DEFAULT_REPEAT = 5
+# differences below the timer noise are not reported as regressions
+MIN_TIME_DELTA_MS = 0.05
+# a case which is slower than its baseline is measured again up to this amount of times
+TIME_RETRIES = 2
+REFERENCE_SIZE = 1000
+# fast cases are called in batches to reduce the noise
+MIN_BATCH_TIME = 0.05
+MAX_BATCH_SIZE = 1 << 16
+
+OWNER_ADDRESS = '0xd2001DAb6898127Be2F167B548691C87251D13C3'
+SCHAIN_NAME = 'benchmark'
+CONTRACTS_ON_MAINNET = {
+    'deposit_box_eth_address': '0x' + '1' * 40,
+    'deposit_box_erc20_address': '0x' + '2' * 40,
+    'deposit_box_erc721_address': '0x' + '3' * 40,
+    'deposit_box_erc1155_address': '0x' + '4' * 40,
+    'linker_address': '0x' + '5' * 40,
+    'community_pool_address': '0x' + '6' * 40,
+    'deposit_box_erc721_with_metadata_address': '0x' + '7' * 40
+}
+ROLE_MEMBERS = [1, 100, 10000]
+STRINGS = {
+    'short': 'Ether',
+    'long': 'Lorem ipsum dolor sit amet ' * 160
+}
+
+
+def collect_cases() -> List[Tuple[str, Callable[[], object]]]:
+    cases: List[Tuple[str, Callable[[], object]]] = [
+        ('generate_contracts', lambda: generate_contracts(OWNER_ADDRESS, SCHAIN_NAME, CONTRACTS_ON_MAINNET)),
+        ('generate_abi', generate_abi),
+        ('get_abi[message_proxy_chain]', _bind(get_abi, 'message_proxy_chain')),
+        ('generate_meta', generate_meta)
+    ]
+
+    template = AllocationTemplate.compile()
+    cases.append(('render_template', _bind(template.render, OWNER_ADDRESS, SCHAIN_NAME, CONTRACTS_ON_MAINNET)))
+
+    generators = _create_generators()
+    for name, _, _, kwargs in _upgradeable_contracts(SCHAIN_NAME, CONTRACTS_ON_MAINNET):
+        implementation_generator = generators[name].implementation_generator
+        cases.append((
+            f'generate_storage[{name}]',
+            _bind(implementation_generator.generate_storage, deployer_address=OWNER_ADDRESS, **kwargs)))
+
+    roles_slots = AccessControlEnumerableGenerator.RolesSlots(roles=101, role_members=151)
+    for members in ROLE_MEMBERS:
+        accounts = [f'0x{index + 1:040x}' for index in range(members)]
+        cases.append((
+            f'setup_role[{members}]',
+            _bind(_setup_role, roles_slots, CHAIN_CONNECTOR_ROLE, accounts)))
+
+    for name, value in STRINGS.items():
+        cases.append((f'write_string[{name}]', _bind(_write_string, value)))
+    return cases
+
+
+def measure(function: Callable[[], object], repeat: int) -> Dict[str, float]:
+    function()  # warm up artifacts and shared storage
+
+    slots.cache_clear()
+    function()
+    keccak_calls = slots.cache_info().keccak_calls
+
+    slots.cache_clear()
+    tracemalloc.start()
+    result = function()
+    _, peak = tracemalloc.get_traced_memory()
+    allocations = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+    tracemalloc.stop()
+    del result
+
+    number = _batch_size(function)
+    reference_number = _batch_size(_reference)
+    best = reference_best = float('inf')
+    # batches of the case and of the reference are interleaved, so both see the same machine load
+    for _ in range(repeat):
+        best = min(best, _run(function, number) / number)
+        reference_best = min(reference_best, _run(_reference, reference_number) / reference_number)
+    return {
+        'time_ms': round(best * 1000, 3),
+        'relative_time': float(f'{best / reference_best:.3g}'),
+        'peak_kib': round(peak / 1024, 1),
+        'allocations': allocations,
+        'keccak_calls': keccak_calls
+    }
+
+
+def compare(name: str, result: Dict[str, float], baseline: Dict[str, float], threshold: float) -> List[str]:
+    """Return regressions of the metrics which do not depend on the machine speed"""
+    regressions = []
+    if 'keccak_calls' in baseline and result['keccak_calls'] > baseline['keccak_calls']:
+        regressions.append(
+            f'{name}: keccak_calls {result["keccak_calls"]} exceeds baseline {baseline["keccak_calls"]}')
+    for metric in ['peak_kib', 'allocations']:
+        if metric in baseline and result[metric] > baseline[metric] * (1 + threshold):
+            regressions.append(f'{name}: {metric} {result[metric]} exceeds baseline {baseline[metric]}')
+    return regressions
+
+
+def compare_time(name: str, result: Dict[str, float], baseline: Dict[str, float], threshold: float) -> List[str]:
+    """Return slowdown of the case relative to the reference workload"""
+    if 'relative_time' not in baseline or result['relative_time'] <= baseline['relative_time'] * (1 + threshold):
+        return []
+    # the reference time converts the difference into milliseconds of this machine
+    reference_ms = result['time_ms'] / result['relative_time']
+    if (result['relative_time'] - baseline['relative_time']) * reference_ms < MIN_TIME_DELTA_MS:
+        return []
+    return [f'{name}: relative_time {result["relative_time"]} exceeds baseline {baseline["relative_time"]}']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark ima_predeployed generators')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='allowed relative regression, 0.5 means 50%%')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--filter', default='', help='run only cases which names contain the text')
+    parser.add_argument('--record', action='store_true', help='save results as new baselines')
+    parser.add_argument('--json', help='path to save results')
+    args = parser.parse_args()
+
+    baselines = {}
+    try:
+        with open(BASELINES_PATH, encoding='utf-8') as baselines_file:
+            baselines = json.load(baselines_file)
+    except FileNotFoundError:
+        pass
+
+    results = {}
+    regressions = []
+    print(f'{"case":54} {"time, ms":>10} {"relative":>10} {"peak, KiB":>10} {"blocks":>8} {"keccak":>8}')
+    for name, function in collect_cases():
+        if args.filter not in name:
+            continue
+        result = measure(function, args.repeat)
+        if name in baselines and not args.record:
+            regressions.extend(compare(name, result, baselines[name], args.threshold))
+            slowdowns = compare_time(name, result, baselines[name], args.threshold)
+            for _ in range(TIME_RETRIES):
+                if not slowdowns:
+                    break
+                # a slowdown has to repeat, the noise of a shared machine does not
+                retry = measure(function, args.repeat)
+                if retry['relative_time'] < result['relative_time']:
+                    result.update(time_ms=retry['time_ms'], relative_time=retry['relative_time'])
+                slowdowns = compare_time(name, result, baselines[name], args.threshold)
+            regressions.extend(slowdowns)
+        results[name] = result
+        print(f'{name:54} {result["time_ms"]:>10} {result["relative_time"]:>10} {result["peak_kib"]:>10} '
+              f'{result["allocations"]:>8} {result["keccak_calls"]:>8}')
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as results_file:
+            json.dump(results, results_file, indent=4, sort_keys=True)
+    if args.record:
+        baselines.update(results)
+        with open(BASELINES_PATH, 'w', encoding='utf-8') as baselines_file:
+            json.dump(baselines, baselines_file, indent=4, sort_keys=True)
+            baselines_file.write('\n')
+        return
+    if regressions:
+        sys.exit('Performance regressions:\n' + '\n'.join(regressions))
+
+
+def _batch_size(function: Callable[[], object]) -> int:
+    number = 1
+    while _run(function, number) < MIN_BATCH_TIME and number < MAX_BATCH_SIZE:
+        number *= 2
+    return number
+
+
+def _reference() -> dict:
+    # slots and values written as predeployed_generator writes uint256 storage
+    return {hex(slot): hex(slot * slot) for slot in range(REFERENCE_SIZE)}
+
+
+def _run(function: Callable[[], object], number: int) -> float:
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for _ in range(number):
+            slots.cache_clear()
+            function()
+        return time.perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def _bind(function: Callable, *args, **kwargs) -> Callable[[], object]:
+    return lambda: function(*args, **kwargs)
+
+
+def _setup_role(roles_slots, role: bytes, accounts: List[str]) -> dict:
+    storage = StorageBuilder()
+    AccessControlEnumerableGenerator._setup_role(  # pylint: disable=protected-access
+        storage, roles_slots, role, accounts)
+    return storage.emit()
+
+
+def _write_string(value: str) -> dict:
+    storage = StorageBuilder()
+    AccessControlEnumerableGenerator._write_string(storage, 0, value)  # pylint: disable=protected-access
+    return storage.emit()
+
+
+if __name__ == '__main__':
+    main()
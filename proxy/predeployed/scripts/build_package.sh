@@ -5,5 +5,8 @@ SCRIPT_DIR=$( cd -- "$( dirname -- "${BASH_SOURCE[0]}" )" &> /dev/null && pwd )
 
 cd "$(dirname "$0")/.."
 ./scripts/generate_package_version.py > version.txt
-python3 $SCRIPT_DIR/prepare_artifacts.py
+python3 $SCRIPT_DIR/generate_constants.py
+PYTHONPATH=src python3 $SCRIPT_DIR/prepare_artifacts.py
+python3 $SCRIPT_DIR/generate_storage_layout.py
+PYTHONPATH=src python3 $SCRIPT_DIR/generate_abi_bundle.py
 python3 -m build
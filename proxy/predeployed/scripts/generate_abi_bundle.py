@@ -0,0 +1,14 @@
+#!/usr/bin/env python3
+"""Write ABIs of predeployed contracts into src/ima_predeployed/artifacts/abi.pack
+
+Usage:
+    ./generate_abi_bundle.py
+
+The artifacts have to be prepared by prepare_artifacts.py before running the script.
+"""
+
+from ima_predeployed.generator import write_abi_bundle
+
+
+if __name__ == '__main__':
+    write_abi_bundle()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Emit precomputed constants of ima_predeployed package as python literals
+
+Usage:
+    ./generate_constants.py [version]
+
+Writes role hashes into src/ima_predeployed/constants.py
+and the package version into src/ima_predeployed/_version.py
+"""
+
+import sys
+from os.path import normpath, join, dirname
+
+from eth_hash.auto import keccak
+
+pkg_path = normpath(join(dirname(__file__), '../src/ima_predeployed'))
+version_path = normpath(join(dirname(__file__), '../version.txt'))
+
+HASHED_STRINGS = [
+    ('CHAIN_CONNECTOR_ROLE', 'CHAIN_CONNECTOR_ROLE'),
+    ('EXTRA_CONTRACT_REGISTRAR_ROLE', 'EXTRA_CONTRACT_REGISTRAR_ROLE'),
+    ('CONSTANT_SETTER_ROLE', 'CONSTANT_SETTER_ROLE'),
+    ('AUTOMATIC_DEPLOY_ROLE', 'AUTOMATIC_DEPLOY_ROLE'),
+    ('TOKEN_REGISTRAR_ROLE', 'TOKEN_REGISTRAR_ROLE'),
+    ('REGISTRAR_ROLE', 'REGISTRAR_ROLE'),
+    ('MINTER_ROLE', 'MINTER_ROLE'),
+    ('BURNER_ROLE', 'BURNER_ROLE'),
+    ('MAINNET_HASH', 'Mainnet')
+]
+
+
+def generate_constants() -> str:
+    lines = [
+        '# This file is generated by scripts/generate_constants.py',
+        '# Do not edit it manually',
+        '',
+        "DEFAULT_ADMIN_ROLE = bytes(32)",
+        "ANY_SCHAIN = bytes(32)"
+    ]
+    for name, value in HASHED_STRINGS:
+        lines.append(f"{name} = bytes.fromhex('{keccak(value.encode()).hex()}')  # keccak256('{value}')")
+    return '\n'.join(lines) + '\n'
+
+
+def generate_version(version: str) -> str:
+    return '\n'.join([
+        '# This file is generated by scripts/generate_constants.py',
+        '# Do not edit it manually',
+        '',
+        f'VERSION = {version!r}'
+    ]) + '\n'
+
+
+def main():
+    if len(sys.argv) > 1:
+        version = sys.argv[1]
+    else:
+        with open(version_path, encoding='utf-8') as version_file:
+            version = version_file.readline().strip()
+    with open(join(pkg_path, 'constants.py'), 'w', encoding='utf-8') as constants_file:
+        constants_file.write(generate_constants())
+    with open(join(pkg_path, '_version.py'), 'w', encoding='utf-8') as version_file:
+        version_file.write(generate_version(version))
+
+
+if __name__ == '__main__':
+    main()
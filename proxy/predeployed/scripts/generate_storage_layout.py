@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Compile storage layouts of predeployed contracts into python literals
+
+Usage:
+    ./generate_storage_layout.py
+
+Reads storageLayout of every predeployed contract from the hardhat build info
+and writes src/ima_predeployed/storage_layout.py with:
+    <CONTRACT>          state variable name => slot
+    <CONTRACT>_OFFSETS  state variable name => offset inside the slot (only packed variables)
+    MAPPING_VALUE_SLOTS (mapping slot, constant key) => slot of the value
+    ARRAY_DATA_SLOTS    array slot => slot of the first element
+The contracts have to be compiled before running the script.
+"""
+
+import json
+from os.path import normpath, join, dirname
+from typing import Dict, Iterable, List, Tuple
+
+from eth_hash.auto import keccak
+
+from generate_constants import generate_constants
+
+pkg_path = normpath(join(dirname(__file__), '../src/ima_predeployed'))
+hardhat_contracts_path = normpath(join(dirname(__file__), '../../artifacts/contracts/schain'))
+
+CONTRACTS = [
+    ('', 'KeyStorage', 'KEY_STORAGE'),
+    ('', 'MessageProxyForSchain', 'MESSAGE_PROXY_FOR_SCHAIN'),
+    ('', 'TokenManager', 'TOKEN_MANAGER'),
+    ('', 'TokenManagerLinker', 'TOKEN_MANAGER_LINKER'),
+    ('', 'CommunityLocker', 'COMMUNITY_LOCKER'),
+    ('TokenManagers', 'TokenManagerERC20', 'TOKEN_MANAGER_ERC20'),
+    ('TokenManagers', 'TokenManagerERC721', 'TOKEN_MANAGER_ERC721'),
+    ('TokenManagers', 'TokenManagerERC721WithMetadata', 'TOKEN_MANAGER_ERC721_WITH_METADATA'),
+    ('TokenManagers', 'TokenManagerERC1155', 'TOKEN_MANAGER_ERC1155'),
+    ('TokenManagers', 'TokenManagerEth', 'TOKEN_MANAGER_ETH'),
+    ('tokens', 'EthErc20', 'ETH_ERC20')
+]
+
+# keys of mappings which are known before generation
+ROLES = [
+    'DEFAULT_ADMIN_ROLE', 'CHAIN_CONNECTOR_ROLE', 'EXTRA_CONTRACT_REGISTRAR_ROLE', 'CONSTANT_SETTER_ROLE',
+    'AUTOMATIC_DEPLOY_ROLE', 'TOKEN_REGISTRAR_ROLE', 'REGISTRAR_ROLE', 'MINTER_ROLE', 'BURNER_ROLE'
+]
+MAPPING_KEYS = [
+    ('_roles', ROLES),
+    ('_roleMembers', ROLES),
+    ('connectedChains', ['MAINNET_HASH']),
+    ('_registryContracts', ['ANY_SCHAIN']),
+    ('timeLimitPerMessage', ['MAINNET_HASH'])
+]
+# mapping values which contain dynamic arrays in the first slot
+ARRAY_MAPPINGS = ['_roleMembers', '_registryContracts']
+
+
+def load_storage_layout(hardhat_path: str, contract_name: str) -> dict:
+    with open(join(hardhat_path, f'{contract_name}.sol', f'{contract_name}.json'), encoding='utf-8') as artifact_file:
+        source_name = json.load(artifact_file)['sourceName']
+    debug_path = join(hardhat_path, f'{contract_name}.sol', f'{contract_name}.dbg.json')
+    with open(debug_path, encoding='utf-8') as debug_file:
+        build_info_path = normpath(join(dirname(debug_path), json.load(debug_file)['buildInfo']))
+    with open(build_info_path, encoding='utf-8') as build_info_file:
+        build_info = json.load(build_info_file)
+    return build_info['output']['contracts'][source_name][contract_name]['storageLayout']
+
+
+def compile_layout(storage_layout: dict) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """Return slots and offsets of named state variables"""
+    layout: Dict[str, int] = {}
+    offsets: Dict[str, int] = {}
+    for variable in storage_layout['storage']:
+        label = variable['label']
+        if label == '__gap':
+            continue
+        if label in layout:
+            raise ValueError(f'{label} is declared in several contracts')
+        layout[label] = int(variable['slot'])
+        if variable['offset']:
+            offsets[label] = variable['offset']
+    return layout, offsets
+
+
+def generate_storage_layout(layouts: Iterable[Tuple[str, Dict[str, int], Dict[str, int]]]) -> str:
+    constants: Dict[str, bytes] = {}
+    exec(generate_constants(), constants)  # pylint: disable=exec-used
+
+    lines = [
+        '# This file is generated by scripts/generate_storage_layout.py',
+        '# Do not edit it manually',
+        '',
+        'from . import constants',
+        '',
+        ''
+    ]
+    mapping_slots = set()
+    for name, layout, offsets in layouts:
+        lines.extend(_dict_literal(name, [(repr(label), str(slot)) for label, slot in layout.items()]))
+        lines.extend(_dict_literal(f'{name}_OFFSETS', [(repr(label), str(offset)) for label, offset in offsets.items()]))
+        for label, keys in MAPPING_KEYS:
+            if label in layout:
+                mapping_slots.update((label, layout[label], key) for key in keys)
+
+    mapping_values: List[Tuple[str, str]] = []
+    array_values: List[Tuple[str, str]] = []
+    for label, slot, key in sorted(mapping_slots, key=lambda item: (item[1], item[2])):
+        value_slot = _hash_to_int(constants[key] + slot.to_bytes(32, 'big'))
+        mapping_values.append((f'({slot}, constants.{key})', f'{value_slot:#x}'))
+        if label in ARRAY_MAPPINGS:
+            array_values.append((f'{value_slot:#x}', f'{_hash_to_int(value_slot.to_bytes(32, "big")):#x}'))
+
+    lines.extend(_dict_literal('MAPPING_VALUE_SLOTS', mapping_values))
+    lines.extend(_dict_literal('ARRAY_DATA_SLOTS', array_values))
+    return '\n'.join(lines[:-1]) + '\n'
+
+
+def main():
+    layouts = []
+    for directory, contract_name, name in CONTRACTS:
+        layout, offsets = compile_layout(
+            load_storage_layout(join(hardhat_contracts_path, directory), contract_name))
+        layouts.append((name, layout, offsets))
+    with open(join(pkg_path, 'storage_layout.py'), 'w', encoding='utf-8') as layout_file:
+        layout_file.write(generate_storage_layout(layouts))
+
+
+# private
+
+def _hash_to_int(data: bytes) -> int:
+    return int.from_bytes(keccak(data), 'big')
+
+
+def _dict_literal(name: str, items: List[Tuple[str, str]]) -> List[str]:
+    if not items:
+        return [f'{name}: dict = {{}}', '']
+    return [f'{name} = {{'] + [f'    {key}: {value},' for key, value in items[:-1]] + \
+        [f'    {items[-1][0]}: {items[-1][1]}', '}', '']
+
+
+if __name__ == '__main__':
+    main()
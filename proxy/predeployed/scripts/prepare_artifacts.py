@@ -1,6 +1,8 @@
 from os.path import normpath, join, dirname
 from predeployed_generator.tools import ArtifactsHandler
 
+from ima_predeployed.artifact_registry import write_artifact_pack
+
 pkg_name = 'ima_predeployed'
 package_artifacts_path = normpath(join(dirname(__file__), f'../src/{pkg_name}/artifacts'))
 hardhat_contracts_path = normpath(join(dirname(__file__), '../../artifacts/contracts/schain'))
@@ -29,6 +31,8 @@ def prepare():
     tokens_handler.prepare_artifacts('ERC721OnChain')
     tokens_handler.prepare_artifacts('ERC1155OnChain')
 
+    write_artifact_pack(package_artifacts_path)
+
 
 if __name__ == '__main__':
     prepare()
\ No newline at end of file
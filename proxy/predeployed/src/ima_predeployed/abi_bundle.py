@@ -0,0 +1,90 @@
+"""abi_bundle.py
+
+Prebuilt bundle of ABIs of predeployed contracts.
+
+The bundle is a pack (see pack.py) written at package build time
+by scripts/generate_abi_bundle.py. Every ABI is a separate compact JSON entry,
+so reading the ABI of one contract does not decode the others.
+The bundle is ignored if it was built for another version of the package.
+
+Functions:
+    load_abi
+    write_abi_bundle
+    close
+"""
+
+import json
+from os.path import join, dirname, isfile
+from threading import Lock
+from typing import Dict, Optional
+
+from .pack import PackError, PackReader, write_pack
+from .version import get_version
+
+ABI_BUNDLE_PATH = join(dirname(__file__), 'artifacts', 'abi.pack')
+
+
+def load_abi(name: str, path: str = ABI_BUNDLE_PATH) -> Optional[list]:
+    """Return ABI from the bundle or None if the bundle does not contain it.
+
+    Every call decodes a new list, so callers may modify it
+    """
+    bundle = _open_bundle(path)
+    if bundle is None or name not in bundle:
+        return None
+    return _decode_abi(path, name)
+
+
+def write_abi_bundle(abis: Dict[str, list], path: str = ABI_BUNDLE_PATH) -> None:
+    """Write ABIs into the bundle"""
+    write_pack(
+        path,
+        ((name, json.dumps(abi, separators=(',', ':')).encode()) for name, abi in abis.items()),
+        {'version': get_version()})
+    close()
+
+
+def close() -> None:
+    """Unmap opened bundles"""
+    with _lock:
+        for bundle in _bundles.values():
+            if bundle is not None:
+                bundle.close()
+        _bundles.clear()
+
+
+# private
+
+_bundles: Dict[str, Optional[PackReader]] = {}
+_lock = Lock()
+
+
+def _open_bundle(path: str) -> Optional[PackReader]:
+    if path not in _bundles:
+        with _lock:
+            if path not in _bundles:
+                _bundles[path] = _read_bundle(path)
+    return _bundles[path]
+
+
+def _read_bundle(path: str) -> Optional[PackReader]:
+    if not isfile(path):
+        return None
+    try:
+        bundle = PackReader(path)
+    except PackError:
+        return None
+    if bundle.meta.get('version') != get_version():
+        bundle.close()
+        return None
+    return bundle
+
+
+def _decode_abi(path: str, name: str) -> Optional[list]:
+    # the bundle is read under the lock, so close() does not unmap it meanwhile
+    with _lock:
+        if path not in _bundles:
+            # closed after load_abi found the name
+            _bundles[path] = _read_bundle(path)
+        bundle = _bundles[path]
+        return None if bundle is None or name not in bundle else bundle.read_json(name)
@@ -0,0 +1,82 @@
+"""allocation_cache.py
+
+On-disk content addressed cache of contract allocations.
+
+Allocation of every contract is stored in a separate file
+which name is sha256 of everything the allocation depends on:
+generator classes, content of the artifacts, package version
+and arguments of generate_allocation.
+Changing any input only invalidates allocations which depend on it.
+
+Classes:
+    AllocationCache
+"""
+
+import hashlib
+import json
+import os
+from os.path import join
+from tempfile import NamedTemporaryFile
+from typing import List, Optional
+
+from .version import get_version
+
+CACHE_FORMAT_VERSION = 1
+
+
+class AllocationCache:
+    """Cache of contract allocations stored in the directory.
+
+    `recomputed` contains names of contracts
+    which were generated instead of being loaded during the last generate_contracts call.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.recomputed: List[str] = []
+
+    def get_allocation(self, name: str, generator, **kwargs) -> dict:
+        """Load allocation from the cache or generate and store it"""
+        key = self.calculate_key(generator, kwargs)
+        allocation = self._load(key)
+        if allocation is None:
+            allocation = generator.generate_allocation(**kwargs)
+            self._store(key, allocation)
+            self.recomputed.append(name)
+        return allocation
+
+    @staticmethod
+    def calculate_key(generator, kwargs: dict) -> str:
+        """Return hash of all inputs of generator.generate_allocation(**kwargs)"""
+        key = hashlib.sha256()
+        key.update(f'{CACHE_FORMAT_VERSION}:{get_version()}'.encode())
+        implementation_generator = getattr(generator, 'implementation_generator', None)
+        for contract_generator in [generator, implementation_generator]:
+            if contract_generator is None:
+                continue
+            generator_class = type(contract_generator)
+            key.update(f':{generator_class.__module__}.{generator_class.__qualname__}'.encode())
+            key.update(f':{contract_generator.artifact.digest}'.encode())
+        key.update(b':' + json.dumps(kwargs, sort_keys=True).encode())
+        return key.hexdigest()
+
+    # private
+
+    def _filename(self, key: str) -> str:
+        return join(self.path, key[:2], key + '.json')
+
+    def _load(self, key: str) -> Optional[dict]:
+        try:
+            with open(self._filename(key), encoding='utf-8') as allocation_file:
+                return json.load(allocation_file)
+        except (OSError, ValueError):
+            return None
+
+    def _store(self, key: str, allocation: dict) -> None:
+        filename = self._filename(key)
+        directory = os.path.dirname(filename)
+        os.makedirs(directory, exist_ok=True)
+        # concurrent writers never expose partially written files
+        with NamedTemporaryFile('w', encoding='utf-8', dir=directory, suffix='.tmp', delete=False) as tmp_file:
+            json.dump(allocation, tmp_file)
+        os.replace(tmp_file.name, filename)
@@ -0,0 +1,267 @@
+"""artifact_registry.py
+
+Process wide registry of smart contracts artifacts.
+Every artifact is read and parsed at most once per process
+and all generators share the same bytecode, ABI and meta objects.
+
+If the artifacts directory contains artifacts.pack written by scripts/prepare_artifacts.py
+artifacts are read from it instead of separate JSON files.
+The pack is memory mapped and bytecode, ABI and meta of every contract are separate entries,
+so ABI and meta are decoded only when they are requested.
+
+Functions:
+    get_artifact
+    get_openzeppelin_artifact
+    write_artifact_pack
+    warm
+    clear
+    load_time
+
+Classes:
+    Artifact
+"""
+
+import hashlib
+import json
+import time
+from os import listdir
+from os.path import join, dirname, isfile
+from threading import Lock
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .pack import PackReader, write_pack
+
+ARTIFACTS_DIR = join(dirname(__file__), 'artifacts')
+ARTIFACT_SUFFIX = '.json'
+META_SUFFIX = '.meta.json'
+PACK_FILENAME = 'artifacts.pack'
+OPENZEPPELIN_ARTIFACTS = [
+    ('TransparentUpgradeableProxy.json', 'TransparentUpgradeableProxy.meta.json'),
+    ('ProxyAdmin.json', 'ProxyAdmin.meta.json')
+]
+
+
+class Artifact:
+    """Parsed hardhat artifact. The objects are shared and must not be modified.
+
+    `digest` is sha256 of the artifact and meta files content.
+    `abi` and `meta` are decoded on the first access
+    """
+
+    def __init__(
+            self,
+            bytecode: str,
+            digest: str,
+            load_abi: Callable[[], list],
+            load_meta: Callable[[], Optional[dict]]):
+        self.bytecode = bytecode
+        self.digest = digest
+        self._load_abi: Optional[Callable[[], list]] = load_abi
+        self._load_meta: Optional[Callable[[], Optional[dict]]] = load_meta
+        self._abi: Optional[list] = None
+        self._meta: Optional[dict] = None
+
+    @property
+    def abi(self) -> list:
+        if self._load_abi is not None:
+            with _lock:
+                if self._load_abi is not None:
+                    self._abi = _timed(self._load_abi)
+                    self._load_abi = None
+        return self._abi
+
+    @property
+    def meta(self) -> Optional[dict]:
+        if self._load_meta is not None:
+            with _lock:
+                if self._load_meta is not None:
+                    self._meta = _timed(self._load_meta)
+                    self._load_meta = None
+        return self._meta
+
+
+_artifacts: Dict[Tuple[str, str, Optional[str]], Artifact] = {}
+_packs: Dict[str, Optional[PackReader]] = {}
+_lock = Lock()
+# seconds spent reading and decoding artifacts, changed under the lock
+_load_seconds = 0.0
+
+
+def get_artifact(artifact_filename: str, meta_filename: Optional[str] = None,
+                 artifacts_dir: str = ARTIFACTS_DIR) -> Artifact:
+    """Return artifact from the registry loading it on the first request"""
+    key = (artifacts_dir, artifact_filename, meta_filename)
+    artifact = _artifacts.get(key)
+    if artifact is None:
+        with _lock:
+            artifact = _artifacts.get(key)
+            if artifact is None:
+                artifact = _timed(lambda: _read_artifact(artifacts_dir, artifact_filename, meta_filename))
+                _artifacts[key] = artifact
+    return artifact
+
+
+def get_openzeppelin_artifact(artifact_filename: str, meta_filename: Optional[str] = None) -> Artifact:
+    """Return artifact shipped with predeployed_generator openzeppelin contracts"""
+    return get_artifact(artifact_filename, meta_filename, _openzeppelin_artifacts_dir())
+
+
+def write_artifact_pack(artifacts_dir: str = ARTIFACTS_DIR) -> None:
+    """Pack all artifacts of the directory into PACK_FILENAME.
+
+    Entries are named `<contract>:<field>` where field is
+    bytecode, abi, meta, digest or meta_digest (digest of the artifact and meta files)
+    """
+    def entries() -> Iterator[Tuple[str, bytes]]:
+        for artifact_filename, meta_filename in _list_artifacts(artifacts_dir):
+            contract = artifact_filename[:-len(ARTIFACT_SUFFIX)]
+            with open(join(artifacts_dir, artifact_filename), 'rb') as artifact_file:
+                content = artifact_file.read()
+            digest = hashlib.sha256(content)
+            artifact = json.loads(content)
+            yield f'{contract}:bytecode', artifact['deployedBytecode'].encode()
+            yield f'{contract}:abi', _to_json(artifact['abi'])
+            yield f'{contract}:digest', digest.hexdigest().encode()
+            if meta_filename is not None:
+                with open(join(artifacts_dir, meta_filename), 'rb') as meta_file:
+                    content = meta_file.read()
+                digest.update(content)
+                yield f'{contract}:meta', _to_json(json.loads(content))
+                yield f'{contract}:meta_digest', digest.hexdigest().encode()
+
+    write_pack(join(artifacts_dir, PACK_FILENAME), entries())
+    clear()
+
+
+def warm() -> None:
+    """Load and decode all artifacts of the package into the registry"""
+    artifacts = [
+        get_artifact(artifact_filename, meta_filename)
+        for artifact_filename, meta_filename in _list_artifacts(ARTIFACTS_DIR)
+    ] + [
+        get_openzeppelin_artifact(artifact_filename, meta_filename)
+        for artifact_filename, meta_filename in OPENZEPPELIN_ARTIFACTS
+    ]
+    for artifact in artifacts:
+        _ = artifact.abi, artifact.meta
+
+
+def clear() -> None:
+    """Drop all loaded artifacts and unmap packs to release memory.
+
+    Artifacts which were returned before still decode ABI and meta on the first access,
+    the pack is mapped again for them
+    """
+    with _lock:
+        _artifacts.clear()
+        for pack in _packs.values():
+            if pack is not None:
+                pack.close()
+        _packs.clear()
+
+
+def load_time() -> float:
+    """Return seconds spent reading and decoding artifacts in this process"""
+    return _load_seconds
+
+
+# private
+
+def _timed(load: Callable[[], Any]) -> Any:
+    # called under the lock
+    global _load_seconds  # pylint: disable=global-statement
+    start = time.perf_counter()
+    try:
+        return load()
+    finally:
+        _load_seconds += time.perf_counter() - start
+
+
+def _read_artifact(artifacts_dir: str, artifact_filename: str, meta_filename: Optional[str]) -> Artifact:
+    # called under the lock
+    pack = _get_pack(artifacts_dir)
+    if pack is not None and _pack_contains(pack, artifact_filename, meta_filename):
+        return _unpack_artifact(artifacts_dir, pack, artifact_filename, meta_filename)
+    return _load_artifact(artifacts_dir, artifact_filename, meta_filename)
+
+
+def _list_artifacts(artifacts_dir: str) -> List[Tuple[str, Optional[str]]]:
+    artifacts = []
+    for filename in sorted(listdir(artifacts_dir)):
+        if not filename.endswith(ARTIFACT_SUFFIX) or filename.endswith(META_SUFFIX):
+            continue
+        meta_filename: Optional[str] = filename[:-len(ARTIFACT_SUFFIX)] + META_SUFFIX
+        if not isfile(join(artifacts_dir, meta_filename)):
+            meta_filename = None
+        artifacts.append((filename, meta_filename))
+    return artifacts
+
+
+def _get_pack(artifacts_dir: str) -> Optional[PackReader]:
+    # called under the lock
+    if artifacts_dir not in _packs:
+        path = join(artifacts_dir, PACK_FILENAME)
+        _packs[artifacts_dir] = PackReader(path) if isfile(path) else None
+    return _packs[artifacts_dir]
+
+
+def _pack_contains(pack: PackReader, artifact_filename: str, meta_filename: Optional[str]) -> bool:
+    if not artifact_filename.endswith(ARTIFACT_SUFFIX):
+        return False
+    contract = artifact_filename[:-len(ARTIFACT_SUFFIX)]
+    if meta_filename is None:
+        return f'{contract}:bytecode' in pack
+    return meta_filename == contract + META_SUFFIX and f'{contract}:meta' in pack
+
+
+def _unpack_artifact(
+        artifacts_dir: str,
+        pack: PackReader,
+        artifact_filename: str,
+        meta_filename: Optional[str]) -> Artifact:
+    contract = artifact_filename[:-len(ARTIFACT_SUFFIX)]
+    digest_field = 'digest' if meta_filename is None else 'meta_digest'
+    return Artifact(
+        pack.read(f'{contract}:bytecode').decode(),
+        pack.read(f'{contract}:{digest_field}').decode(),
+        lambda: _read_pack_json(artifacts_dir, contract, 'abi'),
+        (lambda: None) if meta_filename is None else lambda: _read_pack_json(artifacts_dir, contract, 'meta'))
+
+
+def _read_pack_json(artifacts_dir: str, contract: str, field: str) -> Any:
+    # called under the lock, the pack is looked up again because clear() closes it
+    pack = _get_pack(artifacts_dir)
+    if pack is not None and f'{contract}:{field}' in pack:
+        return pack.read_json(f'{contract}:{field}')
+    # the pack was removed or rewritten without the contract after clear()
+    if field == 'abi':
+        with open(join(artifacts_dir, contract + ARTIFACT_SUFFIX), 'rb') as artifact_file:
+            return json.load(artifact_file)['abi']
+    with open(join(artifacts_dir, contract + META_SUFFIX), 'rb') as meta_file:
+        return json.load(meta_file)
+
+
+def _load_artifact(artifacts_dir: str, artifact_filename: str,
+                   meta_filename: Optional[str]) -> Artifact:
+    digest = hashlib.sha256()
+    with open(join(artifacts_dir, artifact_filename), 'rb') as artifact_file:
+        content = artifact_file.read()
+    digest.update(content)
+    contract = json.loads(content)
+    meta = None
+    if meta_filename:
+        with open(join(artifacts_dir, meta_filename), 'rb') as meta_file:
+            content = meta_file.read()
+        digest.update(content)
+        meta = json.loads(content)
+    return Artifact(contract['deployedBytecode'], digest.hexdigest(), lambda: contract['abi'], lambda: meta)
+
+
+def _to_json(value) -> bytes:
+    return json.dumps(value, separators=(',', ':')).encode()
+
+
+def _openzeppelin_artifacts_dir() -> str:
+    # pylint: disable=import-outside-toplevel
+    from predeployed_generator import openzeppelin
+    return join(dirname(openzeppelin.__file__), 'artifacts')
@@ -0,0 +1,186 @@
+"""bundle.py
+
+Deduplicated bundle of allocations of many schains.
+
+Allocations of different schains share most of their content:
+bytecode of every contract and big parts of the storage
+(roles of predeployed contracts, constants, hashes of contract names).
+The bundle is a pack (see pack.py) where every distinct blob is stored once:
+    blob:<sha256>     code of a contract or a fragment of a storage as compact JSON object
+    schain:<name>     compact JSON list of accounts of the schain:
+                      [[address, [[field, kind, payload], ...]], ...]
+where kind is one of
+    value      payload is the value of the field as is
+    code       payload is the hash of the code blob
+    storage    payload is the list of hashes of storage fragments
+
+Storage is split into runs of slots which are equal in allocations of every schain
+and runs of schain specific slots, so shared runs are stored once per bundle.
+The split only affects the size of the bundle:
+BundleReader always restores exactly the allocation that was added, order of keys included.
+
+Classes:
+    BundleWriter
+    BundleReader
+"""
+
+import hashlib
+import json
+from typing import Dict, List, Optional
+
+from .pack import PackReader, write_pack
+
+FORMAT_VERSION = 1
+_BLOB_PREFIX = 'blob:'
+_SCHAIN_PREFIX = 'schain:'
+_VALUE = 'value'
+_CODE = 'code'
+_STORAGE = 'storage'
+
+Storage = Dict[str, str]
+
+
+class BundleWriter:
+    """Collects allocations of schains and writes them into a bundle file"""
+
+    def __init__(self, reference: Optional[Dict[str, Storage]] = None):
+        """Create a writer.
+
+        reference maps lowercase address to storage items
+        which are expected to be equal for every schain.
+        By default it is computed from allocations of two synthetic schains
+        """
+        self._reference = reference
+        self._blobs: Dict[str, bytes] = {}
+        self._code_hashes: Dict[str, str] = {}
+        self._schains: Dict[str, bytes] = {}
+
+    def __len__(self) -> int:
+        """Return amount of added schains"""
+        return len(self._schains)
+
+    def add(self, schain_name: str, allocations: dict) -> None:
+        """Add allocations of the schain"""
+        if schain_name in self._schains:
+            raise ValueError(f'{schain_name} is already added to the bundle')
+        if self._reference is None:
+            self._reference = _schain_independent_storage()
+        accounts = []
+        for address, account in allocations.items():
+            fields = []
+            for field, value in account.items():
+                if field == 'code':
+                    fields.append([field, _CODE, self._add_code(value)])
+                elif field == 'storage':
+                    fields.append([field, _STORAGE, self._add_storage(value, self._reference.get(address.lower()))])
+                else:
+                    fields.append([field, _VALUE, value])
+            accounts.append([address, fields])
+        self._schains[schain_name] = _to_json(accounts)
+
+    def write(self, path: str) -> None:
+        """Write the bundle file"""
+        entries = [(_BLOB_PREFIX + digest, blob) for digest, blob in self._blobs.items()]
+        entries.extend((_SCHAIN_PREFIX + name, content) for name, content in self._schains.items())
+        write_pack(path, entries, {'format': FORMAT_VERSION})
+
+    # private
+
+    def _add_blob(self, blob: bytes) -> str:
+        digest = hashlib.sha256(blob).hexdigest()
+        self._blobs.setdefault(digest, blob)
+        return digest
+
+    def _add_code(self, code: str) -> str:
+        # the same code string is added for every schain, so it is hashed once
+        digest = self._code_hashes.get(code)
+        if digest is None:
+            digest = self._code_hashes[code] = self._add_blob(code.encode())
+        return digest
+
+    def _add_storage(self, storage: Storage, reference: Optional[Storage]) -> List[str]:
+        reference = reference or {}
+        fragments = []
+        run: Storage = {}
+        run_is_shared = None
+        for slot, value in storage.items():
+            is_shared = reference.get(slot) == value
+            if is_shared is not run_is_shared and run:
+                fragments.append(self._add_blob(_to_json(run)))
+                run = {}
+            run_is_shared = is_shared
+            run[slot] = value
+        if run:
+            fragments.append(self._add_blob(_to_json(run)))
+        return fragments
+
+
+class BundleReader:
+    """Restores allocations of schains from a bundle file"""
+
+    def __init__(self, path: str):
+        self._pack = PackReader(path)
+        if self._pack.meta.get('format') != FORMAT_VERSION:
+            self._pack.close()
+            raise ValueError(f'{path} is not a bundle of allocations')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __contains__(self, schain_name: str) -> bool:
+        return _SCHAIN_PREFIX + schain_name in self._pack
+
+    def schain_names(self) -> List[str]:
+        """Return names of schains in the order they were added"""
+        return [name[len(_SCHAIN_PREFIX):] for name in self._pack if name.startswith(_SCHAIN_PREFIX)]
+
+    def read_allocations(self, schain_name: str) -> dict:
+        """Return allocations of the schain. Raises KeyError if there is no such schain"""
+        allocations = {}
+        for address, fields in self._pack.read_json(_SCHAIN_PREFIX + schain_name):
+            account = allocations[address] = {}
+            for field, kind, payload in fields:
+                if kind == _CODE:
+                    account[field] = self._pack.read(_BLOB_PREFIX + payload).decode()
+                elif kind == _STORAGE:
+                    storage: Storage = {}
+                    for digest in payload:
+                        storage.update(self._pack.read_json(_BLOB_PREFIX + digest))
+                    account[field] = storage
+                else:
+                    account[field] = payload
+        return allocations
+
+    def close(self) -> None:
+        self._pack.close()
+
+
+# private
+
+def _to_json(value) -> bytes:
+    return json.dumps(value, separators=(',', ':')).encode()
+
+
+def _schain_independent_storage() -> Dict[str, Storage]:
+    """Return storage items which are equal in allocations of two unrelated schains"""
+    # pylint: disable=import-outside-toplevel
+    from .config import MAINNET_CONTRACT_KEYS, schain_config_to_arguments
+    from .generator import generate_contracts
+    first, second = (
+        generate_contracts(**schain_config_to_arguments({
+            'schain_name': f'reference-schain-{seed}',
+            'schain_owner': f'0x{seed:040x}',
+            **{key: f'0x{seed + index + 1:040x}' for index, key in enumerate(MAINNET_CONTRACT_KEYS)}
+        }))
+        for seed in (0x1000, 0x2000))
+    second_storages = {address.lower(): account.get('storage', {}) for address, account in second.items()}
+    reference = {}
+    for address, account in first.items():
+        other = second_storages.get(address.lower(), {})
+        reference[address.lower()] = {
+            slot: value for slot, value in account.get('storage', {}).items() if other.get(slot) == value
+        }
+    return reference
@@ -0,0 +1,203 @@
+"""cli.py
+
+ima-predeployed console command.
+
+Reads schain configs as JSON lines and writes allocations of IMA predeployed contracts
+as JSON lines in the same order: line N of the output is generated from config N.
+Every config has the same keys as test/config.json.
+Configs are read and allocations are written one by one,
+so memory does not depend on the amount of schains.
+With --bundle allocations are written into a deduplicated bundle (see bundle.py) instead.
+With --profile figures of generated contracts (see profiling.py) are written as JSON.
+With --template schains without optional keys (see config.py) are rendered
+from a compiled template (see template.py) instead of running the generators.
+
+Usage:
+    ima-predeployed [configs.jsonl] [-o allocations.jsonl] [-w workers] [--progress] [--profile profile.json]
+                    [--template]
+    ima-predeployed [configs.jsonl] --bundle allocations.pack [-w workers] [--progress] [--profile profile.json]
+
+Functions:
+    read_configs
+    generate_allocations
+    generate_bundle
+    main
+"""
+
+import json
+import sys
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Optional, TextIO, Union
+
+from .config import schain_config_to_arguments
+
+if TYPE_CHECKING:
+    from .profiling import GenerationStats
+    from .template import AllocationTemplate
+
+# allocations as a dictionary or as compact JSON text rendered from a template
+Allocations = Union[dict, str]
+
+PROGRESS_INTERVAL_SEC = 1.0
+
+
+def read_configs(stream: TextIO) -> Iterator[dict]:
+    """Yield arguments of generate_contracts for every non empty line of the stream"""
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield schain_config_to_arguments(json.loads(line))
+        except (ValueError, KeyError, TypeError) as error:
+            raise ValueError(f'Line {line_number} is not a valid schain config: {error!r}') from error
+
+
+def generate_allocations(
+        configs: Iterable[dict],
+        output: TextIO,
+        workers: int = 1,
+        progress: Optional[TextIO] = None,
+        stats: Optional['GenerationStats'] = None,
+        template: Optional['AllocationTemplate'] = None) -> int:
+    """Write allocation of every config into the output as a JSON line.
+
+    Returns amount of generated allocations
+    """
+    def write_line(_: str, allocations: Allocations) -> None:
+        output.write(allocations if isinstance(allocations, str) else json.dumps(allocations, separators=(',', ':')))
+        output.write('\n')
+
+    return _generate(configs, write_line, workers, progress, stats, template)
+
+
+def generate_bundle(
+        configs: Iterable[dict],
+        path: str,
+        workers: int = 1,
+        progress: Optional[TextIO] = None,
+        stats: Optional['GenerationStats'] = None,
+        template: Optional['AllocationTemplate'] = None) -> int:
+    """Write allocations of all configs into the bundle file.
+
+    Returns amount of generated allocations
+    """
+    # pylint: disable=import-outside-toplevel
+    from .bundle import BundleWriter
+    writer = BundleWriter()
+
+    def add(schain_name: str, allocations: Allocations) -> None:
+        writer.add(schain_name, json.loads(allocations) if isinstance(allocations, str) else allocations)
+
+    count = _generate(configs, add, workers, progress, stats, template)
+    writer.write(path)
+    return count
+
+
+def main() -> None:
+    """Main function"""
+    import argparse  # pylint: disable=import-outside-toplevel
+    parser = argparse.ArgumentParser(
+        description='Generate allocations of IMA predeployed contracts for schain configs in JSON lines')
+    parser.add_argument('configs', nargs='?', help='path to the file with schain configs. stdin by default')
+    parser.add_argument('-o', '--output', help='path to the output file. stdout by default')
+    parser.add_argument('-w', '--workers', type=int, default=1, help='amount of worker processes')
+    parser.add_argument('--progress', action='store_true', help='report progress to stderr')
+    parser.add_argument('--bundle', help='path to the deduplicated bundle to write instead of JSON lines')
+    parser.add_argument('--profile', help='path to the file to write figures of generated contracts to')
+    parser.add_argument('--template', action='store_true',
+                        help='render schains without optional arguments from a template compiled once')
+    args = parser.parse_args()
+    if args.bundle is not None and args.output is not None:
+        parser.error('--output and --bundle can not be used together')
+
+    stats = None
+    if args.profile is not None:
+        from .profiling import GenerationStats  # pylint: disable=import-outside-toplevel
+        stats = GenerationStats()
+    template = None
+    if args.template:
+        from .template import AllocationTemplate  # pylint: disable=import-outside-toplevel
+        template = AllocationTemplate.compile()
+    configs_file = sys.stdin if args.configs is None else open(args.configs, encoding='utf-8')
+    output_file = sys.stdout if args.output is None else open(args.output, 'w', encoding='utf-8')
+    progress = sys.stderr if args.progress else None
+    try:
+        if args.bundle is None:
+            generate_allocations(read_configs(configs_file), output_file, args.workers, progress, stats, template)
+        else:
+            generate_bundle(read_configs(configs_file), args.bundle, args.workers, progress, stats, template)
+    except ValueError as error:
+        sys.exit(str(error))
+    finally:
+        for stream in [configs_file, output_file]:
+            if stream not in (sys.stdin, sys.stdout):
+                stream.close()
+    if stats is not None:
+        with open(args.profile, 'w', encoding='utf-8') as profile_file:
+            profile_file.write(stats.to_json())
+
+
+# private
+
+def _generate(
+        configs: Iterable[dict],
+        consume: Callable[[str, Allocations], None],
+        workers: int,
+        progress: Optional[TextIO],
+        stats: Optional['GenerationStats'] = None,
+        template: Optional['AllocationTemplate'] = None) -> int:
+    # allocations are yielded in order of configs, so names are matched in the same order
+    schain_names: deque = deque()
+
+    def remember_names() -> Iterator[dict]:
+        for config in configs:
+            schain_names.append(config['schain_name'])
+            yield config
+
+    count = 0
+    start = last_report = time.monotonic()
+    for allocations in _allocations(remember_names(), workers, stats, template):
+        consume(schain_names.popleft(), allocations)
+        count += 1
+        if progress is not None and time.monotonic() - last_report >= PROGRESS_INTERVAL_SEC:
+            last_report = time.monotonic()
+            _report_progress(progress, count, last_report - start, '\r')
+    if progress is not None:
+        _report_progress(progress, count, time.monotonic() - start, '\n')
+    return count
+
+
+def _allocations(
+        configs: Iterable[dict],
+        workers: int,
+        stats: Optional['GenerationStats'],
+        template: Optional['AllocationTemplate']) -> Iterator[Allocations]:
+    # pylint: disable=import-outside-toplevel
+    from .generator import _generate_many, generate_contracts_many
+    if template is None:
+        yield from generate_contracts_many(configs, workers, stats)
+        return
+
+    def render(schain_arguments: dict) -> Optional[str]:
+        if any(schain_arguments['options']):
+            # templates only have storage which every schain has
+            return None
+        arguments = {key: value for key, value in schain_arguments.items() if key != 'options'}
+        if stats is None:
+            return template.render(**arguments)
+        with stats.measure('template', 'render'):
+            return template.render(**arguments)
+
+    # other schains are generated in one stream with workers, the order of configs is kept
+    yield from _generate_many(configs, workers, stats, render)  # pylint: disable=protected-access
+
+
+def _report_progress(progress: TextIO, count: int, elapsed: float, end: str) -> None:
+    rate = count / elapsed if elapsed > 0 else 0.0
+    progress.write(f'{count} schains generated, {rate:.1f} per second{end}')
+    progress.flush()
+
+
+if __name__ == '__main__':
+    main()
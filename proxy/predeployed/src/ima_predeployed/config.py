@@ -0,0 +1,68 @@
+"""config.py
+
+Conversion of schain configs into arguments of generate_contracts.
+
+A schain config has the same keys as test/config.json:
+{
+    "schain_owner": ...,
+    "schain_name": ...,
+    "eth_deposit_box": ...,
+    "erc20_deposit_box": ...,
+    "erc721_deposit_box": ...,
+    "erc1155_deposit_box": ...,
+    "linker": ...,
+    "community_pool": ...,
+    "erc721_with_metadata_deposit_box": ...
+}
+and optional
+    "role_members": {contract name: {role name: [addresses]}}
+    "eth_balances_snapshot": path to a CSV or JSON lines snapshot of EthErc20 balances (see snapshot.py)
+    "token_clones": {token manager name: [[mainnet token, clone on the schain], ...]}
+    "peer_schains": [names of schains connected at genesis]
+    "active_users_snapshot": path to a file with addresses of active users of CommunityLocker (see snapshot.py)
+    "time_limits_per_message": {chain name: seconds}
+    "extra_contracts": {chain name, chain hash or "ANY_SCHAIN": [addresses]}
+
+Functions:
+    schain_config_to_arguments
+"""
+
+
+# config key => key of contracts_on_mainnet argument
+MAINNET_CONTRACT_KEYS = {
+    'eth_deposit_box': 'deposit_box_eth_address',
+    'erc20_deposit_box': 'deposit_box_erc20_address',
+    'erc721_deposit_box': 'deposit_box_erc721_address',
+    'erc1155_deposit_box': 'deposit_box_erc1155_address',
+    'linker': 'linker_address',
+    'community_pool': 'community_pool_address',
+    'erc721_with_metadata_deposit_box': 'deposit_box_erc721_with_metadata_address'
+}
+
+
+def schain_config_to_arguments(config: dict) -> dict:
+    """Return keyword arguments of generate_contracts for the schain config"""
+    arguments = {
+        'owner_address': config['schain_owner'],
+        'schain_name': config['schain_name'],
+        'contracts_on_mainnet': {
+            argument_key: config[config_key] for config_key, argument_key in MAINNET_CONTRACT_KEYS.items()
+        }
+    }
+    if config.get('role_members'):
+        arguments['role_members'] = config['role_members']
+    if config.get('token_clones'):
+        arguments['token_clones'] = config['token_clones']
+    if config.get('peer_schains'):
+        arguments['peer_schains'] = config['peer_schains']
+    if config.get('time_limits_per_message'):
+        arguments['time_limits_per_message'] = config['time_limits_per_message']
+    if config.get('extra_contracts'):
+        arguments['extra_contracts'] = config['extra_contracts']
+    if config.get('eth_balances_snapshot'):
+        from .snapshot import BalancesSnapshot  # pylint: disable=import-outside-toplevel
+        arguments['eth_balances'] = BalancesSnapshot(config['eth_balances_snapshot'])
+    if config.get('active_users_snapshot'):
+        from .snapshot import AddressesSnapshot  # pylint: disable=import-outside-toplevel
+        arguments['active_users'] = AddressesSnapshot(config['active_users_snapshot'])
+    return arguments
@@ -0,0 +1,14 @@
+# This file is generated by scripts/generate_constants.py
+# Do not edit it manually
+
+DEFAULT_ADMIN_ROLE = bytes(32)
+ANY_SCHAIN = bytes(32)
+CHAIN_CONNECTOR_ROLE = bytes.fromhex('2785f35fe7d8743aa971942d8474737bb31895d396eff2cc688a481e0221e191')  # keccak256('CHAIN_CONNECTOR_ROLE')
+EXTRA_CONTRACT_REGISTRAR_ROLE = bytes.fromhex('6155b5aac15ce9aa193c0527a6f43be0a36a7e2e7496c2b615c0e5f922842773')  # keccak256('EXTRA_CONTRACT_REGISTRAR_ROLE')
+CONSTANT_SETTER_ROLE = bytes.fromhex('96e3fc3be15159903e053027cff8a23f39a990e0194abcd8ac1cf1b355b8b93c')  # keccak256('CONSTANT_SETTER_ROLE')
+AUTOMATIC_DEPLOY_ROLE = bytes.fromhex('7164765a3c8bd2513bdfa0c90f1bee9606e920fbf2c9071f310263fbd818684b')  # keccak256('AUTOMATIC_DEPLOY_ROLE')
+TOKEN_REGISTRAR_ROLE = bytes.fromhex('fda70c2cc66a36c14884ee85424961f51b1d92b4494751699b6d105b3bcbcba8')  # keccak256('TOKEN_REGISTRAR_ROLE')
+REGISTRAR_ROLE = bytes.fromhex('edcc084d3dcd65a1f7f23c65c46722faca6953d28e43150a467cf43e5c309238')  # keccak256('REGISTRAR_ROLE')
+MINTER_ROLE = bytes.fromhex('9f2df0fed2c77648de5860a4cc508cd0818c85b8b8a1ab4ceeef8d981c8956a6')  # keccak256('MINTER_ROLE')
+BURNER_ROLE = bytes.fromhex('3c11d16cbaffd01df69ce1c404f6340ee057498f5f00246190ea54220576a848')  # keccak256('BURNER_ROLE')
+MAINNET_HASH = bytes.fromhex('8d646f556e5d9d6f1edcf7a39b77f5ac253776eb34efcfd688aacbee518efc26')  # keccak256('Mainnet')
@@ -0,0 +1,18 @@
+from .base import AccessControlEnumerableGenerator, ProxyAdminGenerator
+from .erc1155_on_chain import Erc1155OnChainGenerator
+from .erc20_on_chain import Erc20OnChainGenerator
+from .erc721_on_chain import Erc721OnChainGenerator
+from .eth_erc20 import UpgradeableEthErc20Generator, EthErc20Generator
+from .token_manager_erc20 import UpgradeableTokenManagerErc20Generator, TokenManagerErc20Generator
+from .token_manager_erc721 import UpgradeableTokenManagerErc721Generator, TokenManagerErc721Generator
+from .token_manager_erc1155 import UpgradeableTokenManagerErc1155Generator, TokenManagerErc1155Generator
+from .token_manager_erc721_with_metadata import (
+    UpgradeableTokenManagerErc721WithMetadataGenerator as UpgradeableTokenManagerErc721WMGenerator,
+    TokenManagerErc721WithMetadataGenerator as TokenManagerErc721WMGenerator
+)
+from .token_manager_eth import UpgradeableTokenManagerEthGenerator, TokenManagerEthGenerator
+from .token_manager_linker import UpgradeableTokenManagerLinkerGenerator, TokenManagerLinkerGenerator
+from .community_locker import UpgradeableCommunityLockerGenerator, CommunityLockerGenerator
+from .key_storage import UpgradeableKeyStorageGenerator, KeyStorageGenerator
+from .message_proxy_for_schain import UpgradeableMessageProxyForSchainGenerator, \
+    MessageProxyForSchainGenerator
@@ -0,0 +1,210 @@
+"""base.py
+
+Base classes of IMA predeployed contract generators
+
+Classes:
+    ContractGenerator
+    AccessControlEnumerableGenerator
+    UpgradeableContractGenerator
+    ProxyAdminGenerator
+"""
+
+from functools import lru_cache
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+from predeployed_generator.contract_generator import ContractGenerator as BaseContractGenerator
+from predeployed_generator.openzeppelin.access_control_enumerable_generator import (
+    AccessControlEnumerableGenerator as OpenzeppelinAccessControlEnumerableGenerator
+)
+from predeployed_generator.openzeppelin.proxy_admin_generator import (
+    ProxyAdminGenerator as OpenzeppelinProxyAdminGenerator
+)
+from predeployed_generator.upgradeable_contract_generator import (
+    UpgradeableContractGenerator as BaseUpgradeableContractGenerator
+)
+
+from .. import slots
+from ..artifact_registry import Artifact, get_artifact, get_openzeppelin_artifact
+from ..storage import StorageBuilder
+
+
+class _ArtifactGenerator:
+    """Takes bytecode, ABI and meta from the artifact of the registry.
+
+    ABI and meta are decoded by the registry only when they are requested
+    """
+    artifact: Artifact
+
+    @property
+    def bytecode(self) -> str:
+        return self.artifact.bytecode
+
+    @property
+    def abi(self) -> list:
+        return self.artifact.abi
+
+    @property
+    def meta(self) -> Optional[dict]:
+        return self.artifact.meta
+
+
+class ContractGenerator(_ArtifactGenerator, BaseContractGenerator):
+    """Generates contract from the artifacts of ima_predeployed package"""
+    ARTIFACT_FILENAME = ''
+    META_FILENAME = ''
+
+    def __init__(self):
+        # pylint: disable=super-init-not-called
+        self.artifact = get_artifact(self.ARTIFACT_FILENAME, self.META_FILENAME)
+
+    @classmethod
+    def calculate_mapping_value_slot(
+            cls,
+            slot: int,
+            key: Union[bytes, int, str],
+            key_type: str) -> int:
+        return slots.calculate_mapping_value_slot(slot, key, key_type)
+
+    @staticmethod
+    def calculate_array_value_slot(slot: int, index: int) -> int:
+        return slots.array_value_slot(slot, index)
+
+    # private
+
+    # generators write storage into StorageBuilder which emits genesis hex once
+    _write_address = staticmethod(StorageBuilder.write_address)
+    _write_bytes32 = staticmethod(StorageBuilder.write_bytes32)
+    _write_uint256 = staticmethod(StorageBuilder.write_uint256)
+
+
+class AccessControlEnumerableGenerator(ContractGenerator, OpenzeppelinAccessControlEnumerableGenerator):
+    """Generates AccessControlEnumerable contract
+    which storage is split into a shared part and a schain specific part.
+
+    The shared part does not depend on generation arguments.
+    It is calculated once per process and copied into every generated storage.
+
+    Additional members of roles listed in ROLE_NAMES
+    are passed to generate_storage as `role_members`: {role name: [addresses]}.
+    """
+    ROLE_NAMES: Tuple[str, ...] = ()
+
+    @classmethod
+    def generate_storage(cls, **kwargs) -> Dict[str, str]:
+        cls._check_role_names(kwargs.get('role_members'))
+        storage = StorageBuilder()
+        cls._write_schain_storage(storage, **kwargs)
+        return storage.emit(cls.generate_shared_storage())
+
+    @classmethod
+    def generate_shared_storage(cls) -> Dict[str, str]:
+        """Return storage slots which do not depend on generation arguments.
+
+        The returned dictionary is shared and must not be modified
+        """
+        return _shared_storage(cls)
+
+    @classmethod
+    def merge_role_members(
+            cls,
+            roles: Mapping[bytes, Sequence[str]],
+            role_members: Optional[Mapping[str, Sequence[str]]]) -> Dict[bytes, List[str]]:
+        """Add `role_members` to default members of roles skipping repeated addresses"""
+        cls._check_role_names(role_members)
+        merged = {role: list(accounts) for role, accounts in roles.items()}
+        for role_name, accounts in (role_members or {}).items():
+            members = merged.setdefault(getattr(cls, role_name), [])
+            known = {member.lower() for member in members}
+            for account in accounts:
+                if account.lower() not in known:
+                    known.add(account.lower())
+                    members.append(account)
+        return merged
+
+    # private
+
+    @classmethod
+    def _check_role_names(cls, role_members: Optional[Mapping[str, Sequence[str]]]) -> None:
+        for role_name in role_members or {}:
+            if role_name not in cls.ROLE_NAMES:
+                raise ValueError(f'Members of {role_name} can not be set in {cls.__name__}')
+
+    @classmethod
+    def _setup_roles(
+            cls,
+            storage: StorageBuilder,
+            roles: Mapping[bytes, Sequence[str]],
+            role_members: Optional[Mapping[str, Sequence[str]]] = None) -> None:
+        roles_slots = cls.RolesSlots(roles=cls.ROLES_SLOT, role_members=cls.ROLE_MEMBERS_SLOT)
+        for role, accounts in cls.merge_role_members(roles, role_members).items():
+            cls._setup_role(storage, roles_slots, role, accounts)
+
+    @classmethod
+    def _setup_role(
+            cls,
+            storage: StorageBuilder,
+            roles_slots: OpenzeppelinAccessControlEnumerableGenerator.RolesSlots,
+            role: bytes,
+            accounts: List[str]) -> None:
+        # the same writes as in predeployed_generator
+        # but slots of all members are calculated in one batch
+        # pylint: disable=arguments-renamed
+        members_slot = cls.calculate_mapping_value_slot(roles_slots.roles, role, 'bytes32')
+        values_slot = cls.calculate_mapping_value_slot(roles_slots.role_members, role, 'bytes32')
+        indexes_slot = values_slot + 1
+        keys = [slots.address_key(account) for account in accounts]
+        first_value_slot = cls.calculate_array_value_slot(values_slot, 0)
+        cls._write_uint256(storage, values_slot, len(accounts))
+        for i, (account, member_slot, index_slot) in enumerate(zip(
+                accounts,
+                slots.mapping_value_slots(members_slot, keys),
+                slots.mapping_value_slots(indexes_slot, keys))):
+            cls._write_uint256(storage, member_slot, 1)
+            cls._write_address(storage, first_value_slot + i, account)
+            cls._write_uint256(storage, index_slot, i + 1)
+
+    @staticmethod
+    def _peer_schain_hashes(schain_name: str, peer_schains: Sequence[str]) -> List[bytes]:
+        """Return hashes of schains connected at genesis rejecting what connectSchain rejects"""
+        hashes = [slots.keccak256(peer_schain.encode()) for peer_schain in peer_schains]
+        if len(set(hashes)) != len(hashes):
+            raise ValueError('The same schain is connected several times')
+        if schain_name in peer_schains:
+            raise ValueError('Schain cannot connect itself')
+        if 'Mainnet' in peer_schains:
+            raise ValueError('Mainnet is always connected')
+        return hashes
+
+    @classmethod
+    def _write_shared_storage(cls, storage: StorageBuilder) -> None:
+        pass
+
+    @classmethod
+    def _write_schain_storage(cls, storage: StorageBuilder, **kwargs) -> None:
+        pass
+
+
+class UpgradeableContractGenerator(_ArtifactGenerator, BaseUpgradeableContractGenerator):
+    """Generates transparent upgradeable proxy based on implementation generator"""
+
+    def __init__(self, implementation_generator: BaseContractGenerator):
+        # pylint: disable=super-init-not-called
+        # proxy artifacts are taken from the registry
+        # instead of parsing them in OpenzeppelinContractGenerator constructor
+        self.artifact = get_openzeppelin_artifact(self.ARTIFACT_FILENAME, self.META_FILENAME)
+        self.implementation_generator = implementation_generator
+
+
+class ProxyAdminGenerator(_ArtifactGenerator, OpenzeppelinProxyAdminGenerator):
+    """Generates ProxyAdmin"""
+
+    def __init__(self):
+        # pylint: disable=super-init-not-called
+        self.artifact = get_openzeppelin_artifact(self.ARTIFACT_FILENAME, self.META_FILENAME)
+
+
+@lru_cache(maxsize=None)
+def _shared_storage(generator_class: type) -> Dict[str, str]:
+    storage = StorageBuilder()
+    generator_class._write_shared_storage(storage)  # pylint: disable=protected-access
+    return storage.emit()
@@ -1,92 +1,80 @@
-from os.path import join, dirname
-from typing import Dict
-
-from predeployed_generator.upgradeable_contract_generator import UpgradeableContractGenerator
+from itertools import islice
+from typing import Iterable, Mapping
 
+from .. import constants, slots
+from ..slots import keccak256
+from ..storage_layout import COMMUNITY_LOCKER
 from ..addresses import MESSAGE_PROXY_FOR_SCHAIN_ADDRESS, TOKEN_MANAGER_LINKER_ADDRESS
-from predeployed_generator.openzeppelin.access_control_enumerable_generator import (
-    AccessControlEnumerableGenerator
-)
-from web3 import Web3
+from ..storage import StorageBuilder
+from .base import AccessControlEnumerableGenerator, UpgradeableContractGenerator
 
 
 class CommunityLockerGenerator(AccessControlEnumerableGenerator):
     ARTIFACT_FILENAME = 'CommunityLocker.json'
     META_FILENAME = 'CommunityLocker.meta.json'
-    DEFAULT_ADMIN_ROLE = (0).to_bytes(32, 'big')
+    DEFAULT_ADMIN_ROLE = constants.DEFAULT_ADMIN_ROLE
     DEFAULT_TIME_LIMIT_SEC = 5 * 60
-    MAINNET_HASH = Web3.solidity_keccak(['string'], ['Mainnet'])
-
-    # ---------- storage ----------
-    # --------Initializable--------
-    # 0:    _initialized, _initializing;
-    # -----ContextUpgradeable------
-    # 1:    __gap
-    # ...   __gap
-    # 50:   __gap
-    # ------ERC165Upgradeable------
-    # 51:   __gap
-    # ...   __gap
-    # 100:  __gap
-    # --AccessControlUpgradeable---
-    # 101:  _roles
-    # 102:  __gap
-    # ...   __gap
-    # 150:  __gap
-    # AccessControlEnumerableUpgradeable
-    # 151:  _roleMembers
-    # 152:  __gap
-    # ...   __gap
-    # 200:  __gap
-    # -------CommunityLocker-------
-    # 201:  messageProxy
-    # 202:  tokenManagerLinker
-    # 203:  communityPool
-    # 204:  schainHash
-    # 205:  _deprecatedTimeLimitPerMessage
-    # 206:  activeUsers
-    # 207:  lastMessageTimeStamp
-    # 208:  mainnetGasPrice
-    # 209:  gasPriceTimestamp
-    # 210:  timeLimitPerMessage
-    # 211:  lastMessageTimeStampToSchain
+    MAINNET_HASH = constants.MAINNET_HASH
 
-    INITIALIZED_SLOT = 0
-    ROLES_SLOT = 101
-    ROLE_MEMBERS_SLOT = 151
-    MESSAGE_PROXY_SLOT = 201
-    TOKEN_MANAGER_LINKER_SLOT = AccessControlEnumerableGenerator.next_slot(MESSAGE_PROXY_SLOT)
-    COMMUNITY_POOL_SLOT = AccessControlEnumerableGenerator.next_slot(TOKEN_MANAGER_LINKER_SLOT)
-    SCHAIN_HASH_SLOT = AccessControlEnumerableGenerator.next_slot(COMMUNITY_POOL_SLOT)
-    TIME_LIMIT_PER_MESSAGE_SLOT = 210
+    INITIALIZED_SLOT = COMMUNITY_LOCKER['_initialized']
+    ROLES_SLOT = COMMUNITY_LOCKER['_roles']
+    ROLE_MEMBERS_SLOT = COMMUNITY_LOCKER['_roleMembers']
+    MESSAGE_PROXY_SLOT = COMMUNITY_LOCKER['messageProxy']
+    TOKEN_MANAGER_LINKER_SLOT = COMMUNITY_LOCKER['tokenManagerLinker']
+    COMMUNITY_POOL_SLOT = COMMUNITY_LOCKER['communityPool']
+    SCHAIN_HASH_SLOT = COMMUNITY_LOCKER['schainHash']
+    TIME_LIMIT_PER_MESSAGE_SLOT = COMMUNITY_LOCKER['timeLimitPerMessage']
+    ACTIVE_USERS_SLOT = COMMUNITY_LOCKER['activeUsers']
+    # slots of active users are calculated in batches of this size
+    ACTIVE_USERS_BATCH_SIZE = 4096
 
-    def __init__(self):
-        generator = CommunityLockerGenerator.from_hardhat_artifact(
-            join(dirname(__file__), '..', 'artifacts', self.ARTIFACT_FILENAME),
-            join(dirname(__file__), '..', 'artifacts', self.META_FILENAME))
-        super().__init__(bytecode=generator.bytecode, abi=generator.abi, meta=generator.meta)
+    @classmethod
+    def _write_shared_storage(cls, storage: StorageBuilder) -> None:
+        cls._write_uint256(storage, cls.INITIALIZED_SLOT, 1)
+        cls._write_address(storage, cls.MESSAGE_PROXY_SLOT, MESSAGE_PROXY_FOR_SCHAIN_ADDRESS)
+        cls._write_address(storage, cls.TOKEN_MANAGER_LINKER_SLOT, TOKEN_MANAGER_LINKER_ADDRESS)
+        time_limit_per_message_slot = AccessControlEnumerableGenerator.calculate_mapping_value_slot(
+            cls.TIME_LIMIT_PER_MESSAGE_SLOT, cls.MAINNET_HASH, 'bytes32')
+        cls._write_uint256(storage, time_limit_per_message_slot, cls.DEFAULT_TIME_LIMIT_SEC)
 
     @classmethod
-    def generate_storage(cls, **kwargs) -> Dict[str, str]:
+    def _write_schain_storage(cls, storage: StorageBuilder, **kwargs) -> None:
         deployer_address = kwargs['deployer_address']
         schain_name = kwargs['schain_name']
         community_pool_address = kwargs['community_pool_address']
-
-        storage: Dict[str, str] = {}
         roles_slots = cls.RolesSlots(roles=cls.ROLES_SLOT, role_members=cls.ROLE_MEMBERS_SLOT)
 
-        cls._write_uint256(storage, cls.INITIALIZED_SLOT, 1)
         cls._setup_role(storage, roles_slots, cls.DEFAULT_ADMIN_ROLE, [deployer_address])
-        cls._write_address(storage, cls.MESSAGE_PROXY_SLOT, MESSAGE_PROXY_FOR_SCHAIN_ADDRESS)
-        cls._write_address(storage, cls.TOKEN_MANAGER_LINKER_SLOT, TOKEN_MANAGER_LINKER_ADDRESS)
         cls._write_address(storage, cls.COMMUNITY_POOL_SLOT, community_pool_address)
+        cls._write_bytes32(storage, cls.SCHAIN_HASH_SLOT, keccak256(schain_name.encode()))
+        if kwargs.get('time_limits_per_message'):
+            cls._write_time_limits(storage, kwargs['time_limits_per_message'])
+        if kwargs.get('active_users') is not None:
+            cls._write_active_users(storage, kwargs['active_users'])
 
-        cls._write_bytes32(storage, cls.SCHAIN_HASH_SLOT, Web3.solidity_keccak(['string'], [schain_name]))
-        time_limit_per_message_slot = AccessControlEnumerableGenerator.calculate_mapping_value_slot(
-            cls.TIME_LIMIT_PER_MESSAGE_SLOT, cls.MAINNET_HASH, 'bytes32')
-        cls._write_uint256(storage, time_limit_per_message_slot, cls.DEFAULT_TIME_LIMIT_SEC)
+    @classmethod
+    def _write_time_limits(cls, storage: StorageBuilder, time_limits: Mapping[str, int]) -> None:
+        """Set timeLimitPerMessage of chains by name, Mainnet included"""
+        for chain_name, time_limit in time_limits.items():
+            # bool is a subclass of int but True is not a time limit
+            if isinstance(time_limit, bool) or not isinstance(time_limit, int) or not 0 <= time_limit < 1 << 256:
+                raise ValueError(f'Time limit of {chain_name} is not uint256: {time_limit!r}')
+        chain_hashes = [keccak256(chain_name.encode()) for chain_name in time_limits]
+        for time_limit_slot, time_limit in zip(
+                slots.mapping_value_slots(cls.TIME_LIMIT_PER_MESSAGE_SLOT, chain_hashes), time_limits.values()):
+            cls._write_uint256(storage, time_limit_slot, time_limit)
 
-        return storage
+    @classmethod
+    def _write_active_users(cls, storage: StorageBuilder, users: Iterable[str]) -> None:
+        """Activate users as CommunityPool messages do. The iterable is consumed once"""
+        users = iter(users)
+        while True:
+            keys = [slots.address_key(user) for user in islice(users, cls.ACTIVE_USERS_BATCH_SIZE)]
+            if not keys:
+                break
+            # repeated users write the same slot again
+            for active_user_slot in slots.mapping_value_slots(cls.ACTIVE_USERS_SLOT, keys):
+                cls._write_uint256(storage, active_user_slot, 1)
 
 
 class UpgradeableCommunityLockerGenerator(UpgradeableContractGenerator):
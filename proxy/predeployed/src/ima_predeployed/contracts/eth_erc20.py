@@ -1,91 +1,90 @@
-from os.path import join, dirname
-from typing import Dict
-
-from predeployed_generator.upgradeable_contract_generator import UpgradeableContractGenerator
+from itertools import islice
+from typing import Dict, Iterable, Tuple
 
+from .. import constants, slots
 from ..addresses import TOKEN_MANAGER_ETH_ADDRESS
-from predeployed_generator.openzeppelin.access_control_enumerable_generator import (
-    AccessControlEnumerableGenerator
-)
-from web3 import Web3
+from ..storage_layout import ETH_ERC20
+from ..storage import StorageBuilder
+from .base import AccessControlEnumerableGenerator, UpgradeableContractGenerator
 
 
 class EthErc20Generator(AccessControlEnumerableGenerator):
     ARTIFACT_FILENAME = "EthErc20.json"
     META_FILENAME = "EthErc20.meta.json"
-    DEFAULT_ADMIN_ROLE = (0).to_bytes(32, 'big')
-    MINTER_ROLE = Web3.solidity_keccak(['string'], ['MINTER_ROLE'])
-    BURNER_ROLE = Web3.solidity_keccak(['string'], ['BURNER_ROLE'])
+    DEFAULT_ADMIN_ROLE = constants.DEFAULT_ADMIN_ROLE
+    MINTER_ROLE = constants.MINTER_ROLE
+    BURNER_ROLE = constants.BURNER_ROLE
     NAME = 'ERC20 Ether Clone'
     SYMBOL = 'ETHC'
     DECIMALS = 18
 
-    # ---------- storage ----------
-    # --------Initializable--------
-    # 0:    _initialized, _initializing;
-    # -----ContextUpgradeable------
-    # 1:    __gap
-    # ...   __gap
-    # 50:   __gap
-    # ------ERC165Upgradeable------
-    # 51:   __gap
-    # ...   __gap
-    # 100:  __gap
-    # --AccessControlUpgradeable---
-    # 101:  _roles
-    # 102:  __gap
-    # ...   __gap
-    # 150:  __gap
-    # AccessControlEnumerableUpgradeable
-    # 151:  _roleMembers
-    # 152:  __gap
-    # ...   __gap
-    # 200:  __gap
-    # -------ERC20Upgradeable-------
-    # 201:  _balances
-    # 202:  _allowances
-    # 203:  _totalSupply
-    # 204:  _name
-    # 205:  _symbol
-    # 206:  _decimals
-    # 207:  __gap
-    # ...   __gap
-    # 250:  __gap
-    # ---ERC20BurnableUpgradeable---
-    # 251:  __gap
-    # ...   __gap
-    # 300:  __gap
-    # -----------EthErc20-----------
-
-    INITIALIZED_SLOT = 0
-    ROLES_SLOT = 101
-    ROLE_MEMBERS_SLOT = 151
-    NAME_SLOT = 204
-    SYMBOL_SLOT = AccessControlEnumerableGenerator.next_slot(NAME_SLOT)
+    INITIALIZED_SLOT = ETH_ERC20['_initialized']
+    ROLES_SLOT = ETH_ERC20['_roles']
+    ROLE_MEMBERS_SLOT = ETH_ERC20['_roleMembers']
+    NAME_SLOT = ETH_ERC20['_name']
+    SYMBOL_SLOT = ETH_ERC20['_symbol']
+    # ERC20Upgradeable of openzeppelin 4 does not store decimals.
+    # The slot belongs to __gap and is kept for compatibility with existing genesis files
     DECIMALS_SLOT = AccessControlEnumerableGenerator.next_slot(SYMBOL_SLOT)
-
-    def __init__(self):
-        generator = EthErc20Generator.from_hardhat_artifact(
-            join(dirname(__file__), '..', 'artifacts', self.ARTIFACT_FILENAME),
-            join(dirname(__file__), '..', 'artifacts', self.META_FILENAME))
-        super().__init__(bytecode=generator.bytecode, abi=generator.abi, meta=generator.meta)
+    BALANCES_SLOT = ETH_ERC20['_balances']
+    TOTAL_SUPPLY_SLOT = ETH_ERC20['_totalSupply']
+    # slots of holders are calculated in batches of this size
+    BALANCES_BATCH_SIZE = 4096
 
     @classmethod
     def generate_storage(cls, **kwargs) -> Dict[str, str]:
-        deployer_address = kwargs['deployer_address']
+        balances = kwargs.pop('balances', None)
+        storage = super().generate_storage(**kwargs)
+        if balances is None:
+            return storage
+        builder = StorageBuilder()
+        cls._write_balances(builder, balances)
+        # a repeated holder would overwrite its balance and break _totalSupply
+        size = len(storage) + len(builder)
+        storage = builder.emit(storage)
+        if len(storage) != size:
+            raise ValueError('Holders have several balances')
+        return storage
 
-        storage: Dict[str, str] = {}
+    @classmethod
+    def _write_shared_storage(cls, storage: StorageBuilder) -> None:
         roles_slots = cls.RolesSlots(roles=cls.ROLES_SLOT, role_members=cls.ROLE_MEMBERS_SLOT)
 
         cls._write_uint256(storage, cls.INITIALIZED_SLOT, 1)
-        cls._setup_role(storage, roles_slots, cls.DEFAULT_ADMIN_ROLE, [deployer_address])
         cls._setup_role(storage, roles_slots, cls.MINTER_ROLE, [TOKEN_MANAGER_ETH_ADDRESS])
         cls._setup_role(storage, roles_slots, cls.BURNER_ROLE, [TOKEN_MANAGER_ETH_ADDRESS])
         cls._write_string(storage, cls.NAME_SLOT, cls.NAME)
         cls._write_string(storage, cls.SYMBOL_SLOT, cls.SYMBOL)
         cls._write_uint256(storage, cls.DECIMALS_SLOT, cls.DECIMALS)
 
-        return storage
+    @classmethod
+    def _write_schain_storage(cls, storage: StorageBuilder, **kwargs) -> None:
+        deployer_address = kwargs['deployer_address']
+        roles_slots = cls.RolesSlots(roles=cls.ROLES_SLOT, role_members=cls.ROLE_MEMBERS_SLOT)
+
+        cls._setup_role(storage, roles_slots, cls.DEFAULT_ADMIN_ROLE, [deployer_address])
+
+    @classmethod
+    def _write_balances(cls, storage: StorageBuilder, balances: Iterable[Tuple[str, int]]) -> None:
+        """Mint (holder, amount) pairs at genesis. The iterable is consumed once"""
+        total_supply = 0
+        balances = iter(balances)
+        while True:
+            batch = list(islice(balances, cls.BALANCES_BATCH_SIZE))
+            if not batch:
+                break
+            batch = [(holder, amount) for holder, amount in batch if amount]
+            for holder, amount in batch:
+                if not 0 < amount < 1 << 256:
+                    raise ValueError(f'Balance of {holder} is out of uint256 range')
+                total_supply += amount
+            keys = [slots.address_key(holder) for holder, _ in batch]
+            for slot, (_, amount) in zip(slots.mapping_value_slots(cls.BALANCES_SLOT, keys), batch):
+                cls._write_uint256(storage, slot, amount)
+        if total_supply >= 1 << 256:
+            raise ValueError('Total supply is out of uint256 range')
+        if total_supply:
+            cls._write_uint256(storage, cls.TOTAL_SUPPLY_SLOT, total_supply)
 
 
 class UpgradeableEthErc20Generator(UpgradeableContractGenerator):
@@ -1,95 +1,59 @@
-from os.path import join, dirname
-from typing import Dict
-
-from predeployed_generator.openzeppelin.access_control_enumerable_generator import (
-    AccessControlEnumerableGenerator as Generator
-)
-from predeployed_generator.upgradeable_contract_generator import UpgradeableContractGenerator
+from typing import Dict, List, Mapping, Sequence
 
+from .. import constants, slots
+from ..slots import keccak256
+from ..version import get_version
+from ..storage_layout import MESSAGE_PROXY_FOR_SCHAIN
 from ..addresses import COMMUNITY_LOCKER_ADDRESS, KEY_STORAGE_ADDRESS, TOKEN_MANAGER_ERC1155_ADDRESS, \
     TOKEN_MANAGER_ERC20_ADDRESS, TOKEN_MANAGER_ERC721_ADDRESS, TOKEN_MANAGER_ETH_ADDRESS, \
     TOKEN_MANAGER_ERC721_WITH_METADATA_ADDRESS, TOKEN_MANAGER_LINKER_ADDRESS
-from web3 import Web3
-from pkg_resources import get_distribution
+from ..storage import StorageBuilder
+from .base import AccessControlEnumerableGenerator as Generator, UpgradeableContractGenerator
 
 
 class MessageProxyForSchainGenerator(Generator):
     ARTIFACT_FILENAME = "MessageProxyForSchain.json"
     META_FILENAME = "MessageProxyForSchain.meta.json"
-    DEFAULT_ADMIN_ROLE = (0).to_bytes(32, 'big')
-    CHAIN_CONNECTOR_ROLE = Web3.solidity_keccak(['string'], ['CHAIN_CONNECTOR_ROLE'])
-    MAINNET_HASH = Web3.solidity_keccak(['string'], ['Mainnet'])
+    DEFAULT_ADMIN_ROLE = constants.DEFAULT_ADMIN_ROLE
+    CHAIN_CONNECTOR_ROLE = constants.CHAIN_CONNECTOR_ROLE
+    EXTRA_CONTRACT_REGISTRAR_ROLE = constants.EXTRA_CONTRACT_REGISTRAR_ROLE
+    CONSTANT_SETTER_ROLE = constants.CONSTANT_SETTER_ROLE
+    # CHAIN_CONNECTOR_ROLE is granted in the shared storage
+    ROLE_NAMES = ('DEFAULT_ADMIN_ROLE', 'EXTRA_CONTRACT_REGISTRAR_ROLE', 'CONSTANT_SETTER_ROLE')
+    MAINNET_HASH = constants.MAINNET_HASH
     GAS_LIMIT = 3000000
-    ANY_SCHAIN = (0).to_bytes(32, 'big')
-
-    # ---------- storage ----------
-    # --------Initializable--------
-    # 0:    _initialized, _initializing;
-    # -----ContextUpgradeable------
-    # 1:    __gap
-    # ...   __gap
-    # 50:   __gap
-    # ------ERC165Upgradeable------
-    # 51:   __gap
-    # ...   __gap
-    # 100:  __gap
-    # --AccessControlUpgradeable---
-    # 101:  _roles
-    # 102:  __gap
-    # ...   __gap
-    # 150:  __gap
-    # AccessControlEnumerableUpgradeable
-    # 151:  _roleMembers
-    # 152:  __gap
-    # ...   __gap
-    # 200:  __gap
-    # ---------MessageProxy--------
-    # 201:  connectedChains
-    # 202:  deprecatedRegistryContracts
-    # 203:  gasLimit
-    # ----MessageProxyForSchain----
-    # 204:  keyStorage
-    # 205:  schainHash
-    # 206:  _outgoingMessageDataHash
-    # 207:  _idxHead
-    # 208:  _idxTail
-    # 209:  _registryContracts
-    # 210:  version
-
-    INITIALIZED_SLOT = 0
-    ROLES_SLOT = 101
-    ROLE_MEMBERS_SLOT = 151
-    CONNECTED_CHAINS_SLOT = 201
-    DEPRECATED_REGISTRY_CONTRACTS_SLOT = Generator.next_slot(CONNECTED_CHAINS_SLOT)
-    GAS_LIMIT_SLOT = Generator.next_slot(DEPRECATED_REGISTRY_CONTRACTS_SLOT)
-    KEY_STORAGE_SLOT = Generator.next_slot(GAS_LIMIT_SLOT)
-    SCHAIN_HASH_SLOT = Generator.next_slot(KEY_STORAGE_SLOT)
-    OUTGOING_MESSAGE_DATA_HASH = Generator.next_slot(SCHAIN_HASH_SLOT)
-    IDX_HEAD = Generator.next_slot(OUTGOING_MESSAGE_DATA_HASH)
-    IDX_TAIL = Generator.next_slot(IDX_HEAD)
-    REGISTRY_CONTRACTS_SLOT = Generator.next_slot(IDX_TAIL)
-    VERSION_SLOT = Generator.next_slot(REGISTRY_CONTRACTS_SLOT)
-    
-    def __init__(self):
-        generator = MessageProxyForSchainGenerator.from_hardhat_artifact(
-            join(dirname(__file__), '..', 'artifacts', self.ARTIFACT_FILENAME),
-            join(dirname(__file__), '..', 'artifacts', self.META_FILENAME))
-        super().__init__(bytecode=generator.bytecode, abi=generator.abi, meta=generator.meta)
+    ANY_SCHAIN = constants.ANY_SCHAIN
+    # contracts registered for all chains by default
+    REGISTERED_CONTRACTS = [
+        TOKEN_MANAGER_ETH_ADDRESS,
+        TOKEN_MANAGER_ERC20_ADDRESS,
+        TOKEN_MANAGER_ERC721_ADDRESS,
+        TOKEN_MANAGER_ERC1155_ADDRESS,
+        TOKEN_MANAGER_ERC721_WITH_METADATA_ADDRESS,
+        COMMUNITY_LOCKER_ADDRESS]
+
+    INITIALIZED_SLOT = MESSAGE_PROXY_FOR_SCHAIN['_initialized']
+    ROLES_SLOT = MESSAGE_PROXY_FOR_SCHAIN['_roles']
+    ROLE_MEMBERS_SLOT = MESSAGE_PROXY_FOR_SCHAIN['_roleMembers']
+    CONNECTED_CHAINS_SLOT = MESSAGE_PROXY_FOR_SCHAIN['connectedChains']
+    DEPRECATED_REGISTRY_CONTRACTS_SLOT = MESSAGE_PROXY_FOR_SCHAIN['_deprecatedRegistryContracts']
+    GAS_LIMIT_SLOT = MESSAGE_PROXY_FOR_SCHAIN['gasLimit']
+    KEY_STORAGE_SLOT = MESSAGE_PROXY_FOR_SCHAIN['keyStorage']
+    SCHAIN_HASH_SLOT = MESSAGE_PROXY_FOR_SCHAIN['schainHash']
+    OUTGOING_MESSAGE_DATA_HASH = MESSAGE_PROXY_FOR_SCHAIN['_outgoingMessageDataHash']
+    IDX_HEAD = MESSAGE_PROXY_FOR_SCHAIN['_idxHead']
+    IDX_TAIL = MESSAGE_PROXY_FOR_SCHAIN['_idxTail']
+    REGISTRY_CONTRACTS_SLOT = MESSAGE_PROXY_FOR_SCHAIN['_registryContracts']
+    VERSION_SLOT = MESSAGE_PROXY_FOR_SCHAIN['version']
 
     @classmethod
-    def generate_storage(cls, **kwargs) -> Dict[str, str]:
-        deployer_address = kwargs['deployer_address']
-        schain_name = kwargs['schain_name']
-        storage: Dict[str, str] = {}
+    def _write_shared_storage(cls, storage: StorageBuilder) -> None:
         roles_slots = cls.RolesSlots(roles=cls.ROLES_SLOT, role_members=cls.ROLE_MEMBERS_SLOT)
-        
+
         cls._write_uint256(storage, cls.INITIALIZED_SLOT, 1)
-        cls._setup_role(storage, roles_slots, cls.DEFAULT_ADMIN_ROLE, [deployer_address])
         cls._setup_role(storage, roles_slots, cls.CHAIN_CONNECTOR_ROLE,
                         [TOKEN_MANAGER_LINKER_ADDRESS])
         cls._write_address(storage, cls.KEY_STORAGE_SLOT, KEY_STORAGE_ADDRESS)
-        cls._write_bytes32(storage, cls.SCHAIN_HASH_SLOT,
-                           Web3.solidity_keccak(['string'], [schain_name]))
 
         connected_chain_info_slot = Generator.calculate_mapping_value_slot(
             cls.CONNECTED_CHAINS_SLOT, cls.MAINNET_HASH, 'bytes32')
@@ -97,16 +61,10 @@ class MessageProxyForSchainGenerator(Generator):
         cls._write_uint256(storage, inited_slot, 1)
         cls._write_uint256(storage, cls.GAS_LIMIT_SLOT, cls.GAS_LIMIT)
         cls._write_string(storage, cls.VERSION_SLOT,
-                          get_distribution('ima_predeployed').version)
+                          get_version())
         registry_contracts_slot = Generator.calculate_mapping_value_slot(
             cls.REGISTRY_CONTRACTS_SLOT, cls.ANY_SCHAIN, 'bytes32')
-        allowed_contracts = [
-            TOKEN_MANAGER_ETH_ADDRESS,
-            TOKEN_MANAGER_ERC20_ADDRESS,
-            TOKEN_MANAGER_ERC721_ADDRESS,
-            TOKEN_MANAGER_ERC1155_ADDRESS,
-            TOKEN_MANAGER_ERC721_WITH_METADATA_ADDRESS,
-            COMMUNITY_LOCKER_ADDRESS]
+        allowed_contracts = cls.REGISTERED_CONTRACTS
         values_slot = registry_contracts_slot
         indexes_slot = registry_contracts_slot + 1
         cls._write_uint256(storage, values_slot, len(allowed_contracts))
@@ -119,8 +77,94 @@ class MessageProxyForSchainGenerator(Generator):
                 storage,
                 Generator.calculate_mapping_value_slot(indexes_slot, int(contract, 16), 'uint256'),
                 i + 1)
-            
-        return storage
+
+    @classmethod
+    def _write_schain_storage(cls, storage: StorageBuilder, **kwargs) -> None:
+        deployer_address = kwargs['deployer_address']
+        schain_name = kwargs['schain_name']
+
+        cls._setup_roles(storage, {cls.DEFAULT_ADMIN_ROLE: [deployer_address]}, kwargs.get('role_members'))
+        cls._write_bytes32(storage, cls.SCHAIN_HASH_SLOT,
+                           keccak256(schain_name.encode()))
+        if kwargs.get('peer_schains'):
+            cls._connect_chains(storage, schain_name, kwargs['peer_schains'])
+        if kwargs.get('extra_contracts'):
+            cls._register_extra_contracts(storage, schain_name, kwargs['extra_contracts'])
+
+    @classmethod
+    def _connect_chains(cls, storage: StorageBuilder, schain_name: str, peer_schains: Sequence[str]) -> None:
+        # counters and lastOutgoingMessageBlockId of ConnectedChainInfo are zero, only inited is written
+        for connected_chain_info_slot in slots.mapping_value_slots(
+                cls.CONNECTED_CHAINS_SLOT, cls._peer_schain_hashes(schain_name, peer_schains)):
+            cls._write_uint256(storage, connected_chain_info_slot + 2, 1)
+
+    @classmethod
+    def _register_extra_contracts(
+            cls,
+            storage: StorageBuilder,
+            schain_name: str,
+            extra_contracts: Mapping[str, Sequence[str]]) -> None:
+        """Register contracts as registerExtraContract and registerExtraContractForAll do.
+
+        Keys of `extra_contracts` are chain names, 0x prefixed chain hashes or 'ANY_SCHAIN'.
+        Contracts for all chains are appended to REGISTERED_CONTRACTS
+        """
+        schain_hash = keccak256(schain_name.encode())
+        contracts_of_chains: Dict[bytes, Sequence[str]] = {}
+        for chain, contracts in extra_contracts.items():
+            chain_hash = cls._chain_hash(chain)
+            if chain_hash == schain_hash:
+                raise ValueError('Destination chain hash cannot be equal to itself')
+            if chain_hash in contracts_of_chains:
+                raise ValueError(f'Contracts of {chain} are listed several times')
+            contracts_of_chains[chain_hash] = contracts
+
+        registered_for_all = {slots.address_key(contract) for contract in cls.REGISTERED_CONTRACTS}
+        contracts_for_all = contracts_of_chains.pop(cls.ANY_SCHAIN, [])
+        keys_for_all = cls._extra_contract_keys(contracts_for_all, registered_for_all)
+        registered_for_all.update(keys_for_all)
+        if contracts_for_all:
+            cls._write_address_set(
+                storage, slots.mapping_value_slot(cls.REGISTRY_CONTRACTS_SLOT, cls.ANY_SCHAIN),
+                contracts_for_all, keys_for_all, len(cls.REGISTERED_CONTRACTS))
+        for set_slot, contracts in zip(
+                slots.mapping_value_slots(cls.REGISTRY_CONTRACTS_SLOT, list(contracts_of_chains)),
+                contracts_of_chains.values()):
+            cls._write_address_set(
+                storage, set_slot, contracts, cls._extra_contract_keys(contracts, registered_for_all), 0)
+
+    @classmethod
+    def _chain_hash(cls, chain: str) -> bytes:
+        if chain == 'ANY_SCHAIN':
+            return cls.ANY_SCHAIN
+        if len(chain) == 66 and chain.startswith('0x'):
+            return bytes.fromhex(chain[2:])
+        return keccak256(chain.encode())
+
+    @staticmethod
+    def _extra_contract_keys(contracts: Sequence[str], registered_for_all: set) -> List[bytes]:
+        keys = [slots.address_key(contract) for contract in contracts]
+        if len(set(keys)) != len(keys):
+            raise ValueError('Extra contract is already registered')
+        if not registered_for_all.isdisjoint(keys):
+            raise ValueError('Extra contract is already registered for all chains')
+        return keys
+
+    @classmethod
+    def _write_address_set(
+            cls,
+            storage: StorageBuilder,
+            set_slot: int,
+            addresses: Sequence[str],
+            keys: Sequence[bytes],
+            first_index: int) -> None:
+        """Write EnumerableSet.AddressSet which already has `first_index` values"""
+        values_data_slot = slots.array_value_slot(set_slot, 0)
+        cls._write_uint256(storage, set_slot, first_index + len(addresses))
+        for index, (address, index_slot) in enumerate(
+                zip(addresses, slots.mapping_value_slots(set_slot + 1, keys)), start=first_index):
+            cls._write_address(storage, values_data_slot + index, address)
+            cls._write_uint256(storage, index_slot, index + 1)
 
 
 class UpgradeableMessageProxyForSchainGenerator(UpgradeableContractGenerator):
@@ -1,88 +1,97 @@
-from os.path import join, dirname
-from typing import Dict
-
-from predeployed_generator.upgradeable_contract_generator import UpgradeableContractGenerator
+from typing import Optional, Sequence
 
+from .. import constants, slots
+from ..slots import keccak256
+from ..storage_layout import TOKEN_MANAGER, TOKEN_MANAGER_OFFSETS
 from ..addresses import MESSAGE_PROXY_FOR_SCHAIN_ADDRESS, TOKEN_MANAGER_LINKER_ADDRESS, \
     COMMUNITY_LOCKER_ADDRESS
-from predeployed_generator.openzeppelin.access_control_enumerable_generator import (
-    AccessControlEnumerableGenerator as Generator
-)
-from web3 import Web3
+from ..storage import StorageBuilder
+from .base import AccessControlEnumerableGenerator as Generator, UpgradeableContractGenerator
 
 
 class TokenManagerGenerator(Generator):
     ARTIFACT_FILENAME = "TokenManager.json"
     META_FILENAME = "TokenManager.meta.json"
-    DEFAULT_ADMIN_ROLE = (0).to_bytes(32, 'big')
-    AUTOMATIC_DEPLOY_ROLE = Web3.solidity_keccak(['string'], ['AUTOMATIC_DEPLOY_ROLE'])
-    TOKEN_REGISTRAR_ROLE = Web3.solidity_keccak(['string'], ['TOKEN_REGISTRAR_ROLE'])
-
-    # ---------- storage ----------
-    # --------Initializable--------
-    # 0:    _initialized, _initializing;
-    # -----ContextUpgradeable------
-    # 1:    __gap
-    # ...   __gap
-    # 50:   __gap
-    # ------ERC165Upgradeable------
-    # 51:   __gap
-    # ...   __gap
-    # 100:  __gap
-    # --AccessControlUpgradeable---
-    # 101:  _roles
-    # 102:  __gap
-    # ...   __gap
-    # 150:  __gap
-    # AccessControlEnumerableUpgradeable
-    # 151:  _roleMembers
-    # 152:  __gap
-    # ...   __gap
-    # 200:  __gap
-    # ---------TokenManager---------
-    # 201:  messageProxy
-    # 202:  tokenManagerLinker
-    # 203:  communityLocker
-    # 204:  schainHash
-    # 205:  depositBox, automaticDeploy
-    # 206:  tokenManagers
+    DEFAULT_ADMIN_ROLE = constants.DEFAULT_ADMIN_ROLE
+    AUTOMATIC_DEPLOY_ROLE = constants.AUTOMATIC_DEPLOY_ROLE
+    TOKEN_REGISTRAR_ROLE = constants.TOKEN_REGISTRAR_ROLE
+    ROLE_NAMES = ('DEFAULT_ADMIN_ROLE', 'AUTOMATIC_DEPLOY_ROLE', 'TOKEN_REGISTRAR_ROLE')
 
-    INITIALIZED_SLOT = 0
-    ROLES_SLOT = 101
-    ROLE_MEMBERS_SLOT = 151
-    MESSAGE_PROXY_SLOT = 201
-    TOKEN_MANAGER_LINKER_SLOT = Generator.next_slot(MESSAGE_PROXY_SLOT)
-    COMMUNITY_LOCKER_SLOT = Generator.next_slot(TOKEN_MANAGER_LINKER_SLOT)
-    SCHAIN_HASH_SLOT = Generator.next_slot(COMMUNITY_LOCKER_SLOT)
-    DEPOSIT_BOX_SLOT = Generator.next_slot(SCHAIN_HASH_SLOT)
-    AUTOMATIC_DEPLOY_SLOT = DEPOSIT_BOX_SLOT
-    TOKEN_MANAGERS_SLOT = Generator.next_slot(AUTOMATIC_DEPLOY_SLOT)
-
-    def __init__(self):
-        generator = TokenManagerGenerator.from_hardhat_artifact(
-            join(dirname(__file__), '..', 'artifacts', self.ARTIFACT_FILENAME),
-            join(dirname(__file__), '..', 'artifacts', self.META_FILENAME))
-        super().__init__(bytecode=generator.bytecode, abi=generator.abi, meta=generator.meta)
+    INITIALIZED_SLOT = TOKEN_MANAGER['_initialized']
+    ROLES_SLOT = TOKEN_MANAGER['_roles']
+    ROLE_MEMBERS_SLOT = TOKEN_MANAGER['_roleMembers']
+    MESSAGE_PROXY_SLOT = TOKEN_MANAGER['messageProxy']
+    TOKEN_MANAGER_LINKER_SLOT = TOKEN_MANAGER['tokenManagerLinker']
+    COMMUNITY_LOCKER_SLOT = TOKEN_MANAGER['communityLocker']
+    SCHAIN_HASH_SLOT = TOKEN_MANAGER['schainHash']
+    DEPOSIT_BOX_SLOT = TOKEN_MANAGER['depositBox']
+    AUTOMATIC_DEPLOY_SLOT = TOKEN_MANAGER['automaticDeploy']
+    AUTOMATIC_DEPLOY_OFFSET = TOKEN_MANAGER_OFFSETS['automaticDeploy']
+    TOKEN_MANAGERS_SLOT = TOKEN_MANAGER['tokenManagers']
+    # mappings of clones are declared by token managers of tokens
+    CLONES_SLOT: Optional[int] = None
+    ADDED_CLONES_SLOT: Optional[int] = None
 
     @classmethod
-    def generate_storage(cls, **kwargs) -> Dict[str, str]:
-        deployer_address = kwargs['deployer_address']
-        schain_name = kwargs['schain_name']
-        deposit_box_address = kwargs['deposit_box_address']
-        storage: Dict[str, str] = {}
-        roles_slots = cls.RolesSlots(roles=cls.ROLES_SLOT, role_members=cls.ROLE_MEMBERS_SLOT)
-        
+    def _write_shared_storage(cls, storage: StorageBuilder) -> None:
         cls._write_uint256(storage, cls.INITIALIZED_SLOT, 1)
-        cls._setup_role(storage, roles_slots, cls.DEFAULT_ADMIN_ROLE, [deployer_address])
-        cls._setup_role(storage, roles_slots, cls.AUTOMATIC_DEPLOY_ROLE, [deployer_address])
-        cls._setup_role(storage, roles_slots, cls.TOKEN_REGISTRAR_ROLE, [deployer_address])
         cls._write_address(storage, cls.MESSAGE_PROXY_SLOT, MESSAGE_PROXY_FOR_SCHAIN_ADDRESS)
         cls._write_address(storage, cls.TOKEN_MANAGER_LINKER_SLOT, TOKEN_MANAGER_LINKER_ADDRESS)
         cls._write_address(storage, cls.COMMUNITY_LOCKER_SLOT, COMMUNITY_LOCKER_ADDRESS)
-        cls._write_bytes32(storage, cls.SCHAIN_HASH_SLOT, Web3.solidity_keccak(['string'], [schain_name]))
+
+    @classmethod
+    def _write_schain_storage(cls, storage: StorageBuilder, **kwargs) -> None:
+        deployer_address = kwargs['deployer_address']
+        schain_name = kwargs['schain_name']
+        deposit_box_address = kwargs['deposit_box_address']
+
+        cls._setup_roles(storage, {
+            cls.DEFAULT_ADMIN_ROLE: [deployer_address],
+            cls.AUTOMATIC_DEPLOY_ROLE: [deployer_address],
+            cls.TOKEN_REGISTRAR_ROLE: [deployer_address]
+        }, kwargs.get('role_members'))
+        cls._write_bytes32(storage, cls.SCHAIN_HASH_SLOT, keccak256(schain_name.encode()))
         cls._write_address(storage, cls.DEPOSIT_BOX_SLOT, deposit_box_address)
-        
-        return storage
+        if kwargs.get('token_clones'):
+            cls._write_token_clones(storage, kwargs['token_clones'])
+        if kwargs.get('peer_schains'):
+            cls._write_token_managers(
+                storage, schain_name, kwargs['peer_schains'], kwargs['peer_token_manager_address'])
+
+    @classmethod
+    def _write_token_managers(
+            cls,
+            storage: StorageBuilder,
+            schain_name: str,
+            peer_schains: Sequence[str],
+            token_manager_address: str) -> None:
+        """Link token managers of the peer schains as TokenManagerLinker.connectSchain does.
+
+        Token managers are predeployed, so a peer token manager has the same address
+        """
+        for token_manager_slot in slots.mapping_value_slots(
+                cls.TOKEN_MANAGERS_SLOT, cls._peer_schain_hashes(schain_name, peer_schains)):
+            cls._write_address(storage, token_manager_slot, token_manager_address)
+
+    @classmethod
+    def _write_token_clones(cls, storage: StorageBuilder, token_clones: Sequence[Sequence[str]]) -> None:
+        """Register (mainnet token, clone on the schain) pairs as add...TokenByOwner does"""
+        if cls.CLONES_SLOT is None:
+            raise ValueError(f'{cls.__name__} does not have clones of tokens')
+        token_keys = [slots.address_key(token) for token, _ in token_clones]
+        clone_keys = [slots.address_key(clone) for _, clone in token_clones]
+        for keys, description in ((token_keys, 'mainnet token'), (clone_keys, 'clone')):
+            if len(set(keys)) != len(keys):
+                raise ValueError(f'The same {description} is registered several times')
+            if bytes(32) in keys:
+                raise ValueError(f'Zero address can not be a {description}')
+        mainnet_clones_slot = slots.mapping_value_slot(cls.CLONES_SLOT, constants.MAINNET_HASH)
+        for (_, clone), clone_slot, added_clone_slot in zip(
+                token_clones,
+                slots.mapping_value_slots(mainnet_clones_slot, token_keys),
+                slots.mapping_value_slots(cls.ADDED_CLONES_SLOT, clone_keys)):
+            cls._write_address(storage, clone_slot, clone)
+            cls._write_uint256(storage, added_clone_slot, 1)
 
 
 class UpgradeableTokenManagerGenerator(UpgradeableContractGenerator):
@@ -1,5 +1,5 @@
-from predeployed_generator.upgradeable_contract_generator import UpgradeableContractGenerator
-
+from ..storage_layout import TOKEN_MANAGER_ERC1155
+from .base import UpgradeableContractGenerator
 from .token_manager import TokenManagerGenerator
 
 
@@ -7,36 +7,8 @@ class TokenManagerErc1155Generator(TokenManagerGenerator):
     ARTIFACT_FILENAME = "TokenManagerERC1155.json"
     META_FILENAME = "TokenManagerERC1155.meta.json"
 
-    # ---------- storage ----------
-    # --------Initializable--------
-    # 0:    _initialized, _initializing;
-    # -----ContextUpgradeable------
-    # 1:    __gap
-    # ...   __gap
-    # 50:   __gap
-    # ------ERC165Upgradeable------
-    # 51:   __gap
-    # ...   __gap
-    # 100:  __gap
-    # --AccessControlUpgradeable---
-    # 101:  _roles
-    # 102:  __gap
-    # ...   __gap
-    # 150:  __gap
-    # AccessControlEnumerableUpgradeable
-    # 151:  _roleMembers
-    # 152:  __gap
-    # ...   __gap
-    # 200:  __gap
-    # ---------TokenManager---------
-    # 201:  messageProxy
-    # 202:  tokenManagerLinker
-    # 203:  communityLocker
-    # 204:  schainHash
-    # 205:  depositBox, automaticDeploy
-    # 206:  tokenManagers
-    # ------TokenManagerERC1155------
-    # 207:  clonesErc1155
+    CLONES_SLOT = TOKEN_MANAGER_ERC1155['clonesErc1155']
+    ADDED_CLONES_SLOT = TOKEN_MANAGER_ERC1155['addedClones']
 
     def __init__(self):
         super().__init__()
@@ -0,0 +1,304 @@
+"""diff.py
+
+Structural diff of two allocations of predeployed contracts.
+
+Storage of every account is converted into a list of (slot, value) pairs
+sorted by the integer slot and the lists of both allocations are compared by a linear merge,
+so the cost grows linearly with the amount of slots after sorting.
+Accounts with equal storage are skipped without sorting.
+Values are compared as integers, so '0x01' and '0x1' are equal.
+
+Slots of IMA predeployed contracts are labeled with names of state variables
+from storage_layout.py, values of mappings with constant keys
+('_roles[DEFAULT_ADMIN_ROLE]'), elements of arrays with known data slots
+('_roleMembers[DEFAULT_ADMIN_ROLE][0]') and EIP-1967 slots of proxies.
+
+Usage:
+    python -m ima_predeployed.diff old.json new.json [target_key] [--json]
+
+Both files contain allocations ({address: account}) or genesis with allocations under target_key.
+Exit status is 1 if the allocations differ, like diff(1).
+
+Functions:
+    diff_allocations
+    format_diff
+    main
+
+Classes:
+    SlotChange
+    AccountDiff
+"""
+
+import json
+import sys
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from . import addresses, constants, slots, storage_layout
+
+ADDED = 'added'
+REMOVED = 'removed'
+CHANGED = 'changed'
+# elements of arrays further from the data slot are not labeled
+MAX_LABELED_ARRAY_INDEX = 1 << 32
+# mappings which values are listed in storage_layout.MAPPING_VALUE_SLOTS
+# (see MAPPING_KEYS in scripts/generate_storage_layout.py)
+_CONSTANT_KEY_MAPPINGS = {'_roles', '_roleMembers', 'connectedChains', '_registryContracts', 'timeLimitPerMessage'}
+_ROLE_MAPPINGS = {'_roles', '_roleMembers'}
+# layouts of contracts which are not in storage_layout.py
+_EXTRA_LAYOUTS = {
+    'PROXY_ADMIN': {'_owner': 0}
+}
+
+
+class SlotChange(NamedTuple):
+    """Slot which is added (old is None), removed (new is None) or changed"""
+    slot: int
+    label: Optional[str]
+    old: Optional[str]
+    new: Optional[str]
+
+
+class AccountDiff(NamedTuple):
+    """Difference of one account. Fields which did not change are None"""
+    address: str
+    status: str
+    code_hash: Optional[Tuple[Optional[str], Optional[str]]]
+    balance: Optional[Tuple[Optional[str], Optional[str]]]
+    nonce: Optional[Tuple[Optional[str], Optional[str]]]
+    storage: List[SlotChange]
+
+    def to_dict(self) -> dict:
+        return {
+            'address': self.address,
+            'status': self.status,
+            'code_hash': self.code_hash,
+            'balance': self.balance,
+            'nonce': self.nonce,
+            'storage': [{**change._asdict(), 'slot': hex(change.slot)} for change in self.storage]
+        }
+
+
+def diff_allocations(old: Dict[str, dict], new: Dict[str, dict], label: bool = True) -> List[AccountDiff]:
+    """Return differences of accounts in the order of the new allocations followed by removed accounts.
+
+    Raises ValueError if a storage has several keys of one slot like '0x01' and '0x1'
+    """
+    old_accounts = {address.lower(): (address, account) for address, account in old.items()}
+    new_addresses = set()
+    diffs = []
+    for address, account in new.items():
+        new_addresses.add(address.lower())
+        _, old_account = old_accounts.get(address.lower(), (address, None))
+        account_diff = _diff_account(address, old_account, account, label)
+        if account_diff is not None:
+            diffs.append(account_diff)
+    for lower_address, (address, account) in old_accounts.items():
+        if lower_address not in new_addresses:
+            diffs.append(_diff_account(address, account, None, label))
+    return diffs
+
+
+def format_diff(diffs: List[AccountDiff]) -> Iterator[str]:
+    """Yield lines of human readable report"""
+    for account_diff in diffs:
+        yield f'{account_diff.address} {account_diff.status}'
+        for field in ('code_hash', 'balance', 'nonce'):
+            change = getattr(account_diff, field)
+            if change is not None:
+                yield f'    {field}: {change[0]} -> {change[1]}'
+        for change in account_diff.storage:
+            slot = hex(change.slot) if change.label is None else f'{change.slot:#x} ({change.label})'
+            if change.old is None:
+                yield f'    + {slot}: {change.new}'
+            elif change.new is None:
+                yield f'    - {slot}: {change.old}'
+            else:
+                yield f'    ~ {slot}: {change.old} -> {change.new}'
+
+
+def main() -> None:
+    """Main function"""
+    import argparse  # pylint: disable=import-outside-toplevel
+    parser = argparse.ArgumentParser(description='Compare two allocations of predeployed contracts')
+    parser.add_argument('old', help='path to the old allocations or genesis')
+    parser.add_argument('new', help='path to the new allocations or genesis')
+    parser.add_argument('target_key', nargs='?', default='alloc',
+                        help='key of allocations in genesis files. "alloc" by default')
+    parser.add_argument('--json', action='store_true', help='print the diff as JSON')
+    args = parser.parse_args()
+
+    diffs = diff_allocations(_load_allocations(args.old, args.target_key), _load_allocations(args.new, args.target_key))
+    if args.json:
+        json.dump([account_diff.to_dict() for account_diff in diffs], sys.stdout, indent=4)
+        sys.stdout.write('\n')
+    else:
+        for line in format_diff(diffs):
+            print(line)
+    sys.exit(1 if diffs else 0)
+
+
+# private
+
+def _load_allocations(path: str, target_key: str) -> Dict[str, dict]:
+    with open(path, encoding='utf-8') as allocations_file:
+        allocations = json.load(allocations_file)
+    if isinstance(allocations.get(target_key), dict):
+        return allocations[target_key]
+    return allocations
+
+
+def _diff_account(
+        address: str,
+        old: Optional[dict],
+        new: Optional[dict],
+        label: bool) -> Optional[AccountDiff]:
+    status = ADDED if old is None else REMOVED if new is None else CHANGED
+    old = old or {}
+    new = new or {}
+    code_hash = None
+    if old.get('code') != new.get('code'):
+        code_hash = (_code_hash(old.get('code')), _code_hash(new.get('code')))
+    balance = _field_change(old.get('balance'), new.get('balance'))
+    nonce = _field_change(old.get('nonce'), new.get('nonce'))
+    old_storage = old.get('storage', {})
+    new_storage = new.get('storage', {})
+    storage = [] if old_storage == new_storage else _diff_storage(
+        old_storage, new_storage, _labels(address.lower()) if label else None)
+    if status == CHANGED and code_hash is None and balance is None and nonce is None and not storage:
+        return None
+    return AccountDiff(address, status, code_hash, balance, nonce, storage)
+
+
+def _diff_storage(old: Dict[str, str], new: Dict[str, str], labels: Optional['_SlotLabels']) -> List[SlotChange]:
+    old_items = _sorted_slots(old)
+    new_items = _sorted_slots(new)
+    changes = []
+    old_index = new_index = 0
+    while old_index < len(old_items) or new_index < len(new_items):
+        if new_index == len(new_items) or (
+                old_index < len(old_items) and old_items[old_index][0] < new_items[new_index][0]):
+            slot, old_value = old_items[old_index]
+            changes.append(SlotChange(slot, labels and labels.label(slot), old_value, None))
+            old_index += 1
+        elif old_index == len(old_items) or new_items[new_index][0] < old_items[old_index][0]:
+            slot, new_value = new_items[new_index]
+            changes.append(SlotChange(slot, labels and labels.label(slot), None, new_value))
+            new_index += 1
+        else:
+            slot, old_value = old_items[old_index]
+            new_value = new_items[new_index][1]
+            if old_value != new_value and int(old_value, 16) != int(new_value, 16):
+                changes.append(SlotChange(slot, labels and labels.label(slot), old_value, new_value))
+            old_index += 1
+            new_index += 1
+    return changes
+
+
+def _sorted_slots(storage: Dict[str, str]) -> List[Tuple[int, str]]:
+    items = [(int(slot, 16), value) for slot, value in storage.items()]
+    items.sort(key=lambda item: item[0])
+    for (slot, _), (next_slot, _) in zip(items, items[1:]):
+        if slot == next_slot:
+            raise ValueError(f'Slot {slot:#x} has several keys in the storage')
+    return items
+
+
+def _field_change(old: Optional[str], new: Optional[str]) -> Optional[Tuple[Optional[str], Optional[str]]]:
+    if old == new or (old is not None and new is not None and int(old, 16) == int(new, 16)):
+        return None
+    return old, new
+
+
+def _code_hash(code: Optional[str]) -> Optional[str]:
+    if code is None:
+        return None
+    return '0x' + slots.keccak256(bytes.fromhex(code[2:] if code.startswith('0x') else code)).hex()
+
+
+class _SlotLabels:
+    """Names of known slots of one contract"""
+
+    def __init__(self, names: Dict[int, str]):
+        self._names = names
+        # data slots of arrays and labels of the arrays sorted by the data slot
+        arrays = sorted(
+            (data_slot, names[array_slot])
+            for array_slot, data_slot in storage_layout.ARRAY_DATA_SLOTS.items() if array_slot in names)
+        self._data_slots = [data_slot for data_slot, _ in arrays]
+        self._array_names = [name for _, name in arrays]
+
+    def label(self, slot: int) -> Optional[str]:
+        if slot in self._names:
+            return self._names[slot]
+        position = bisect_right(self._data_slots, slot) - 1
+        if position >= 0 and slot - self._data_slots[position] < MAX_LABELED_ARRAY_INDEX:
+            return f'{self._array_names[position]}[{slot - self._data_slots[position]}]'
+        return None
+
+
+@lru_cache(maxsize=None)
+def _labels(address: str) -> Optional[_SlotLabels]:
+    contract = _contracts().get(address)
+    if contract is None:
+        return None
+    layout_name, is_proxy = contract
+    names: Dict[int, str] = {}
+    if is_proxy:
+        names.update(_proxy_slots())
+    if layout_name is None:
+        return _SlotLabels(names)
+    layout = _EXTRA_LAYOUTS.get(layout_name) or getattr(storage_layout, layout_name)
+    mappings = {}
+    for variable, slot in layout.items():
+        names[slot] = f'{names[slot]}/{variable}' if slot in names else variable
+        if variable in _CONSTANT_KEY_MAPPINGS:
+            mappings[slot] = variable
+    for (mapping_slot, key), value_slot in storage_layout.MAPPING_VALUE_SLOTS.items():
+        if mapping_slot in mappings:
+            variable = mappings[mapping_slot]
+            key_name = _constant_names(variable in _ROLE_MAPPINGS).get(key, '0x' + key.hex())
+            names[value_slot] = f'{variable}[{key_name}]'
+    return _SlotLabels(names)
+
+
+@lru_cache(maxsize=None)
+def _contracts() -> Dict[str, Tuple[Optional[str], bool]]:
+    """Return lowercase address => (name of the layout in storage_layout.py, is proxy)"""
+    contracts: Dict[str, Tuple[Optional[str], bool]] = {}
+    for name in dir(addresses):
+        if not name.endswith('_ADDRESS'):
+            continue
+        address = getattr(addresses, name).lower()
+        if name.endswith('_IMPLEMENTATION_ADDRESS'):
+            layout_name = name[:-len('_IMPLEMENTATION_ADDRESS')]
+            is_proxy = False
+        else:
+            layout_name = name[:-len('_ADDRESS')]
+            is_proxy = name != 'PROXY_ADMIN_ADDRESS'
+        known_layout = layout_name in _EXTRA_LAYOUTS or hasattr(storage_layout, layout_name)
+        contracts[address] = (layout_name if known_layout else None, is_proxy)
+    return contracts
+
+
+@lru_cache(maxsize=None)
+def _proxy_slots() -> Dict[int, str]:
+    # slots of EIP-1967 proxy are keccak256 of the name minus 1
+    return {
+        int.from_bytes(slots.keccak256(f'eip1967.proxy.{name}'.encode()), 'big') - 1: f'eip1967.{name}'
+        for name in ('implementation', 'admin', 'rollback')
+    }
+
+
+@lru_cache(maxsize=None)
+def _constant_names(roles: bool) -> Dict[bytes, str]:
+    # DEFAULT_ADMIN_ROLE and ANY_SCHAIN are both zero, so roles are named separately
+    return {
+        value: name for name, value in vars(constants).items()
+        if name.isupper() and isinstance(value, bytes) and name.endswith('_ROLE') == roles
+    }
+
+
+if __name__ == '__main__':
+    main()
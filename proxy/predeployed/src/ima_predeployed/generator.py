@@ -1,25 +1,10 @@
 import json
 import os
+from collections import deque
+from copy import deepcopy
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 
-from predeployed_generator.openzeppelin.proxy_admin_generator import ProxyAdminGenerator
-
-from .contracts.erc1155_on_chain import Erc1155OnChainGenerator
-from .contracts.erc20_on_chain import Erc20OnChainGenerator
-from .contracts.erc721_on_chain import Erc721OnChainGenerator
-from .contracts.eth_erc20 import UpgradeableEthErc20Generator, EthErc20Generator
-from .contracts.token_manager_erc20 import UpgradeableTokenManagerErc20Generator, TokenManagerErc20Generator
-from .contracts.token_manager_erc721 import UpgradeableTokenManagerErc721Generator, TokenManagerErc721Generator
-from .contracts.token_manager_erc1155 import UpgradeableTokenManagerErc1155Generator, TokenManagerErc1155Generator
-from .contracts.token_manager_erc721_with_metadata import (
-    UpgradeableTokenManagerErc721WithMetadataGenerator as UpgradeableTokenManagerErc721WMGenerator,
-    TokenManagerErc721WithMetadataGenerator as TokenManagerErc721WMGenerator
-)
-from .contracts.token_manager_eth import UpgradeableTokenManagerEthGenerator, TokenManagerEthGenerator
-from .contracts.token_manager_linker import UpgradeableTokenManagerLinkerGenerator, TokenManagerLinkerGenerator
-from .contracts.community_locker import UpgradeableCommunityLockerGenerator, CommunityLockerGenerator
-from .contracts.key_storage import UpgradeableKeyStorageGenerator, KeyStorageGenerator
-from .contracts.message_proxy_for_schain import UpgradeableMessageProxyForSchainGenerator, \
-    MessageProxyForSchainGenerator
 from .addresses import (
     PROXY_ADMIN_ADDRESS, MESSAGE_PROXY_FOR_SCHAIN_ADDRESS,
     MESSAGE_PROXY_FOR_SCHAIN_IMPLEMENTATION_ADDRESS, KEY_STORAGE_IMPLEMENTATION_ADDRESS,
@@ -32,115 +17,503 @@ from .addresses import (
     ETH_ERC20_ADDRESS, TOKEN_MANAGER_ERC721_WITH_METADATA_IMPLEMENTATION_ADDRESS, TOKEN_MANAGER_ERC721_WITH_METADATA_ADDRESS
 )
 
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+    from .allocation_cache import AllocationCache
+    from .profiling import GenerationStats
+    from .snapshot import Balance
+
+_QUEUE_SIZE_PER_WORKER = 4
+
+# contract name => role name => additional members of the role
+RoleMembers = Dict[str, Dict[str, List[str]]]
+# contract name => (mainnet token, clone on the schain) pairs
+TokenClones = Dict[str, List[Tuple[str, str]]]
+# token managers which have clones of mainnet tokens
+TOKEN_CLONE_CONTRACTS = (
+    'token_manager_erc20', 'token_manager_erc721', 'token_manager_erc1155', 'token_manager_erc721_with_metadata')
+# arguments of generators which are iterated once and are not cached
+_STREAMED_ARGUMENTS = ('balances', 'active_users')
+# arguments of generate_contracts which every schain config has
+_SCHAIN_ARGUMENTS = ('owner_address', 'schain_name', 'contracts_on_mainnet')
+# contracts which register connected schains
+CONNECTED_CHAINS_CONTRACTS = ('message_proxy_for_schain', 'token_manager_eth') + TOKEN_CLONE_CONTRACTS
+
+
+class GenesisOptions(NamedTuple):
+    """Optional state of predeployed contracts at genesis.
+
+    Fields are the optional arguments of generate_contracts with the same meaning
+    """
+    role_members: Optional[RoleMembers] = None
+    eth_balances: Optional[Iterable['Balance']] = None
+    token_clones: Optional[TokenClones] = None
+    peer_schains: Optional[List[str]] = None
+    active_users: Optional[Iterable[str]] = None
+    time_limits_per_message: Optional[Dict[str, int]] = None
+    extra_contracts: Optional[Dict[str, List[str]]] = None
+
+
+def _import_contracts():
+    # generators depend on web3 through predeployed_generator
+    # so they are imported on the first use to keep the module import fast
+    from . import contracts  # pylint: disable=import-outside-toplevel
+    return contracts
+
+
+def _create_generators() -> dict:
+    contracts = _import_contracts()
+    return {
+        'proxy_admin': contracts.ProxyAdminGenerator(),
+        'message_proxy_for_schain': contracts.UpgradeableMessageProxyForSchainGenerator(),
+        'key_storage': contracts.UpgradeableKeyStorageGenerator(),
+        'community_locker': contracts.UpgradeableCommunityLockerGenerator(),
+        'token_manager_linker': contracts.UpgradeableTokenManagerLinkerGenerator(),
+        'token_manager_eth': contracts.UpgradeableTokenManagerEthGenerator(),
+        'token_manager_erc20': contracts.UpgradeableTokenManagerErc20Generator(),
+        'token_manager_erc721': contracts.UpgradeableTokenManagerErc721Generator(),
+        'token_manager_erc1155': contracts.UpgradeableTokenManagerErc1155Generator(),
+        'token_manager_erc721_with_metadata': contracts.UpgradeableTokenManagerErc721WMGenerator(),
+        'eth_erc20': contracts.UpgradeableEthErc20Generator()
+    }
+
+
+def _create_generators_measured(stats: Optional['GenerationStats']) -> dict:
+    if stats is None:
+        return _create_generators()
+    # artifacts are loaded by constructors of generators
+    with stats.measure('setup', 'generators'):
+        return _create_generators()
+
+
+def _upgradeable_contracts(
+        schain_name: str,
+        contracts_on_mainnet: dict,
+        options: GenesisOptions = GenesisOptions()) -> list:
+    message_proxy_arguments = {'schain_name': schain_name}
+    if options.extra_contracts:
+        message_proxy_arguments['extra_contracts'] = options.extra_contracts
+    community_locker_arguments = {
+        'schain_name': schain_name,
+        'community_pool_address': contracts_on_mainnet['community_pool_address']}
+    if options.active_users is not None:
+        community_locker_arguments['active_users'] = options.active_users
+    if options.time_limits_per_message:
+        community_locker_arguments['time_limits_per_message'] = options.time_limits_per_message
+    contracts = _add_role_members([
+        ('message_proxy_for_schain',
+         MESSAGE_PROXY_FOR_SCHAIN_ADDRESS,
+         MESSAGE_PROXY_FOR_SCHAIN_IMPLEMENTATION_ADDRESS,
+         message_proxy_arguments),
+        ('key_storage',
+         KEY_STORAGE_ADDRESS,
+         KEY_STORAGE_IMPLEMENTATION_ADDRESS,
+         {}),
+        ('community_locker',
+         COMMUNITY_LOCKER_ADDRESS,
+         COMMUNITY_LOCKER_IMPLEMENTATION_ADDRESS,
+         community_locker_arguments),
+        ('token_manager_linker',
+         TOKEN_MANAGER_LINKER_ADDRESS,
+         TOKEN_MANAGER_LINKER_IMPLEMENTATION_ADDRESS,
+         {'linker_address': contracts_on_mainnet['linker_address']}),
+        ('token_manager_eth',
+         TOKEN_MANAGER_ETH_ADDRESS,
+         TOKEN_MANAGER_ETH_IMPLEMENTATION_ADDRESS,
+         {'schain_name': schain_name,
+          'deposit_box_address': contracts_on_mainnet['deposit_box_eth_address']}),
+        ('token_manager_erc20',
+         TOKEN_MANAGER_ERC20_ADDRESS,
+         TOKEN_MANAGER_ERC20_IMPLEMENTATION_ADDRESS,
+         {'schain_name': schain_name,
+          'deposit_box_address': contracts_on_mainnet['deposit_box_erc20_address']}),
+        ('token_manager_erc721',
+         TOKEN_MANAGER_ERC721_ADDRESS,
+         TOKEN_MANAGER_ERC721_IMPLEMENTATION_ADDRESS,
+         {'schain_name': schain_name,
+          'deposit_box_address': contracts_on_mainnet['deposit_box_erc721_address']}),
+        ('token_manager_erc1155',
+         TOKEN_MANAGER_ERC1155_ADDRESS,
+         TOKEN_MANAGER_ERC1155_IMPLEMENTATION_ADDRESS,
+         {'schain_name': schain_name,
+          'deposit_box_address': contracts_on_mainnet['deposit_box_erc1155_address']}),
+        ('token_manager_erc721_with_metadata',
+         TOKEN_MANAGER_ERC721_WITH_METADATA_ADDRESS,
+         TOKEN_MANAGER_ERC721_WITH_METADATA_IMPLEMENTATION_ADDRESS,
+         {'schain_name': schain_name,
+          'deposit_box_address': contracts_on_mainnet['deposit_box_erc721_with_metadata_address']}),
+        ('eth_erc20',
+         ETH_ERC20_ADDRESS,
+         ETH_ERC20_IMPLEMENTATION_ADDRESS,
+         {} if options.eth_balances is None else {'balances': options.eth_balances})
+    ], options.role_members)
+    return _add_peer_schains(_add_token_clones(contracts, options.token_clones), options.peer_schains)
+
+
+def _add_role_members(contracts: list, role_members: Optional[RoleMembers]) -> list:
+    if not role_members:
+        return contracts
+    unknown_contracts = set(role_members) - {contract[0] for contract in contracts}
+    if unknown_contracts:
+        raise ValueError(f'Roles of {", ".join(sorted(unknown_contracts))} can not be set')
+    return [
+        (name, contract_address, implementation_address,
+         {**kwargs, 'role_members': role_members[name]} if role_members.get(name) else kwargs)
+        for name, contract_address, implementation_address, kwargs in contracts
+    ]
+
+
+def _add_token_clones(contracts: list, token_clones: Optional[TokenClones]) -> list:
+    if not token_clones:
+        return contracts
+    unknown_contracts = set(token_clones) - set(TOKEN_CLONE_CONTRACTS)
+    if unknown_contracts:
+        raise ValueError(f'Clones of tokens can not be registered in {", ".join(sorted(unknown_contracts))}')
+    return [
+        (name, contract_address, implementation_address,
+         {**kwargs, 'token_clones': token_clones[name]} if token_clones.get(name) else kwargs)
+        for name, contract_address, implementation_address, kwargs in contracts
+    ]
+
+
+def _add_peer_schains(contracts: list, peer_schains: Optional[List[str]]) -> list:
+    if not peer_schains:
+        return contracts
+    result = []
+    for name, contract_address, implementation_address, kwargs in contracts:
+        if name in CONNECTED_CHAINS_CONTRACTS:
+            kwargs = {**kwargs, 'peer_schains': peer_schains}
+            if name != 'message_proxy_for_schain':
+                # token managers of all schains are predeployed at the same addresses
+                kwargs['peer_token_manager_address'] = contract_address
+        result.append((name, contract_address, implementation_address, kwargs))
+    return result
+
+
+def _generate_allocation(generators: dict, name: str, cache: Optional['AllocationCache'], **kwargs) -> dict:
+    if cache is None:
+        return generators[name].generate_allocation(**kwargs)
+    if any(argument in kwargs for argument in _STREAMED_ARGUMENTS):
+        # streamed snapshots can not be keys of the cache
+        cache.recomputed.append(name)
+        return generators[name].generate_allocation(**kwargs)
+    return cache.get_allocation(name, generators[name], **kwargs)
+
+
+def _generate_contracts(
+        generators: dict,
+        owner_address: str,
+        schain_name: str,
+        contracts_on_mainnet: dict,
+        cache: Optional['AllocationCache'] = None,
+        stats: Optional['GenerationStats'] = None,
+        options: GenesisOptions = GenesisOptions()) -> dict:
+    if cache is not None:
+        cache.recomputed = []
+    allocations = {}
+    for name, kwargs in _allocation_arguments(owner_address, schain_name, contracts_on_mainnet, options):
+        if stats is None:
+            allocations.update(_generate_allocation(generators, name, cache, **kwargs))
+        else:
+            allocations.update(_measure_allocation(stats, generators, name, cache, kwargs))
+    return allocations
+
+
+def _measure_allocation(
+        stats: 'GenerationStats',
+        generators: dict,
+        name: str,
+        cache: Optional['AllocationCache'],
+        kwargs: dict) -> dict:
+    recomputed = 0 if cache is None else len(cache.recomputed)
+    with stats.measure('contracts', name) as contract_stats:
+        allocation = _generate_allocation(generators, name, cache, **kwargs)
+    contract_stats.add_allocation(allocation)
+    if cache is not None and len(cache.recomputed) == recomputed:
+        contract_stats.cached += 1
+    return allocation
+
+
+def _allocation_arguments(
+        owner_address: str,
+        schain_name: str,
+        contracts_on_mainnet: dict,
+        options: GenesisOptions = GenesisOptions()) -> list:
+    return [('proxy_admin', {'contract_address': PROXY_ADMIN_ADDRESS, 'owner_address': owner_address})] + [
+        (name, {
+            'proxy_admin_address': PROXY_ADMIN_ADDRESS,
+            'contract_address': contract_address,
+            'implementation_address': implementation_address,
+            'deployer_address': owner_address,
+            **kwargs
+        })
+        for name, contract_address, implementation_address, kwargs in _upgradeable_contracts(
+            schain_name, contracts_on_mainnet, options)
+    ]
+
+
+def _generate_contracts_concurrently(
+        executor: 'Executor',
+        owner_address: str,
+        schain_name: str,
+        contracts_on_mainnet: dict,
+        cache: Optional['AllocationCache'] = None,
+        stats: Optional['GenerationStats'] = None,
+        options: GenesisOptions = GenesisOptions()) -> dict:
+    cache_path = None if cache is None else cache.path
+    arguments = _allocation_arguments(owner_address, schain_name, contracts_on_mainnet, options)
+    futures = [
+        executor.submit(_generate_allocation_in_worker, name, cache_path, kwargs, stats is not None)
+        for name, kwargs in arguments
+    ]
+    # results are merged in the order of contracts, not in the order of completion
+    allocations = {}
+    recomputed = []
+    for (name, _), future in zip(arguments, futures):
+        allocation, is_recomputed, worker_stats = future.result()
+        allocations.update(allocation)
+        if is_recomputed:
+            recomputed.append(name)
+        if stats is not None:
+            stats.merge(worker_stats)
+    if cache is not None:
+        cache.recomputed = recomputed
+    return allocations
+
 
 def generate_contracts(
         owner_address: str,
         schain_name: str,
-        contracts_on_mainnet: dict) -> dict:
-    proxy_admin = ProxyAdminGenerator().generate_allocation(
-        contract_address=PROXY_ADMIN_ADDRESS,
-        owner_address=owner_address
-    )
-
-    message_proxy_for_schain = UpgradeableMessageProxyForSchainGenerator().generate_allocation(
-        proxy_admin_address=PROXY_ADMIN_ADDRESS,
-        contract_address=MESSAGE_PROXY_FOR_SCHAIN_ADDRESS,
-        implementation_address=MESSAGE_PROXY_FOR_SCHAIN_IMPLEMENTATION_ADDRESS,
-        deployer_address=owner_address,
-        schain_name=schain_name
-    )
-
-    key_storage = UpgradeableKeyStorageGenerator().generate_allocation(
-        proxy_admin_address=PROXY_ADMIN_ADDRESS,
-        contract_address=KEY_STORAGE_ADDRESS,
-        implementation_address=KEY_STORAGE_IMPLEMENTATION_ADDRESS,
-        deployer_address=owner_address
-    )
-
-    community_locker = UpgradeableCommunityLockerGenerator().generate_allocation(
-        proxy_admin_address=PROXY_ADMIN_ADDRESS,
-        contract_address=COMMUNITY_LOCKER_ADDRESS,
-        implementation_address=COMMUNITY_LOCKER_IMPLEMENTATION_ADDRESS,
-        deployer_address=owner_address,
-        schain_name=schain_name,
-        community_pool_address=contracts_on_mainnet['community_pool_address']
-    )
-
-    token_manager_linker = UpgradeableTokenManagerLinkerGenerator().generate_allocation(
-        proxy_admin_address=PROXY_ADMIN_ADDRESS,
-        contract_address=TOKEN_MANAGER_LINKER_ADDRESS,
-        implementation_address=TOKEN_MANAGER_LINKER_IMPLEMENTATION_ADDRESS,
-        deployer_address=owner_address,
-        linker_address=contracts_on_mainnet['linker_address']
-    )
-
-    token_manager_eth = UpgradeableTokenManagerEthGenerator().generate_allocation(
-        proxy_admin_address=PROXY_ADMIN_ADDRESS,
-        contract_address=TOKEN_MANAGER_ETH_ADDRESS,
-        implementation_address=TOKEN_MANAGER_ETH_IMPLEMENTATION_ADDRESS,
-        deployer_address=owner_address,
-        schain_name=schain_name,
-        deposit_box_address=contracts_on_mainnet['deposit_box_eth_address']
-    )
-
-    token_manager_erc20 = UpgradeableTokenManagerErc20Generator().generate_allocation(
-        proxy_admin_address=PROXY_ADMIN_ADDRESS,
-        contract_address=TOKEN_MANAGER_ERC20_ADDRESS,
-        implementation_address=TOKEN_MANAGER_ERC20_IMPLEMENTATION_ADDRESS,
-        deployer_address=owner_address,
-        schain_name=schain_name,
-        deposit_box_address=contracts_on_mainnet['deposit_box_erc20_address']
-    )
-
-    token_manager_erc721 = UpgradeableTokenManagerErc721Generator().generate_allocation(
-        proxy_admin_address=PROXY_ADMIN_ADDRESS,
-        contract_address=TOKEN_MANAGER_ERC721_ADDRESS,
-        implementation_address=TOKEN_MANAGER_ERC721_IMPLEMENTATION_ADDRESS,
-        deployer_address=owner_address,
-        schain_name=schain_name,
-        deposit_box_address=contracts_on_mainnet['deposit_box_erc721_address']
-    )
-
-    token_manager_erc1155 = UpgradeableTokenManagerErc1155Generator().generate_allocation(
-        proxy_admin_address=PROXY_ADMIN_ADDRESS,
-        contract_address=TOKEN_MANAGER_ERC1155_ADDRESS,
-        implementation_address=TOKEN_MANAGER_ERC1155_IMPLEMENTATION_ADDRESS,
-        deployer_address=owner_address,
-        schain_name=schain_name,
-        deposit_box_address=contracts_on_mainnet['deposit_box_erc1155_address']
-    )
-
-    token_manager_erc1155_wm = UpgradeableTokenManagerErc721WMGenerator().generate_allocation(
-        proxy_admin_address=PROXY_ADMIN_ADDRESS,
-        contract_address=TOKEN_MANAGER_ERC721_WITH_METADATA_ADDRESS,
-        implementation_address=TOKEN_MANAGER_ERC721_WITH_METADATA_IMPLEMENTATION_ADDRESS,
-        deployer_address=owner_address,
-        schain_name=schain_name,
-        deposit_box_address=contracts_on_mainnet['deposit_box_erc721_with_metadata_address']
-    )
-
-    eth_erc20 = UpgradeableEthErc20Generator().generate_allocation(
-        proxy_admin_address=PROXY_ADMIN_ADDRESS,
-        contract_address=ETH_ERC20_ADDRESS,
-        implementation_address=ETH_ERC20_IMPLEMENTATION_ADDRESS,
-        deployer_address=owner_address
-    )
+        contracts_on_mainnet: dict,
+        *,
+        cache: Optional['AllocationCache'] = None,
+        executor: Optional['Executor'] = None,
+        role_members: Optional[RoleMembers] = None,
+        stats: Optional['GenerationStats'] = None,
+        eth_balances: Optional[Iterable['Balance']] = None,
+        token_clones: Optional[TokenClones] = None,
+        peer_schains: Optional[List[str]] = None,
+        active_users: Optional[Iterable[str]] = None,
+        time_limits_per_message: Optional[Dict[str, int]] = None,
+        extra_contracts: Optional[Dict[str, List[str]]] = None) -> dict:
+    """Generate allocations of IMA predeployed contracts.
+
+    All arguments but the owner, the schain name and the mainnet contracts are keyword-only.
+
+    `role_members` grants roles to additional accounts at genesis:
+    {contract name: {role name: [addresses]}}, for example
+    {'message_proxy_for_schain': {'EXTRA_CONTRACT_REGISTRAR_ROLE': [...]}}.
+    Roles which can be granted are listed in ROLE_NAMES of
+    MessageProxyForSchainGenerator, TokenManagerLinkerGenerator and TokenManagerGenerator.
+
+    If `cache` is passed allocations of contracts which inputs did not change
+    are loaded from it and `cache.recomputed` lists the generated contracts.
+
+    If `executor` is passed (ThreadPoolExecutor or ProcessPoolExecutor)
+    allocations of contracts are generated concurrently in it.
+    Generation is mostly python code so ProcessPoolExecutor scales with cores
+    while ThreadPoolExecutor only overlaps loading of cached allocations.
+    The result does not depend on the executor and the order of completion.
+
+    If `stats` (profiling.GenerationStats) is passed figures of every contract are added to it.
+
+    `eth_balances` pre-mints EthErc20 at genesis: an iterable of (holder address, amount),
+    for example snapshot.BalancesSnapshot which streams a CSV or JSON lines file.
+    It is iterated once in batches and `_totalSupply` is set to the sum of the amounts.
+    EthErc20 is always regenerated when balances are passed, even if `cache` is passed.
+    With an executor other than ThreadPoolExecutor the iterable is pickled,
+    so iterators like generators are rejected: pass a list or a BalancesSnapshot.
 
+    `token_clones` registers clones of mainnet tokens at genesis like add...TokenByOwner:
+    {contract name: [(mainnet token, clone on the schain), ...]} for contracts in TOKEN_CLONE_CONTRACTS.
+    Clones have to be deployed on the schain (for example predeployed in the same genesis)
+    and ERC20 clones must have zero total supply.
+
+    `peer_schains` connects schains at genesis like TokenManagerLinker.connectSchain:
+    every schain of the list is connected in MessageProxyForSchain
+    and its token managers are linked in token managers of this schain.
+    Peers have to connect this schain too, so pass every schain of a mesh the names of the others.
+
+    `active_users` activates users in CommunityLocker at genesis like messages of CommunityPool:
+    an iterable of addresses, for example snapshot.AddressesSnapshot which streams a file.
+    Like `eth_balances` it is iterated once in batches and bypasses `cache`.
+    `time_limits_per_message` sets timeLimitPerMessage of chains: {chain name: seconds},
+    'Mainnet' overrides the default of CommunityLocker.
+
+    `extra_contracts` registers contracts in MessageProxyForSchain
+    like registerExtraContract and registerExtraContractForAll: {chain: [addresses]}
+    where chain is a name, a 0x prefixed chain hash or 'ANY_SCHAIN' for all chains.
+    """
+    options = GenesisOptions(
+        role_members=role_members,
+        eth_balances=eth_balances,
+        token_clones=token_clones,
+        peer_schains=peer_schains,
+        active_users=active_users,
+        time_limits_per_message=time_limits_per_message,
+        extra_contracts=extra_contracts)
+    if executor is not None:
+        from concurrent.futures import ThreadPoolExecutor  # pylint: disable=import-outside-toplevel
+        if not isinstance(executor, ThreadPoolExecutor):
+            # arguments are pickled to be sent to other processes
+            _check_picklable(schain_name, options)
+        return _generate_contracts_concurrently(
+            executor, owner_address, schain_name, contracts_on_mainnet, cache=cache, stats=stats, options=options)
+    return _generate_contracts(
+        _create_generators_measured(stats), owner_address, schain_name, contracts_on_mainnet,
+        cache=cache, stats=stats, options=options)
+
+
+_worker_generators: Optional[dict] = None
+_worker_generators_lock = Lock()
+
+
+def _init_worker() -> None:
+    global _worker_generators  # pylint: disable=global-statement
+    contracts = _import_contracts()
+    _worker_generators = _create_generators()
+    for generator in _worker_generators.values():
+        implementation_generator = getattr(generator, 'implementation_generator', None)
+        if isinstance(implementation_generator, contracts.AccessControlEnumerableGenerator):
+            implementation_generator.generate_shared_storage()
+
+
+def _get_worker_generators() -> dict:
+    with _worker_generators_lock:
+        if _worker_generators is None:
+            _init_worker()
+    return _worker_generators
+
+
+def _generate_schain_contracts(
+        schain_arguments: dict,
+        profile: bool = False) -> Tuple[dict, Optional['GenerationStats']]:
+    stats = _create_stats() if profile else None
+    return _generate_contracts(_worker_generators, **schain_arguments, stats=stats), stats
+
+
+def _schain_arguments(schain_config: dict, pickled: bool = False) -> dict:
+    """Convert arguments of generate_contracts into keyword arguments of _generate_contracts.
+
+    Raises ValueError on unknown or missing arguments
+    and, if the arguments are sent to other processes, on iterators which can not be pickled
+    """
+    unknown_arguments = set(schain_config) - set(_SCHAIN_ARGUMENTS) - set(GenesisOptions._fields)
+    if unknown_arguments:
+        raise ValueError(f'Unknown schain config arguments: {", ".join(sorted(unknown_arguments))}')
+    missing_arguments = [argument for argument in _SCHAIN_ARGUMENTS if argument not in schain_config]
+    if missing_arguments:
+        raise ValueError(f'Missing schain config arguments: {", ".join(missing_arguments)}')
+    options = GenesisOptions(**{
+        argument: value for argument, value in schain_config.items() if argument in GenesisOptions._fields})
+    if pickled:
+        _check_picklable(schain_config['schain_name'], options)
     return {
-        **proxy_admin,
-        **message_proxy_for_schain,
-        **key_storage,
-        **community_locker,
-        **token_manager_linker,
-        **token_manager_eth,
-        **token_manager_erc20,
-        **token_manager_erc721,
-        **token_manager_erc1155,
-        **token_manager_erc1155_wm,
-        **eth_erc20
+        **{argument: schain_config[argument] for argument in _SCHAIN_ARGUMENTS},
+        'options': options
     }
 
 
+def _check_picklable(schain_name: str, options: GenesisOptions) -> None:
+    for argument in ('eth_balances', 'active_users'):
+        if isinstance(getattr(options, argument), Iterator):
+            raise ValueError(
+                f'{argument} of {schain_name} is an iterator which can not be sent to workers, '
+                'pass a list or a snapshot')
+
+
+def _generate_allocation_in_worker(
+        name: str,
+        cache_path: Optional[str],
+        kwargs: dict,
+        profile: bool = False) -> Tuple[dict, bool, Optional['GenerationStats']]:
+    generators = _get_worker_generators()
+    cache = None
+    if cache_path is not None:
+        from .allocation_cache import AllocationCache  # pylint: disable=import-outside-toplevel
+        # every task has its own cache object, the caller collects recomputed contracts
+        cache = AllocationCache(cache_path)
+    stats = None
+    if profile:
+        # figures are collected in the worker process and merged by the caller
+        stats = _create_stats()
+        allocation = _measure_allocation(stats, generators, name, cache, kwargs)
+    else:
+        allocation = _generate_allocation(generators, name, cache, **kwargs)
+    return allocation, cache is not None and bool(cache.recomputed), stats
+
+
+def _create_stats() -> 'GenerationStats':
+    from .profiling import GenerationStats  # pylint: disable=import-outside-toplevel
+    return GenerationStats()
+
+
+def generate_contracts_many(
+        schain_configs: Iterable[dict],
+        workers: int = 1,
+        stats: Optional['GenerationStats'] = None) -> Iterator[dict]:
+    """Generate predeployed contracts for many schains.
+
+    Every item of `schain_configs` is a dictionary of `generate_contracts` arguments:
+    `owner_address`, `schain_name`, `contracts_on_mainnet`
+    and optional `role_members`, `eth_balances`, `token_clones`, `peer_schains`,
+    `active_users`, `time_limits_per_message` and `extra_contracts`.
+    Other keys raise ValueError.
+
+    Generators and schain independent storage are prepared once per process.
+    If `workers` is greater than 1 schains are generated in a pool of processes.
+    Then `eth_balances` and `active_users` are pickled, so they must be lists or snapshots, not iterators.
+    Allocations are yielded in the order of `schain_configs`.
+    If `stats` is passed figures of all schains are added to it.
+    """
+    yield from _generate_many(schain_configs, workers, stats)
+
+
+def _generate_many(
+        schain_configs: Iterable[dict],
+        workers: int,
+        stats: Optional['GenerationStats'],
+        render: Optional[Callable[[dict], Any]] = None) -> Iterator[Any]:
+    """Yield allocations of schains in order of the configs.
+
+    `render` takes validated arguments of a schain and returns its allocations
+    if they can be produced without the generators or None otherwise
+    """
+    if workers <= 1:
+        generators = _create_generators_measured(stats)
+        for schain_config in schain_configs:
+            schain_arguments = _schain_arguments(schain_config)
+            allocations = None if render is None else render(schain_arguments)
+            if allocations is None:
+                allocations = _generate_contracts(generators, **schain_arguments, stats=stats)
+            yield allocations
+        return
+
+    from concurrent.futures import Future, ProcessPoolExecutor  # pylint: disable=import-outside-toplevel
+
+    def collect(result) -> Any:
+        if not isinstance(result, Future):
+            return result
+        allocations, worker_stats = result.result()
+        if stats is not None:
+            stats.merge(worker_stats)
+        return allocations
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        # rendered allocations wait in the queue with futures to keep the order
+        pending: deque = deque()
+        for schain_config in schain_configs:
+            schain_arguments = _schain_arguments(schain_config, pickled=True)
+            allocations = None if render is None else render(schain_arguments)
+            if allocations is None:
+                allocations = executor.submit(_generate_schain_contracts, schain_arguments, stats is not None)
+            pending.append(allocations)
+            if len(pending) >= workers * _QUEUE_SIZE_PER_WORKER:
+                yield collect(pending.popleft())
+        while pending:
+            yield collect(pending.popleft())
+
+
 def generate_abi_key(name: str, address: str, abi: list) -> dict:
     return {
         name + '_address': address,
@@ -148,84 +521,107 @@ def generate_abi_key(name: str, address: str, abi: list) -> dict:
     }
 
 
-def generate_abi() -> dict:
-    return {
-        **generate_abi_key(
-            'proxy_admin',
-            PROXY_ADMIN_ADDRESS,
-            ProxyAdminGenerator().get_abi()),
-        **generate_abi_key(
-            'message_proxy_chain',
-            MESSAGE_PROXY_FOR_SCHAIN_ADDRESS,
-            MessageProxyForSchainGenerator().get_abi()),
-        **generate_abi_key(
-            'key_storage',
-            KEY_STORAGE_ADDRESS,
-            KeyStorageGenerator().get_abi()),
-        **generate_abi_key(
-            'community_locker',
-            COMMUNITY_LOCKER_ADDRESS,
-            CommunityLockerGenerator().get_abi()),
-        **generate_abi_key(
-            'token_manager_linker',
-            TOKEN_MANAGER_LINKER_ADDRESS,
-            TokenManagerLinkerGenerator().get_abi()),
-        **generate_abi_key(
-            'token_manager_eth',
-            TOKEN_MANAGER_ETH_ADDRESS,
-            TokenManagerEthGenerator().get_abi()),
-        **generate_abi_key(
-            'token_manager_erc20',
-            TOKEN_MANAGER_ERC20_ADDRESS,
-            TokenManagerErc20Generator().get_abi()),
-        **generate_abi_key(
-            'token_manager_erc721',
-            TOKEN_MANAGER_ERC721_ADDRESS,
-            TokenManagerErc721Generator().get_abi()),
-        **generate_abi_key(
-            'token_manager_erc1155',
-            TOKEN_MANAGER_ERC1155_ADDRESS,
-            TokenManagerErc1155Generator().get_abi()),
-        **generate_abi_key(
-            'token_manager_erc721_with_metadata',
-            TOKEN_MANAGER_ERC721_WITH_METADATA_ADDRESS,
-            TokenManagerErc721WMGenerator().get_abi()),
-        **generate_abi_key(
-            'eth_erc20',
-            ETH_ERC20_ADDRESS,
-            EthErc20Generator().get_abi()),
-        **{
-            'ERC20OnChain_abi': Erc20OnChainGenerator().get_abi(),
-            'ERC721OnChain_abi': Erc721OnChainGenerator().get_abi(),
-            'ERC1155OnChain_abi': Erc1155OnChainGenerator().get_abi()
-        }
-    }
+# name in generate_abi output, address of the predeployed contract, generator class
+_ABI_CONTRACTS = [
+    ('proxy_admin', PROXY_ADMIN_ADDRESS, 'ProxyAdminGenerator'),
+    ('message_proxy_chain', MESSAGE_PROXY_FOR_SCHAIN_ADDRESS, 'MessageProxyForSchainGenerator'),
+    ('key_storage', KEY_STORAGE_ADDRESS, 'KeyStorageGenerator'),
+    ('community_locker', COMMUNITY_LOCKER_ADDRESS, 'CommunityLockerGenerator'),
+    ('token_manager_linker', TOKEN_MANAGER_LINKER_ADDRESS, 'TokenManagerLinkerGenerator'),
+    ('token_manager_eth', TOKEN_MANAGER_ETH_ADDRESS, 'TokenManagerEthGenerator'),
+    ('token_manager_erc20', TOKEN_MANAGER_ERC20_ADDRESS, 'TokenManagerErc20Generator'),
+    ('token_manager_erc721', TOKEN_MANAGER_ERC721_ADDRESS, 'TokenManagerErc721Generator'),
+    ('token_manager_erc1155', TOKEN_MANAGER_ERC1155_ADDRESS, 'TokenManagerErc1155Generator'),
+    ('token_manager_erc721_with_metadata', TOKEN_MANAGER_ERC721_WITH_METADATA_ADDRESS,
+     'TokenManagerErc721WMGenerator'),
+    ('eth_erc20', ETH_ERC20_ADDRESS, 'EthErc20Generator'),
+    ('ERC20OnChain', None, 'Erc20OnChainGenerator'),
+    ('ERC721OnChain', None, 'Erc721OnChainGenerator'),
+    ('ERC1155OnChain', None, 'Erc1155OnChainGenerator')
+]
 
 
-def generate_meta() -> dict:
-    return {
-        PROXY_ADMIN_ADDRESS: ProxyAdminGenerator().get_meta(),
-        MESSAGE_PROXY_FOR_SCHAIN_ADDRESS: UpgradeableMessageProxyForSchainGenerator().get_meta(),
-        MESSAGE_PROXY_FOR_SCHAIN_IMPLEMENTATION_ADDRESS: MessageProxyForSchainGenerator().get_meta(),
-        KEY_STORAGE_ADDRESS: UpgradeableKeyStorageGenerator().get_meta(),
-        KEY_STORAGE_IMPLEMENTATION_ADDRESS: KeyStorageGenerator().get_meta(),
-        COMMUNITY_LOCKER_ADDRESS: UpgradeableCommunityLockerGenerator().get_meta(),
-        COMMUNITY_LOCKER_IMPLEMENTATION_ADDRESS: CommunityLockerGenerator().get_meta(),
-        TOKEN_MANAGER_LINKER_ADDRESS: UpgradeableTokenManagerLinkerGenerator().get_meta(),
-        TOKEN_MANAGER_LINKER_IMPLEMENTATION_ADDRESS: TokenManagerLinkerGenerator().get_meta(),
-        TOKEN_MANAGER_ETH_ADDRESS: UpgradeableTokenManagerEthGenerator().get_meta(),
-        TOKEN_MANAGER_ETH_IMPLEMENTATION_ADDRESS: TokenManagerEthGenerator().get_meta(),
-        TOKEN_MANAGER_ERC20_ADDRESS: UpgradeableTokenManagerErc20Generator().get_meta(),
-        TOKEN_MANAGER_ERC20_IMPLEMENTATION_ADDRESS: TokenManagerErc20Generator().get_meta(),
-        TOKEN_MANAGER_ERC721_ADDRESS: UpgradeableTokenManagerErc721Generator().get_meta(),
-        TOKEN_MANAGER_ERC721_IMPLEMENTATION_ADDRESS: TokenManagerErc721Generator().get_meta(),
-        TOKEN_MANAGER_ERC1155_ADDRESS: UpgradeableTokenManagerErc1155Generator().get_meta(),
-        TOKEN_MANAGER_ERC1155_IMPLEMENTATION_ADDRESS: TokenManagerErc1155Generator().get_meta(),
-        TOKEN_MANAGER_ERC721_WITH_METADATA_ADDRESS: UpgradeableTokenManagerErc721WMGenerator().get_meta(),
-        TOKEN_MANAGER_ERC721_WITH_METADATA_IMPLEMENTATION_ADDRESS: TokenManagerErc721WMGenerator().get_meta(),
-        ETH_ERC20_ADDRESS: UpgradeableTokenManagerErc20Generator().get_meta(),
-        ETH_ERC20_IMPLEMENTATION_ADDRESS: TokenManagerErc20Generator().get_meta()
-    }
+def get_abi(name: str) -> list:
+    """Return ABI of one contract by its name in generate_abi output:
+    'message_proxy_chain', 'token_manager_erc20', 'ERC20OnChain', ...
+
+    ABI is read from the prebuilt bundle and falls back to the artifacts
+    if the package was not built with it.
+    Every call returns a new list
+    """
+    from . import abi_bundle  # pylint: disable=import-outside-toplevel
+    abi = abi_bundle.load_abi(name)
+    if abi is None:
+        # ABI of the artifact is shared by generators
+        abi = deepcopy(_generate_contract_abi(name))
+    return abi
+
+
+def write_abi_bundle(path: Optional[str] = None) -> None:
+    """Write ABIs of all contracts taken from the artifacts into the bundle"""
+    from . import abi_bundle  # pylint: disable=import-outside-toplevel
+    abis = {name: _generate_contract_abi(name) for name, _, _ in _ABI_CONTRACTS}
+    abi_bundle.write_abi_bundle(abis, path or abi_bundle.ABI_BUNDLE_PATH)
+
+
+def _generate_contract_abi(name: str) -> list:
+    generator_classes = {contract_name: generator_class for contract_name, _, generator_class in _ABI_CONTRACTS}
+    if name not in generator_classes:
+        raise KeyError(f'{name} is not a predeployed contract')
+    return getattr(_import_contracts(), generator_classes[name])().get_abi()
+
+
+def generate_abi(stats: Optional['GenerationStats'] = None) -> dict:
+    abi = {}
+    for name, address, _ in _ABI_CONTRACTS:
+        if stats is None:
+            contract_abi = get_abi(name)
+        else:
+            with stats.measure('abi', name):
+                contract_abi = get_abi(name)
+        if address is None:
+            abi[name + '_abi'] = contract_abi
+        else:
+            abi.update(generate_abi_key(name, address, contract_abi))
+    return abi
+
+
+# address of the predeployed contract, generator class
+_META_CONTRACTS = [
+    (PROXY_ADMIN_ADDRESS, 'ProxyAdminGenerator'),
+    (MESSAGE_PROXY_FOR_SCHAIN_ADDRESS, 'UpgradeableMessageProxyForSchainGenerator'),
+    (MESSAGE_PROXY_FOR_SCHAIN_IMPLEMENTATION_ADDRESS, 'MessageProxyForSchainGenerator'),
+    (KEY_STORAGE_ADDRESS, 'UpgradeableKeyStorageGenerator'),
+    (KEY_STORAGE_IMPLEMENTATION_ADDRESS, 'KeyStorageGenerator'),
+    (COMMUNITY_LOCKER_ADDRESS, 'UpgradeableCommunityLockerGenerator'),
+    (COMMUNITY_LOCKER_IMPLEMENTATION_ADDRESS, 'CommunityLockerGenerator'),
+    (TOKEN_MANAGER_LINKER_ADDRESS, 'UpgradeableTokenManagerLinkerGenerator'),
+    (TOKEN_MANAGER_LINKER_IMPLEMENTATION_ADDRESS, 'TokenManagerLinkerGenerator'),
+    (TOKEN_MANAGER_ETH_ADDRESS, 'UpgradeableTokenManagerEthGenerator'),
+    (TOKEN_MANAGER_ETH_IMPLEMENTATION_ADDRESS, 'TokenManagerEthGenerator'),
+    (TOKEN_MANAGER_ERC20_ADDRESS, 'UpgradeableTokenManagerErc20Generator'),
+    (TOKEN_MANAGER_ERC20_IMPLEMENTATION_ADDRESS, 'TokenManagerErc20Generator'),
+    (TOKEN_MANAGER_ERC721_ADDRESS, 'UpgradeableTokenManagerErc721Generator'),
+    (TOKEN_MANAGER_ERC721_IMPLEMENTATION_ADDRESS, 'TokenManagerErc721Generator'),
+    (TOKEN_MANAGER_ERC1155_ADDRESS, 'UpgradeableTokenManagerErc1155Generator'),
+    (TOKEN_MANAGER_ERC1155_IMPLEMENTATION_ADDRESS, 'TokenManagerErc1155Generator'),
+    (TOKEN_MANAGER_ERC721_WITH_METADATA_ADDRESS, 'UpgradeableTokenManagerErc721WMGenerator'),
+    (TOKEN_MANAGER_ERC721_WITH_METADATA_IMPLEMENTATION_ADDRESS, 'TokenManagerErc721WMGenerator'),
+    (ETH_ERC20_ADDRESS, 'UpgradeableTokenManagerErc20Generator'),
+    (ETH_ERC20_IMPLEMENTATION_ADDRESS, 'TokenManagerErc20Generator')
+]
+
+
+def generate_meta(stats: Optional['GenerationStats'] = None) -> dict:
+    contracts = _import_contracts()
+    meta = {}
+    for address, generator_class in _META_CONTRACTS:
+        if stats is None:
+            meta[address] = getattr(contracts, generator_class)().get_meta()
+        else:
+            with stats.measure('meta', address):
+                meta[address] = getattr(contracts, generator_class)().get_meta()
+    return meta
 
 
 def main() -> None:
@@ -0,0 +1,340 @@
+"""genesis.py
+
+Streaming writer of genesis files with IMA predeployed contracts.
+
+The base genesis is copied from the input to the output piece by piece.
+Only the object under the target key is inspected:
+its entries which addresses are generated are dropped
+and the generated allocations are appended before the closing brace.
+The result is equal to json.load, dict.update and json.dump
+but the base genesis is never loaded into memory as a whole.
+
+Usage:
+    python -m ima_predeployed.genesis base_genesis.json config.json [target_key] [--compact | --sort-keys]
+        [-o output.json]
+
+Functions:
+    write_genesis
+    generate_genesis
+    main
+"""
+
+import json
+import re
+import sys
+from typing import Any, Dict, Optional, TextIO, Tuple
+
+from .config import schain_config_to_arguments
+
+CHUNK_SIZE = 1 << 16
+INDENT = 4
+
+_STRING = r'"(?:[^"\\]|\\.)*"'
+_SCALAR = r'[^ \t\n\r{}\[\],:"]+'
+_TOKEN = re.compile(rf'{_STRING}|[{{}}\[\],:]|[ \t\n\r]+|{_SCALAR}')
+_RUN = re.compile(rf'(?:{_STRING}|[^"{{}}\[\]])+')
+_STRIP = re.compile(rf'({_STRING})|[ \t\n\r]+')
+
+# beginning of object entry: whitespace, key and colon
+_ENTRY_KEY = re.compile(rf'([ \t\n\r]*)({_STRING})[ \t\n\r]*:[ \t\n\r]*')
+_DECODER = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+# characters which may follow a complete value
+_DELIMITERS = _WHITESPACE + ',}]'
+_OPEN = '{['
+_CLOSE = '}]'
+
+
+class _Tokenizer:
+    """Splits JSON text stream into tokens.
+
+    Strings, numbers and literals are never split between tokens.
+    Only the current token and the unread part of the chunk are kept in memory
+    """
+
+    def __init__(self, stream: TextIO, chunk_size: int = CHUNK_SIZE):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._buffer = ''
+        self._position = 0
+        self._eof = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        while True:
+            match = _TOKEN.match(self._buffer, self._position)
+            if match is not None and (
+                    self._eof or match.end() < len(self._buffer) or match.group()[0] in '"{}[],:'):
+                self._position = match.end()
+                return match.group()
+            if self._eof:
+                if self._position < len(self._buffer):
+                    raise ValueError(f'Malformed JSON near: {self._buffer[self._position:][:32]!r}')
+                raise StopIteration
+            self._read()
+
+    def run(self) -> str:
+        """Return a text which does not change nesting depth.
+
+        The text is empty only if the next token is a bracket or the stream is over
+        """
+        while True:
+            match = _RUN.match(self._buffer, self._position)
+            if match is not None:
+                self._position = match.end()
+                return match.group()
+            if self._eof or (
+                    self._position < len(self._buffer) and self._buffer[self._position] in '{}[]'):
+                return ''
+            self._read()
+
+    def entry(self) -> Optional[Tuple[str, str, str, Any]]:
+        """Return leading whitespace, key, text and decoded value of the next object entry.
+
+        Entries which are larger than the chunk are not returned
+        and have to be read by tokens.
+        A value is accepted only if a delimiter follows it,
+        otherwise a number like -1.5e3 could be cut at the end of the buffer
+        """
+        while True:
+            match = _ENTRY_KEY.match(self._buffer, self._position)
+            if match is not None:
+                try:
+                    value, end = _DECODER.raw_decode(self._buffer, match.end())
+                except json.JSONDecodeError:
+                    end = None
+                if end is not None and (
+                        self._eof or end < len(self._buffer) and self._buffer[end] in _DELIMITERS):
+                    entry = match.group(1), match.group(2), self._buffer[match.end(1):end], value
+                    self._position = end
+                    return entry
+            if self._eof or len(self._buffer) - self._position >= self._chunk_size:
+                return None
+            self._read()
+
+    def _read(self) -> None:
+        chunk = self._stream.read(self._chunk_size)
+        self._buffer = self._buffer[self._position:] + chunk
+        self._position = 0
+        self._eof = not chunk
+
+
+def write_genesis(
+        base_genesis: TextIO,
+        output: TextIO,
+        allocations: Dict[str, dict],
+        target_key: str = 'alloc',
+        compact: bool = False,
+        chunk_size: int = CHUNK_SIZE) -> None:
+    """Copy base genesis from the stream into the output
+    adding allocations into the top level object under the target key.
+
+    In compact mode all whitespace is removed from the output.
+    Otherwise the formatting of the base genesis is preserved
+    """
+    tokens = _Tokenizer(base_genesis, chunk_size)
+    write = output.write
+    depth = 0
+    expect_key = False
+    key: Optional[str] = None
+    value_key: Optional[str] = None
+    found = False
+    for token in tokens:
+        first = token[0]
+        if first in _WHITESPACE:
+            if not compact:
+                write(token)
+            continue
+        write(token)
+        if depth == 1:
+            if first == '"' and expect_key:
+                key = json.loads(token)
+                expect_key = False
+                continue
+            if first == ':':
+                value_key = key
+                continue
+            if first == ',':
+                expect_key = True
+                continue
+            if value_key == target_key:
+                if first != '{':
+                    raise ValueError(f'"{target_key}" is not an object')
+                _splice_object(tokens, write, allocations, compact)
+                found = True
+                value_key = None
+                continue
+            value_key = None
+        if first in _OPEN:
+            depth += 1
+            expect_key = depth == 1 and first == '{'
+        elif first in _CLOSE:
+            depth -= 1
+    if not found:
+        raise KeyError(target_key)
+
+
+def generate_genesis(
+        base_genesis: TextIO,
+        output: TextIO,
+        config: dict,
+        target_key: str = 'alloc',
+        compact: bool = False,
+        sort_keys: bool = False) -> None:
+    """Write genesis with IMA predeployed contracts for the schain config.
+
+    The config has the same keys as test/config.json.
+    The formatting of the base genesis is preserved.
+    With `sort_keys` the whole genesis is loaded and dumped
+    with sorted keys and indent of 4 spaces as test/generate_genesis.py used to do
+    """
+    # pylint: disable=import-outside-toplevel
+    from .generator import generate_contracts
+    if compact and sort_keys:
+        raise ValueError('Compact genesis can not be written with sorted keys')
+    allocations = generate_contracts(**schain_config_to_arguments(config))
+    if sort_keys:
+        genesis = json.load(base_genesis)
+        genesis[target_key].update(allocations)
+        output.write(json.dumps(genesis, indent=INDENT, sort_keys=True) + '\n')
+        return
+    write_genesis(base_genesis, output, allocations, target_key, compact)
+
+
+def main() -> None:
+    """Main function"""
+    import argparse  # pylint: disable=import-outside-toplevel
+    parser = argparse.ArgumentParser(description='Add IMA predeployed contracts into genesis file')
+    parser.add_argument('base_genesis', help='path to the base genesis file')
+    parser.add_argument('config', help='path to the schain config file')
+    parser.add_argument('target_key', nargs='?', default='alloc',
+                        help='top level key of allocations in the genesis file')
+    formatting = parser.add_mutually_exclusive_group()
+    formatting.add_argument('--compact', action='store_true', help='remove whitespace from the output')
+    formatting.add_argument('--sort-keys', action='store_true',
+                            help='load the whole genesis and write it with sorted keys')
+    parser.add_argument('-o', '--output', help='path to the output file. stdout by default')
+    args = parser.parse_args()
+
+    with open(args.config, encoding='utf-8') as config_file:
+        config = json.load(config_file)
+    with open(args.base_genesis, encoding='utf-8') as base_genesis_file:
+        if args.output is None:
+            generate_genesis(
+                base_genesis_file, sys.stdout, config, args.target_key, args.compact, args.sort_keys)
+        else:
+            with open(args.output, 'w', encoding='utf-8') as output_file:
+                generate_genesis(
+                    base_genesis_file, output_file, config, args.target_key, args.compact, args.sort_keys)
+
+
+# private
+
+def _splice_object(tokens: _Tokenizer, write, allocations: Dict[str, dict], compact: bool) -> None:
+    """Copy entries of the object which opening brace is already written,
+    skip entries overridden by allocations and append the allocations"""
+    entries = 0
+    whitespace = ''
+    while True:
+        entry = tokens.entry()
+        if entry is not None:
+            entry_whitespace, key, text, value = entry
+            if json.loads(key) not in allocations:
+                if entries:
+                    write(',')
+                if compact:
+                    write(key + ':' + json.dumps(value, ensure_ascii=False, separators=(',', ':')))
+                else:
+                    write(whitespace + entry_whitespace + text)
+                entries += 1
+            whitespace = ''
+            continue
+        token = next(tokens, None)
+        if token is None:
+            break
+        first = token[0]
+        if first in _WHITESPACE:
+            whitespace += token
+        elif first == ',':
+            whitespace = ''
+        elif first == '}':
+            _write_allocations(write, allocations, entries, compact)
+            if compact:
+                whitespace = ''
+            elif allocations and not whitespace:
+                whitespace = '\n' + ' ' * INDENT
+            write(whitespace + '}')
+            return
+        elif first == '"':
+            keep = json.loads(token) not in allocations
+            if keep:
+                if entries:
+                    write(',')
+                write(token if compact else whitespace + token)
+                entries += 1
+            _copy_value(tokens, write if keep else None, compact)
+            whitespace = ''
+        else:
+            raise ValueError(f'Unexpected token {token[:32]!r}')
+    raise ValueError('Unexpected end of JSON')
+
+
+def _copy_value(tokens: _Tokenizer, write, compact: bool) -> None:
+    """Copy colon and the following value. Skip them if write is None"""
+    for token in tokens:
+        first = token[0]
+        if first in _WHITESPACE:
+            if write is not None and not compact:
+                write(token)
+            continue
+        if write is not None:
+            write(token)
+        if first == ':':
+            continue
+        if first in _OPEN:
+            _copy_nested(tokens, write, compact)
+        return
+    raise ValueError('Unexpected end of JSON')
+
+
+def _copy_nested(tokens: _Tokenizer, write, compact: bool) -> None:
+    """Copy the rest of object or array which opening bracket is already written.
+
+    Text between brackets is copied in runs instead of tokens
+    because allocations mostly consist of nested objects
+    """
+    depth = 1
+    while depth:
+        run = tokens.run()
+        if run:
+            if write is not None:
+                write(_STRIP.sub(r'\1', run) if compact else run)
+            continue
+        token = next(tokens, None)
+        if token is None:
+            raise ValueError('Unexpected end of JSON')
+        if write is not None:
+            write(token)
+        if token in _OPEN:
+            depth += 1
+        else:
+            depth -= 1
+
+
+def _write_allocations(write, allocations: Dict[str, dict], entries: int, compact: bool) -> None:
+    entry_indent = '\n' + ' ' * (2 * INDENT)
+    for address, account in allocations.items():
+        if entries:
+            write(',')
+        if compact:
+            write(json.dumps(address) + ':' + json.dumps(account, separators=(',', ':')))
+        else:
+            write(entry_indent + json.dumps(address) + ': '
+                  + json.dumps(account, indent=INDENT).replace('\n', entry_indent))
+        entries += 1
+
+
+if __name__ == '__main__':
+    main()
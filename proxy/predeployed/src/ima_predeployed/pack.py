@@ -0,0 +1,119 @@
+"""pack.py
+
+Indexed pack of named binary entries in a single file.
+
+Layout of the file:
+    8 bytes   MAGIC
+    8 bytes   length of the index, big endian
+    index     JSON: {"meta": {...}, "entries": {name: [offset, length]}}
+    entries   content of the entries, offsets are counted from the start of the file
+
+The file is memory mapped by PackReader
+so reading one entry does not touch the others.
+
+Functions:
+    write_pack
+
+Classes:
+    PackReader
+    PackError
+"""
+
+import json
+import mmap
+import os
+from tempfile import NamedTemporaryFile
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+MAGIC = b'IMAPACK1'
+_INDEX_LENGTH_SIZE = 8
+_HEADER_SIZE = len(MAGIC) + _INDEX_LENGTH_SIZE
+
+
+class PackError(ValueError):
+    """File is not a pack or is damaged"""
+
+
+def write_pack(path: str, entries: Iterable[Tuple[str, bytes]], meta: Optional[Dict[str, Any]] = None) -> None:
+    """Write entries into the pack file atomically"""
+    names: Dict[str, int] = {}
+    contents: List[bytes] = []
+    for name, content in entries:
+        if name in names:
+            raise ValueError(f'{name} is packed twice')
+        names[name] = len(contents)
+        contents.append(content)
+
+    # offsets depend on the length of the index which contains them,
+    # so the index is encoded again until its length does not change
+    index_length = 0
+    while True:
+        offset = _HEADER_SIZE + index_length
+        index_entries = {}
+        for name, content in zip(names, contents):
+            index_entries[name] = [offset, len(content)]
+            offset += len(content)
+        index = json.dumps({'meta': meta or {}, 'entries': index_entries}, separators=(',', ':')).encode()
+        if len(index) == index_length:
+            break
+        index_length = len(index)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    with NamedTemporaryFile('wb', dir=directory, suffix='.tmp', delete=False) as tmp_file:
+        tmp_file.write(MAGIC)
+        tmp_file.write(index_length.to_bytes(_INDEX_LENGTH_SIZE, 'big'))
+        tmp_file.write(index)
+        for content in contents:
+            tmp_file.write(content)
+    # temporary files are private, packs are shipped as regular package files
+    os.chmod(tmp_file.name, 0o644)
+    os.replace(tmp_file.name, path)
+
+
+class PackReader:
+    """Reads entries of the pack file on demand"""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as pack_file:
+            try:
+                self._mmap = mmap.mmap(pack_file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as error:
+                raise PackError(f'{path} is empty') from error
+        try:
+            if self._mmap[:len(MAGIC)] != MAGIC:
+                raise PackError(f'{path} is not a pack')
+            index_length = int.from_bytes(self._mmap[len(MAGIC):_HEADER_SIZE], 'big')
+            try:
+                index = json.loads(self._mmap[_HEADER_SIZE:_HEADER_SIZE + index_length])
+            except ValueError as error:
+                raise PackError(f'Index of {path} is damaged') from error
+            self.meta: Dict[str, Any] = index['meta']
+            self._entries: Dict[str, List[int]] = index['entries']
+            if any(offset + length > len(self._mmap) for offset, length in self._entries.values()):
+                raise PackError(f'{path} is truncated')
+        except Exception:
+            self._mmap.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def read(self, name: str) -> bytes:
+        """Return content of the entry. Raises KeyError if there is no such entry"""
+        offset, length = self._entries[name]
+        return self._mmap[offset:offset + length]
+
+    def read_json(self, name: str) -> Any:
+        return json.loads(self.read(name))
+
+    def close(self) -> None:
+        self._mmap.close()
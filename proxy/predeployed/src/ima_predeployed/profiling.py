@@ -0,0 +1,114 @@
+"""profiling.py
+
+Optional instrumentation of generate_contracts, generate_abi and generate_meta.
+
+Pass a GenerationStats object as `stats` to collect per contract figures:
+    calls                   amount of measured calls
+    seconds                 wall time of the calls
+    artifact_load_seconds   part of the wall time spent reading and decoding artifacts
+    keccak_calls            amount of keccak256 calculations
+    slots_written           amount of emitted storage slots
+    code_bytes              bytes of emitted bytecode
+    storage_bytes           bytes of emitted storage slots and values
+    cached                  amount of allocations loaded from AllocationCache
+Figures of the same contract are summed over calls, so memory does not depend
+on the amount of generated schains.
+Artifacts are mostly loaded when generators are created,
+which is measured as the 'generators' contract of the 'setup' stage
+(except generators of worker processes which are created once per process).
+keccak256 and artifact loads are counted per process:
+when contracts are generated in threads the counts of concurrent contracts are mixed.
+Nothing is measured when `stats` is not passed.
+
+Classes:
+    ContractStats
+    GenerationStats
+"""
+
+import json
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Tuple
+
+from . import artifact_registry, slots
+
+
+class ContractStats:
+    """Figures of one contract summed over calls"""
+
+    __slots__ = (
+        'calls', 'seconds', 'artifact_load_seconds', 'keccak_calls',
+        'slots_written', 'code_bytes', 'storage_bytes', 'cached')
+
+    def __init__(self):
+        for field in self.__slots__:
+            setattr(self, field, 0)
+
+    def add_allocation(self, allocation: dict) -> None:
+        """Count code and storage of accounts emitted by the call"""
+        for account in allocation.values():
+            self.code_bytes += _hex_size(account.get('code', '0x'))
+            storage = account.get('storage', {})
+            self.slots_written += len(storage)
+            self.storage_bytes += sum(_hex_size(slot) + _hex_size(value) for slot, value in storage.items())
+
+    def merge(self, other: 'ContractStats') -> None:
+        for field in self.__slots__:
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+
+class GenerationStats:
+    """Figures of generated contracts grouped by stage ('setup', 'contracts', 'abi', 'meta') and name"""
+
+    def __init__(self):
+        self.contracts: Dict[Tuple[str, str], ContractStats] = {}
+
+    @contextmanager
+    def measure(self, stage: str, name: str) -> Iterator[ContractStats]:
+        """Measure the block as a call of the contract.
+
+        Yields figures of the contract, emitted allocation is counted by add_allocation
+        """
+        contract_stats = self.contracts.setdefault((stage, name), ContractStats())
+        keccak_calls = slots.cache_info().keccak_calls
+        artifact_load_seconds = artifact_registry.load_time()
+        start = time.perf_counter()
+        yield contract_stats
+        contract_stats.seconds += time.perf_counter() - start
+        contract_stats.artifact_load_seconds += artifact_registry.load_time() - artifact_load_seconds
+        contract_stats.keccak_calls += slots.cache_info().keccak_calls - keccak_calls
+        contract_stats.calls += 1
+
+    def merge(self, other: 'GenerationStats') -> None:
+        """Add figures collected in another process"""
+        for key, contract_stats in other.contracts.items():
+            self.contracts.setdefault(key, ContractStats()).merge(contract_stats)
+
+    def total(self, stage: str) -> ContractStats:
+        """Return figures of all contracts of the stage"""
+        total = ContractStats()
+        for (contract_stage, _), contract_stats in self.contracts.items():
+            if contract_stage == stage:
+                total.merge(contract_stats)
+        return total
+
+    def to_dict(self) -> dict:
+        """Return figures as {stage: {'total': {...}, 'contracts': {name: {...}}}}"""
+        result: Dict[str, dict] = {}
+        for (stage, name), contract_stats in self.contracts.items():
+            if stage not in result:
+                result[stage] = {'total': self.total(stage).to_dict(), 'contracts': {}}
+            result[stage]['contracts'][name] = contract_stats.to_dict()
+        return result
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=4)
+
+
+# private
+
+def _hex_size(value: str) -> int:
+    return (len(value) - 2) // 2
@@ -0,0 +1,148 @@
+"""slots.py
+
+Calculation of smart contract storage slots.
+
+Slots are calculated by hashing raw 32 bytes words with keccak256
+without ABI encoding of the arguments.
+Results for recurring (slot, key) pairs are kept in a bounded LRU cache.
+Slots of mappings with constant keys are taken from storage_layout.py
+and are not hashed at all.
+Long lists of keys are hashed in one pass bypassing the cache,
+with safe-pysha3 if it is installed because it is several times faster
+than the pycryptodome backend of eth-hash.
+
+Functions:
+    keccak256
+    calculate_mapping_value_slot
+    mapping_value_slot
+    mapping_value_slots
+    address_key
+    array_value_slot
+    cache_info
+    cache_clear
+"""
+
+from functools import lru_cache
+from typing import Callable, List, NamedTuple, Sequence, Union
+
+from eth_hash.auto import keccak
+
+from .storage_layout import ARRAY_DATA_SLOTS, MAPPING_VALUE_SLOTS
+
+CACHE_SIZE = 4096
+# longer lists of keys would only evict recurring slots from the cache
+MAX_CACHED_BATCH = 16
+
+
+class SlotsCacheInfo(NamedTuple):
+    """Statistics of slots calculation"""
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+    keccak_calls: int
+
+
+_uncached_keccak_calls = 0
+_precomputed_slots = 0
+
+
+def keccak256(data: bytes) -> bytes:
+    """Calculate keccak256 hash of raw bytes"""
+    global _uncached_keccak_calls  # pylint: disable=global-statement
+    _uncached_keccak_calls += 1
+    return keccak(data)
+
+
+def calculate_mapping_value_slot(slot: int, key: Union[bytes, int, str], key_type: str) -> int:
+    """Calculate slot where value of the key in mapping is stored.
+
+    Accepts the same key types as ContractGenerator.calculate_mapping_value_slot:
+    'bytes32', 'address' and 'uint256'.
+    Like there bytes32 keys are hashed as they are, shorter keys are not padded
+    """
+    if key_type == 'bytes32':
+        if not isinstance(key, bytes):
+            raise TypeError(f'{key!r} is not bytes32')
+        return mapping_value_slot(slot, key)
+    if key_type == 'address':
+        return mapping_value_slot(slot, int(key, 16).to_bytes(32, 'big'))
+    if key_type == 'uint256':
+        return mapping_value_slot(slot, key.to_bytes(32, 'big'))
+    raise TypeError(f'{key_type} is unknown key type')
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def mapping_value_slot(slot: int, key: bytes) -> int:
+    """Calculate slot of mapping value by 32 bytes key"""
+    if (slot, key) in MAPPING_VALUE_SLOTS:
+        return _precomputed(MAPPING_VALUE_SLOTS[(slot, key)])
+    return int.from_bytes(keccak(key + slot.to_bytes(32, 'big')), 'big')
+
+
+def mapping_value_slots(slot: int, keys: Sequence[bytes]) -> List[int]:
+    """Calculate slots of mapping values for many 32 bytes keys"""
+    if len(keys) <= MAX_CACHED_BATCH:
+        return [mapping_value_slot(slot, key) for key in keys]
+    global _uncached_keccak_calls  # pylint: disable=global-statement
+    _uncached_keccak_calls += len(keys)
+    slot_bytes = slot.to_bytes(32, 'big')
+    hash_function = _batch_keccak()
+    from_bytes = int.from_bytes
+    return [from_bytes(hash_function(key + slot_bytes), 'big') for key in keys]
+
+
+def address_key(address: str) -> bytes:
+    """Return address as a 32 bytes mapping key"""
+    return int(address, 16).to_bytes(32, 'big')
+
+
+def array_value_slot(slot: int, index: int) -> int:
+    """Calculate slot of dynamic array element"""
+    return _array_data_slot(slot) + index
+
+
+def cache_info() -> SlotsCacheInfo:
+    """Return cache hits, misses and amount of keccak256 calculations"""
+    mapping_info = mapping_value_slot.cache_info()
+    array_info = _array_data_slot.cache_info()
+    misses = mapping_info.misses + array_info.misses
+    return SlotsCacheInfo(
+        hits=mapping_info.hits + array_info.hits,
+        misses=misses,
+        maxsize=mapping_info.maxsize + array_info.maxsize,
+        currsize=mapping_info.currsize + array_info.currsize,
+        keccak_calls=misses + _uncached_keccak_calls - _precomputed_slots)
+
+
+def cache_clear() -> None:
+    """Clear the cache and reset counters"""
+    global _uncached_keccak_calls, _precomputed_slots  # pylint: disable=global-statement
+    mapping_value_slot.cache_clear()
+    _array_data_slot.cache_clear()
+    _uncached_keccak_calls = 0
+    _precomputed_slots = 0
+
+
+# private
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _array_data_slot(slot: int) -> int:
+    if slot in ARRAY_DATA_SLOTS:
+        return _precomputed(ARRAY_DATA_SLOTS[slot])
+    return int.from_bytes(keccak(slot.to_bytes(32, 'big')), 'big')
+
+
+@lru_cache(maxsize=None)
+def _batch_keccak() -> Callable[[bytes], bytes]:
+    try:
+        from sha3 import keccak_256  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return keccak
+    return lambda data: keccak_256(data).digest()
+
+
+def _precomputed(slot: int) -> int:
+    global _precomputed_slots  # pylint: disable=global-statement
+    _precomputed_slots += 1
+    return slot
@@ -0,0 +1,135 @@
+"""snapshot.py
+
+Streaming readers of holder balance snapshots and address lists.
+
+A balances snapshot is a CSV file with `address,balance` rows (an optional header is skipped)
+or a JSON lines file with {"address": ..., "balance": ...} objects.
+Balances are decimal integers, 0x prefixed hex strings or JSON integers.
+An address list is a text file with an address in the first column of every line
+(an optional header is skipped as well).
+Rows are parsed one by one, so a file is never loaded into memory as a whole.
+
+Functions:
+    read_csv_balances
+    read_jsonl_balances
+    read_addresses
+
+Classes:
+    BalancesSnapshot
+    AddressesSnapshot
+"""
+
+import csv
+import json
+from typing import Iterator, Optional, TextIO, Tuple, Union
+
+Balance = Tuple[str, int]
+
+CSV = 'csv'
+JSONL = 'jsonl'
+_FORMATS = {'.csv': CSV, '.jsonl': JSONL, '.ndjson': JSONL}
+MAX_UINT256 = (1 << 256) - 1
+
+
+class BalancesSnapshot:
+    """Balances of holders stored in a snapshot file.
+
+    The file is read on every iteration, so the object can be iterated several times
+    (to generate and to verify the allocation) and passed to worker processes
+    """
+
+    def __init__(self, path: str, file_format: Optional[str] = None):
+        if file_format is None:
+            file_format = next((_FORMATS[suffix] for suffix in _FORMATS if path.endswith(suffix)), None)
+        if file_format not in (CSV, JSONL):
+            raise ValueError(f'Format of {path} is unknown, use .csv or .jsonl files')
+        self.path = path
+        self.file_format = file_format
+
+    def __iter__(self) -> Iterator[Balance]:
+        with open(self.path, encoding='utf-8', newline='') as snapshot_file:
+            if self.file_format == CSV:
+                yield from read_csv_balances(snapshot_file)
+            else:
+                yield from read_jsonl_balances(snapshot_file)
+
+    def __repr__(self) -> str:
+        return f'BalancesSnapshot({self.path!r}, {self.file_format!r})'
+
+
+class AddressesSnapshot:
+    """Addresses listed in a file, one per line. Like BalancesSnapshot it can be iterated several times"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __iter__(self) -> Iterator[str]:
+        with open(self.path, encoding='utf-8', newline='') as addresses_file:
+            yield from read_addresses(addresses_file)
+
+    def __repr__(self) -> str:
+        return f'AddressesSnapshot({self.path!r})'
+
+
+def read_csv_balances(stream: TextIO) -> Iterator[Balance]:
+    """Yield (address, balance) for every row of CSV stream"""
+    for row_number, row in enumerate(csv.reader(stream), start=1):
+        if not row or not ''.join(row).strip():
+            continue
+        if row_number == 1 and not row[0].strip().startswith('0x'):
+            continue  # header
+        if len(row) != 2:
+            raise ValueError(f'Row {row_number} has {len(row)} columns instead of address and balance')
+        yield _parse_balance(row[0].strip(), row[1].strip(), f'Row {row_number}')
+
+
+def read_jsonl_balances(stream: TextIO) -> Iterator[Balance]:
+    """Yield (address, balance) for every non empty line of JSON lines stream"""
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            address, balance = record['address'], record['balance']
+        except (ValueError, KeyError, TypeError) as error:
+            raise ValueError(f'Line {line_number} is not a balance record: {error!r}') from error
+        yield _parse_balance(address, balance, f'Line {line_number}')
+
+
+def read_addresses(stream: TextIO) -> Iterator[str]:
+    """Yield the address of every row of CSV stream ignoring other columns"""
+    for row_number, row in enumerate(csv.reader(stream), start=1):
+        if not row or not row[0].strip():
+            continue
+        address = row[0].strip()
+        if row_number == 1 and not address.startswith('0x'):
+            continue  # header
+        yield _parse_address(address, f'Row {row_number}')
+
+
+# private
+
+def _parse_address(address: str, location: str) -> str:
+    if not isinstance(address, str) or len(address) != 42 or not address.startswith('0x'):
+        raise ValueError(f'{location}: {address!r} is not an address')
+    try:
+        int(address, 16)
+    except ValueError as error:
+        raise ValueError(f'{location}: {address!r} is not an address') from error
+    return address
+
+
+def _parse_balance(address: str, balance: Union[str, int], location: str) -> Balance:
+    _parse_address(address, location)
+    try:
+        if isinstance(balance, str):
+            value = int(balance, 16) if balance.startswith('0x') else int(balance, 10)
+        elif isinstance(balance, int) and not isinstance(balance, bool):
+            value = balance
+        else:
+            raise ValueError(f'{balance!r} is not an integer')
+    except ValueError as error:
+        raise ValueError(f'{location}: {error}') from error
+    if not 0 <= value <= MAX_UINT256:
+        raise ValueError(f'{location}: balance {value} is out of uint256 range')
+    return address, value
@@ -0,0 +1,92 @@
+"""storage.py
+
+Compact builder of smart contract storage.
+
+Every write is appended to a bytearray as a fixed size record:
+32 bytes of the slot, 32 bytes of the value and widths of both in bytes.
+No python objects are kept per slot until the storage is emitted.
+Then significant bytes of every slot and value are converted to hex once.
+Records are kept in chunks which are released as soon as they are emitted,
+so the records and the emitted dictionary do not stay in memory together.
+
+The emitted dictionary is equal to the one built by
+predeployed_generator ContractGenerator._write_* helpers:
+    uint256 and slots    minimal even length hex ('0x00', '0x0123')
+    address              lowercase, 20 bytes
+    bytes32              hex of the data as is
+Repeated writes into the same slot keep the first position and the last value.
+
+Classes:
+    StorageBuilder
+"""
+
+from typing import Dict, List, Mapping, Optional
+
+_WORD_SIZE = 32
+_ADDRESS_SIZE = 20
+RECORD_SIZE = 2 * _WORD_SIZE + 2
+_SLOT_SHIFT = 8 * (RECORD_SIZE - _WORD_SIZE)
+_CHUNK_SIZE = 256 * RECORD_SIZE
+
+
+class StorageBuilder:
+    """Storage of a contract which is written slot by slot and emitted once"""
+
+    __slots__ = ('_chunks', '_size')
+
+    def __init__(self):
+        self._chunks: List[bytearray] = []
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Return amount of writes"""
+        return self._size
+
+    def write_uint256(self, slot: int, value: int) -> None:
+        """Write unsigned integer"""
+        value_width = (value.bit_length() + 7) // 8 or 1
+        if value_width > _WORD_SIZE:
+            raise ValueError(f'{value} does not fit into a slot')
+        self._append(slot, value, value_width)
+
+    def write_address(self, slot: int, address: str) -> None:
+        """Write 0x prefixed 20 bytes address"""
+        if len(address) != 42 or not address.startswith('0x'):
+            raise ValueError(f'{address!r} is not an address')
+        self._append(slot, int(address, 16), _ADDRESS_SIZE)
+
+    def write_bytes32(self, slot: int, data: bytes) -> None:
+        """Write up to 32 bytes of data"""
+        if len(data) > _WORD_SIZE:
+            raise ValueError(f'{len(data)} bytes do not fit into a slot')
+        self._append(slot, int.from_bytes(data, 'big'), len(data))
+
+    def emit(self, base: Optional[Mapping[str, str]] = None) -> Dict[str, str]:
+        """Return storage in genesis format and empty the builder.
+
+        Slots of `base` go first and are overwritten by the written ones
+        """
+        storage = {} if base is None else dict(base)
+        chunks = self._chunks
+        self._chunks = []
+        self._size = 0
+        for index, chunk in enumerate(chunks):
+            chunks[index] = None
+            # the value starts at slot_end and the widths start at value_end
+            for slot_end in range(_WORD_SIZE, len(chunk), RECORD_SIZE):
+                value_end = slot_end + _WORD_SIZE
+                storage['0x' + chunk[slot_end - chunk[value_end]:slot_end].hex()] = \
+                    '0x' + chunk[value_end - chunk[value_end + 1]:value_end].hex()
+        return storage
+
+    # private
+
+    def _append(self, slot: int, value: int, value_width: int) -> None:
+        chunks = self._chunks
+        if not chunks or len(chunks[-1]) >= _CHUNK_SIZE:
+            chunks.append(bytearray())
+        data = chunks[-1]
+        # the record is packed into one integer, negative or too big slots do not fit into it
+        data += ((slot << _SLOT_SHIFT) | (value << 16) | (((slot.bit_length() + 7) // 8 or 1) << 8) | value_width
+                 ).to_bytes(RECORD_SIZE, 'big')
+        self._size += 1
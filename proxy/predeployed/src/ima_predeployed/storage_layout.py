@@ -0,0 +1,265 @@
+# This file is generated by scripts/generate_storage_layout.py
+# Do not edit it manually
+
+from . import constants
+
+
+KEY_STORAGE = {
+    '_initialized': 0,
+    '_initializing': 0,
+    '_roles': 101,
+    '_roleMembers': 151
+}
+
+KEY_STORAGE_OFFSETS = {
+    '_initializing': 1
+}
+
+MESSAGE_PROXY_FOR_SCHAIN = {
+    '_initialized': 0,
+    '_initializing': 0,
+    '_roles': 101,
+    '_roleMembers': 151,
+    'connectedChains': 201,
+    '_deprecatedRegistryContracts': 202,
+    'gasLimit': 203,
+    'keyStorage': 204,
+    'schainHash': 205,
+    '_outgoingMessageDataHash': 206,
+    '_idxHead': 207,
+    '_idxTail': 208,
+    '_registryContracts': 209,
+    'version': 210,
+    'messageInProgress': 211,
+    'minimumReceiverBalance': 212
+}
+
+MESSAGE_PROXY_FOR_SCHAIN_OFFSETS = {
+    '_initializing': 1
+}
+
+TOKEN_MANAGER = {
+    '_initialized': 0,
+    '_initializing': 0,
+    '_roles': 101,
+    '_roleMembers': 151,
+    'messageProxy': 201,
+    'tokenManagerLinker': 202,
+    'communityLocker': 203,
+    'schainHash': 204,
+    'depositBox': 205,
+    'automaticDeploy': 205,
+    'tokenManagers': 206
+}
+
+TOKEN_MANAGER_OFFSETS = {
+    '_initializing': 1,
+    'automaticDeploy': 20
+}
+
+TOKEN_MANAGER_LINKER = {
+    '_initialized': 0,
+    '_initializing': 0,
+    '_roles': 101,
+    '_roleMembers': 151,
+    'messageProxy': 201,
+    'linkerAddress': 202,
+    'tokenManagers': 203,
+    '_interchainConnections': 204
+}
+
+TOKEN_MANAGER_LINKER_OFFSETS = {
+    '_initializing': 1
+}
+
+COMMUNITY_LOCKER = {
+    '_initialized': 0,
+    '_initializing': 0,
+    '_roles': 101,
+    '_roleMembers': 151,
+    'messageProxy': 201,
+    'tokenManagerLinker': 202,
+    'communityPool': 203,
+    'schainHash': 204,
+    '_deprecatedTimeLimitPerMessage': 205,
+    'activeUsers': 206,
+    'lastMessageTimeStamp': 207,
+    'mainnetGasPrice': 208,
+    'gasPriceTimestamp': 209,
+    'timeLimitPerMessage': 210,
+    'lastMessageTimeStampToSchain': 211
+}
+
+COMMUNITY_LOCKER_OFFSETS = {
+    '_initializing': 1
+}
+
+TOKEN_MANAGER_ERC20 = {
+    '_initialized': 0,
+    '_initializing': 0,
+    '_roles': 101,
+    '_roleMembers': 151,
+    'messageProxy': 201,
+    'tokenManagerLinker': 202,
+    'communityLocker': 203,
+    'schainHash': 204,
+    'depositBox': 205,
+    'automaticDeploy': 205,
+    'tokenManagers': 206,
+    'deprecatedClonesErc20': 207,
+    'totalSupplyOnMainnet': 208,
+    'addedClones': 209,
+    'clonesErc20': 210,
+    'transferredAmount': 211,
+    '_schainToERC20': 212
+}
+
+TOKEN_MANAGER_ERC20_OFFSETS = {
+    '_initializing': 1,
+    'automaticDeploy': 20
+}
+
+TOKEN_MANAGER_ERC721 = {
+    '_initialized': 0,
+    '_initializing': 0,
+    '_roles': 101,
+    '_roleMembers': 151,
+    'messageProxy': 201,
+    'tokenManagerLinker': 202,
+    'communityLocker': 203,
+    'schainHash': 204,
+    'depositBox': 205,
+    'automaticDeploy': 205,
+    'tokenManagers': 206,
+    'deprecatedClonesErc721': 207,
+    'addedClones': 208,
+    'clonesErc721': 209,
+    'transferredAmount': 210,
+    '_schainToERC721': 211
+}
+
+TOKEN_MANAGER_ERC721_OFFSETS = {
+    '_initializing': 1,
+    'automaticDeploy': 20
+}
+
+TOKEN_MANAGER_ERC721_WITH_METADATA = {
+    '_initialized': 0,
+    '_initializing': 0,
+    '_roles': 101,
+    '_roleMembers': 151,
+    'messageProxy': 201,
+    'tokenManagerLinker': 202,
+    'communityLocker': 203,
+    'schainHash': 204,
+    'depositBox': 205,
+    'automaticDeploy': 205,
+    'tokenManagers': 206,
+    'deprecatedClonesErc721': 207,
+    'addedClones': 208,
+    'clonesErc721': 209,
+    'transferredAmount': 210,
+    '_schainToERC721': 211
+}
+
+TOKEN_MANAGER_ERC721_WITH_METADATA_OFFSETS = {
+    '_initializing': 1,
+    'automaticDeploy': 20
+}
+
+TOKEN_MANAGER_ERC1155 = {
+    '_initialized': 0,
+    '_initializing': 0,
+    '_roles': 101,
+    '_roleMembers': 151,
+    'messageProxy': 201,
+    'tokenManagerLinker': 202,
+    'communityLocker': 203,
+    'schainHash': 204,
+    'depositBox': 205,
+    'automaticDeploy': 205,
+    'tokenManagers': 206,
+    'deprecatedClonesErc1155': 207,
+    'addedClones': 208,
+    'clonesErc1155': 209,
+    'transferredAmount': 210,
+    '_schainToERC1155': 211
+}
+
+TOKEN_MANAGER_ERC1155_OFFSETS = {
+    '_initializing': 1,
+    'automaticDeploy': 20
+}
+
+TOKEN_MANAGER_ETH = {
+    '_initialized': 0,
+    '_initializing': 0,
+    '_roles': 101,
+    '_roleMembers': 151,
+    'messageProxy': 201,
+    'tokenManagerLinker': 202,
+    'communityLocker': 203,
+    'schainHash': 204,
+    'depositBox': 205,
+    'automaticDeploy': 205,
+    'tokenManagers': 206,
+    'ethErc20': 207
+}
+
+TOKEN_MANAGER_ETH_OFFSETS = {
+    '_initializing': 1,
+    'automaticDeploy': 20
+}
+
+ETH_ERC20 = {
+    '_initialized': 0,
+    '_initializing': 0,
+    '_roles': 101,
+    '_roleMembers': 151,
+    '_balances': 201,
+    '_allowances': 202,
+    '_totalSupply': 203,
+    '_name': 204,
+    '_symbol': 205
+}
+
+ETH_ERC20_OFFSETS = {
+    '_initializing': 1
+}
+
+MAPPING_VALUE_SLOTS = {
+    (101, constants.AUTOMATIC_DEPLOY_ROLE): 0xe067547994d6e3650b926d55734d8e21ad7fd9bed875670fc5c0a73c0339e15d,
+    (101, constants.BURNER_ROLE): 0x32ae7f8bc6372d23139dc578c86992e32a38d779ef7d3b755ec5abbb40a1d217,
+    (101, constants.CHAIN_CONNECTOR_ROLE): 0x4ffc65b36516b08763b48b9bb822e705a3b08b6d2f8a716532d5299a92bac56d,
+    (101, constants.CONSTANT_SETTER_ROLE): 0x8b587973c2f3d0d102e2b64bc961505aff4fafbf851505a4f5fff8c6d8cacd47,
+    (101, constants.DEFAULT_ADMIN_ROLE): 0xffdfc1249c027f9191656349feb0761381bb32c9f557e01f419fd08754bf5a1b,
+    (101, constants.EXTRA_CONTRACT_REGISTRAR_ROLE): 0x930d4857c07cd6a97f0bc4cc071b00bdf729955b896574a5b556911a794f0bfb,
+    (101, constants.MINTER_ROLE): 0xa0f6cebec7fb889cc5ac88647269c4c0108fb926abd2111b551f234b348876df,
+    (101, constants.REGISTRAR_ROLE): 0xed7a795e3d91132e14ec555ce871f2b1d9656e2831315613efb38d6d01688f72,
+    (101, constants.TOKEN_REGISTRAR_ROLE): 0x8227eeac2956ef21505014c039c3ed4cc464eee7d1761c7d3160e6e34873e95,
+    (151, constants.AUTOMATIC_DEPLOY_ROLE): 0xc94570da19dff961fa301fdf83b467d2e96da7a41ee6dcc5c5f7ac33c270b8b,
+    (151, constants.BURNER_ROLE): 0xc3c8c7e4fab505d509bd381fc6e46feb8541ec60cbf617fe952ca0ec2b020b85,
+    (151, constants.CHAIN_CONNECTOR_ROLE): 0x7f065e1e45f30000fed336f6677c7a20bcff4fc4216506fbdda09100aa402c04,
+    (151, constants.CONSTANT_SETTER_ROLE): 0x99da07a51965dd770db620ca10a6d22750b830e44037f966ed3f35a359445e34,
+    (151, constants.DEFAULT_ADMIN_ROLE): 0x683723e34a772b6e4f2c919bba7fa32ed8ea11a8325f54da7db716e9d9dd98c7,
+    (151, constants.EXTRA_CONTRACT_REGISTRAR_ROLE): 0x40ceb9c6b92458e7a1412d0d56e3ada46ba3959af8397aba49e1fd84e3a0e6be,
+    (151, constants.MINTER_ROLE): 0x81bcdf06b56c0ed62a68a6ae231e66722c27e6665c84ec0015693a6d86f2bb93,
+    (151, constants.REGISTRAR_ROLE): 0xfbdf3ae60affa28bc7bb164fb6a710dee213469b9b78699f6891be35d9fb6bf4,
+    (151, constants.TOKEN_REGISTRAR_ROLE): 0xd65aeee08c5cda0d1c500775ee0d4d0a0db5bc751bbb2e734d1fda5833a58367,
+    (201, constants.MAINNET_HASH): 0xfdcb579ba011421f0dfae7ec536c5fb608270565d2517ed5cdd8a33bda07d602,
+    (209, constants.ANY_SCHAIN): 0xfa5413e7b01fc543d01f0911de573ace463b956369df4472f39030e8d98b77,
+    (210, constants.MAINNET_HASH): 0x3b842995bb7793a90b453e7ee33bd2c16adcd3bfde40b84a935c55785cfad706
+}
+
+ARRAY_DATA_SLOTS = {
+    0xc94570da19dff961fa301fdf83b467d2e96da7a41ee6dcc5c5f7ac33c270b8b: 0x61d8ad11edb7edad4d8f3ba4ddc5c23ce790dfa64f07c35f257dc56cb7ce507b,
+    0xc3c8c7e4fab505d509bd381fc6e46feb8541ec60cbf617fe952ca0ec2b020b85: 0xde30f4d495db611e618274dc6e192bbf601fe6a22d1d6868c23aecfe97ee7daa,
+    0x7f065e1e45f30000fed336f6677c7a20bcff4fc4216506fbdda09100aa402c04: 0xd64bc233e931cdee2f89673acd91ee8def4f3b3460f46eebee2d54988278dc42,
+    0x99da07a51965dd770db620ca10a6d22750b830e44037f966ed3f35a359445e34: 0x4fe967e3cc0a2c7fb4ab9aad0077d46127fca97a10e9005e0462211a246be26f,
+    0x683723e34a772b6e4f2c919bba7fa32ed8ea11a8325f54da7db716e9d9dd98c7: 0x2dd8db9e26b2996e42648eaa4a235e69f68c16392431007c6e963fa26c4b8212,
+    0x40ceb9c6b92458e7a1412d0d56e3ada46ba3959af8397aba49e1fd84e3a0e6be: 0x9ee2475d69cffb8e42143371c5e2191d04827a36d7d341b6ea897d85efa25cc1,
+    0x81bcdf06b56c0ed62a68a6ae231e66722c27e6665c84ec0015693a6d86f2bb93: 0x9c555ab2ae7e03723af9091d21cc41f5624390bd2faa37e68f82ec10b3f4cdb1,
+    0xfbdf3ae60affa28bc7bb164fb6a710dee213469b9b78699f6891be35d9fb6bf4: 0x20759465fbe5069458376de22dca36115f7764f542021c0bcbb78bf61aa09a72,
+    0xd65aeee08c5cda0d1c500775ee0d4d0a0db5bc751bbb2e734d1fda5833a58367: 0x6c8f1a70270c11627beb08e2afcc680f7fe60ee60ea538c3e5de154847fa0d8a,
+    0xfa5413e7b01fc543d01f0911de573ace463b956369df4472f39030e8d98b77: 0x715a3a61a52d717d84dcf54d1ecf1177652c80cea3d15106ba5e65a48e9a1420
+}
@@ -0,0 +1,221 @@
+"""template.py
+
+Compile once template of allocations of IMA predeployed contracts.
+
+Most of the allocation does not depend on the schain:
+bytecode, proxy admin storage, fixed roles and registries.
+AllocationTemplate.compile() generates the allocation once
+and keeps its compact JSON text split at substitution points:
+    address       owner address or one of contracts_on_mainnet addresses as a storage value
+    schain hash   keccak256 of the schain name as a storage value
+    owner slot    slot of the owner in a mapping of roles as a storage key
+Rendering a schain patches the substitution points
+without running the generators.
+
+Points are found by generating allocations for different inputs,
+so a new dependency of storage on the inputs is either found
+or makes compile() fail verification against generate_contracts.
+Optional arguments of generate_contracts (role_members, eth_balances and others)
+change the amount of slots and are not supported by templates.
+
+Classes:
+    AllocationTemplate
+"""
+
+import json
+from typing import Dict, List, Tuple, Union
+
+from . import slots
+
+# substitution points
+_ADDRESS = 'address'
+_SCHAIN_HASH = 'schain_hash'
+_OWNER_SLOT = 'owner_slot'
+
+_OWNER_ARGUMENT = 'owner_address'
+
+# inputs used to find substitution points
+_REFERENCE_INPUTS = [
+    ('0x' + 'a1' * 20, 'template-reference-schain', 0xb100),
+    ('0x' + 'C2' * 20, 'template-other-schain', 0xd200),
+    ('0x' + 'e3' * 20, 'template-verification-schain', 0xf300)
+]
+
+Substitution = Tuple[str, Union[str, int, None]]
+
+
+class AllocationTemplate:
+    """Pre-rendered allocation with substitution points of schain specific values"""
+
+    def __init__(self, segments: List[Union[str, int]], substitutions: List[Substitution]):
+        # segments are literal text or indexes of substitutions
+        self._segments = segments
+        self._substitutions = substitutions
+
+    @classmethod
+    def compile(cls) -> 'AllocationTemplate':
+        """Generate the template and verify it against generate_contracts"""
+        # pylint: disable=import-outside-toplevel
+        from .generator import _create_generators, _generate_contracts  # pylint: disable=protected-access
+        generators = _create_generators()
+        reference, other, verification = [
+            (arguments, _generate_contracts(generators, **arguments))
+            for arguments in (_reference_arguments(*inputs) for inputs in _REFERENCE_INPUTS)
+        ]
+        template = cls._build(reference, other, generators)
+        verification_arguments, verification_allocations = verification
+        if template.render(**verification_arguments) != _to_json(verification_allocations):
+            raise ValueError('Allocations depend on the schain in a way templates do not support')
+        return template
+
+    def render(self, owner_address: str, schain_name: str, contracts_on_mainnet: dict) -> str:
+        """Return allocations of the schain as compact JSON text.
+
+        The text is equal to json.dumps(generate_contracts(...), separators=(',', ':'))
+        """
+        values = self._substitution_values(owner_address, schain_name, contracts_on_mainnet)
+        return ''.join([segment if isinstance(segment, str) else values[segment] for segment in self._segments])
+
+    def render_allocations(self, owner_address: str, schain_name: str, contracts_on_mainnet: dict) -> dict:
+        """Return allocations of the schain as generate_contracts does"""
+        return json.loads(self.render(owner_address, schain_name, contracts_on_mainnet))
+
+    # private
+
+    def _substitution_values(self, owner_address: str, schain_name: str, contracts_on_mainnet: dict) -> List[str]:
+        addresses = {_OWNER_ARGUMENT: _address_hex(owner_address)}
+        for argument, address in contracts_on_mainnet.items():
+            addresses[argument] = _address_hex(address)
+        owner_key = slots.address_key(owner_address)
+        values = []
+        for kind, parameter in self._substitutions:
+            if kind == _ADDRESS:
+                values.append(addresses[parameter])
+            elif kind == _SCHAIN_HASH:
+                values.append(slots.keccak256(schain_name.encode()).hex())
+            else:
+                # slots of owners are not recurring, so they bypass the slots cache
+                values.append(_slot_key(int.from_bytes(
+                    slots.keccak256(owner_key + parameter.to_bytes(32, 'big')), 'big')))
+        return values
+
+    @classmethod
+    def _build(cls, reference: Tuple[dict, dict], other: Tuple[dict, dict], generators: dict) -> 'AllocationTemplate':
+        arguments, allocations = reference
+        _, other_allocations = other
+        address_values = {'0x' + _address_hex(arguments[_OWNER_ARGUMENT]): _OWNER_ARGUMENT}
+        for argument, address in arguments['contracts_on_mainnet'].items():
+            address_values['0x' + _address_hex(address)] = argument
+        schain_hash = '0x' + slots.keccak256(arguments['schain_name'].encode()).hex()
+        owner_slots = _owner_slots(arguments[_OWNER_ARGUMENT], generators)
+
+        builder = _SegmentsBuilder()
+        builder.literal('{')
+        for account_index, (address, account) in enumerate(allocations.items()):
+            other_storage = other_allocations.get(address, {}).get('storage', {})
+            builder.literal((',' if account_index else '') + _to_json(address) + ':{')
+            for field_index, (field, value) in enumerate(account.items()):
+                builder.literal((',' if field_index else '') + _to_json(field) + ':')
+                if field != 'storage':
+                    builder.literal(_to_json(value))
+                    continue
+                builder.literal('{')
+                for slot_index, (slot, slot_value) in enumerate(value.items()):
+                    builder.literal(',"' if slot_index else '"')
+                    if slot in other_storage:
+                        builder.literal(slot)
+                    elif slot in owner_slots:
+                        # length of the slot varies, so it is substituted with its 0x prefix
+                        builder.substitution((_OWNER_SLOT, owner_slots[slot]))
+                    else:
+                        raise ValueError(f'Slot {slot} of {address} depends on the schain in an unknown way')
+                    builder.literal('":"0x')
+                    if slot_value in address_values:
+                        builder.substitution((_ADDRESS, address_values[slot_value]))
+                    elif slot_value == schain_hash:
+                        builder.substitution((_SCHAIN_HASH, None))
+                    else:
+                        builder.literal(slot_value[2:])
+                    builder.literal('"')
+                builder.literal('}')
+            builder.literal('}')
+        builder.literal('}')
+        return cls(builder.finish(), builder.substitutions)
+
+
+class _SegmentsBuilder:
+    """Joins adjacent literals and numbers distinct substitutions"""
+
+    def __init__(self):
+        self.segments: List[Union[str, int]] = []
+        self.substitutions: List[Substitution] = []
+        self._indexes: Dict[Substitution, int] = {}
+        self._literal: List[str] = []
+
+    def literal(self, text: str) -> None:
+        self._literal.append(text)
+
+    def substitution(self, substitution: Substitution) -> None:
+        if substitution not in self._indexes:
+            self._indexes[substitution] = len(self.substitutions)
+            self.substitutions.append(substitution)
+        self._flush()
+        self.segments.append(self._indexes[substitution])
+
+    def finish(self) -> List[Union[str, int]]:
+        self._flush()
+        return self.segments
+
+    def _flush(self) -> None:
+        if self._literal:
+            self.segments.append(''.join(self._literal))
+            self._literal = []
+
+
+def _reference_arguments(owner_address: str, schain_name: str, first_mainnet_address: int) -> dict:
+    # pylint: disable=import-outside-toplevel
+    from .config import MAINNET_CONTRACT_KEYS
+    return {
+        _OWNER_ARGUMENT: owner_address,
+        'schain_name': schain_name,
+        'contracts_on_mainnet': {
+            argument: f'0x{first_mainnet_address + index:040x}'
+            for index, argument in enumerate(MAINNET_CONTRACT_KEYS.values())
+        }
+    }
+
+
+def _owner_slots(owner_address: str, generators: dict) -> Dict[str, int]:
+    """Return keys of the owner in mappings of roles of the generators and slots of the mappings"""
+    owner_key = slots.address_key(owner_address)
+    owner_slots = {}
+    for generator in generators.values():
+        generator_class = type(getattr(generator, 'implementation_generator', generator))
+        if not hasattr(generator_class, 'ROLES_SLOT'):
+            continue
+        for name in dir(generator_class):
+            role = getattr(generator_class, name)
+            if not name.endswith('_ROLE') or not isinstance(role, bytes) or len(role) != 32:
+                continue
+            # members of the role and indexes of the members in the enumerable set
+            for mapping_slot in (
+                    slots.mapping_value_slot(generator_class.ROLES_SLOT, role),
+                    slots.mapping_value_slot(generator_class.ROLE_MEMBERS_SLOT, role) + 1):
+                owner_slots[_slot_key(slots.mapping_value_slot(mapping_slot, owner_key))] = mapping_slot
+    return owner_slots
+
+
+def _address_hex(address: str) -> str:
+    if not isinstance(address, str) or len(address) != 42 or not address.startswith('0x'):
+        raise ValueError(f'{address!r} is not an address')
+    int(address, 16)
+    return address[2:].lower()
+
+
+def _slot_key(slot: int) -> str:
+    key = format(slot, 'x')
+    return '0x' + ('0' + key if len(key) % 2 else key)
+
+
+def _to_json(value) -> str:
+    return json.dumps(value, separators=(',', ':'))
@@ -0,0 +1,398 @@
+"""verifier.py
+
+Offline verification of generated allocations.
+
+Storage of every predeployed contract is decoded with the slot constants
+of its generator and compared with the expected state.
+Every slot of the storage must be explained by the verification,
+so unexpected values are reported too.
+No node is required.
+
+Usage:
+    python -m ima_predeployed.verifier genesis.json config.json [target_key]
+
+Functions:
+    verify_contracts
+    main
+
+Classes:
+    StorageReader
+    VerificationError
+"""
+
+import json
+import sys
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from . import constants, slots
+from .addresses import (
+    PROXY_ADMIN_ADDRESS, MESSAGE_PROXY_FOR_SCHAIN_ADDRESS, KEY_STORAGE_ADDRESS, COMMUNITY_LOCKER_ADDRESS,
+    TOKEN_MANAGER_ERC1155_ADDRESS, TOKEN_MANAGER_LINKER_ADDRESS, TOKEN_MANAGER_ETH_ADDRESS,
+    TOKEN_MANAGER_ERC20_ADDRESS, TOKEN_MANAGER_ERC721_ADDRESS, ETH_ERC20_ADDRESS,
+    TOKEN_MANAGER_ERC721_WITH_METADATA_ADDRESS
+)
+from .config import schain_config_to_arguments
+from .version import get_version
+
+ADDRESS_MASK = (1 << 160) - 1
+
+
+class VerificationError(AssertionError):
+    """Generated allocation does not match the expected state"""
+
+
+class StorageReader:
+    """Decodes values of solidity types from storage in generate_storage format.
+
+    Slots which were read are remembered
+    to find values which are not explained by the verification
+    """
+
+    def __init__(self, storage: Dict[str, str]):
+        self._storage = {int(slot, 16): int(value, 16) for slot, value in storage.items()}
+        self._read: Set[int] = set()
+
+    def read_uint256(self, slot: int) -> int:
+        self._read.add(slot)
+        return self._storage.get(slot, 0)
+
+    def read_bytes32(self, slot: int) -> bytes:
+        return self.read_uint256(slot).to_bytes(32, 'big')
+
+    def read_address(self, slot: int, offset: int = 0) -> str:
+        """Read address stored `offset` bytes from the lowest byte of the slot"""
+        return f'0x{(self.read_uint256(slot) >> (8 * offset)) & ADDRESS_MASK:040x}'
+
+    def read_bool(self, slot: int, offset: int = 0) -> bool:
+        """Read bool stored `offset` bytes from the lowest byte of the slot"""
+        return (self.read_uint256(slot) >> (8 * offset)) & 0xff != 0
+
+    def read_string(self, slot: int) -> str:
+        value = self.read_uint256(slot)
+        if value & 1 == 0:
+            length = (value & 0xff) // 2
+            return value.to_bytes(32, 'big')[:length].decode()
+        length = (value - 1) // 2
+        data = b''.join(
+            self.read_bytes32(slots.array_value_slot(slot, index))
+            for index in range((length + 31) // 32))
+        return data[:length].decode()
+
+    def read_addresses_array(self, slot: int) -> List[str]:
+        return [
+            self.read_address(slots.array_value_slot(slot, index))
+            for index in range(self.read_uint256(slot))
+        ]
+
+    def read_address_set(self, slot: int) -> List[str]:
+        """Read EnumerableSet.AddressSet checking consistency of its indexes"""
+        values = self.read_addresses_array(slot)
+        index_slots = slots.mapping_value_slots(slot + 1, [slots.address_key(value) for value in values])
+        for index, (value, index_slot) in enumerate(zip(values, index_slots)):
+            _expect(self.read_uint256(index_slot), index + 1, f'index of {value} in set at slot {slot}')
+        return values
+
+    def mapping_value_slot(self, slot: int, key: Union[bytes, int, str], key_type: str) -> int:
+        return slots.calculate_mapping_value_slot(slot, key, key_type)
+
+    def get_role_members(self, role_members_slot: int, role: bytes) -> List[str]:
+        return self.read_address_set(self.mapping_value_slot(role_members_slot, role, 'bytes32'))
+
+    def has_role(self, roles_slot: int, role: bytes, account: str) -> bool:
+        members_slot = self.mapping_value_slot(roles_slot, role, 'bytes32')
+        return self.read_bool(self.mapping_value_slot(members_slot, account, 'address'))
+
+    def unread_slots(self) -> List[int]:
+        return sorted(slot for slot in self._storage if slot not in self._read)
+
+
+def verify_contracts(
+        allocations: Dict[str, dict],
+        owner_address: str,
+        schain_name: str,
+        contracts_on_mainnet: dict,
+        *,
+        role_members: Optional[Dict[str, Dict[str, List[str]]]] = None,
+        eth_balances: Optional[Iterable[Tuple[str, int]]] = None,
+        token_clones: Optional[Dict[str, List[Tuple[str, str]]]] = None,
+        peer_schains: Optional[List[str]] = None,
+        active_users: Optional[Iterable[str]] = None,
+        time_limits_per_message: Optional[Dict[str, int]] = None,
+        extra_contracts: Optional[Dict[str, List[str]]] = None) -> None:
+    """Check that allocations contain IMA predeployed contracts
+    generated by generate_contracts with the same arguments.
+
+    Raises VerificationError on the first mismatch
+    """
+    # pylint: disable=import-outside-toplevel
+    from .generator import GenesisOptions, _create_generators, _upgradeable_contracts
+    accounts = {address.lower(): account for address, account in allocations.items()}
+    generators = _create_generators()
+
+    proxy_admin = _get_account(accounts, PROXY_ADMIN_ADDRESS)
+    reader = StorageReader(proxy_admin.get('storage', {}))
+    try:
+        _expect_address(reader.read_address(generators['proxy_admin'].OWNER_SLOT), owner_address, 'owner')
+        _expect_all_read(reader)
+    except VerificationError as error:
+        raise VerificationError(f'proxy_admin: {error}') from error
+
+    options = GenesisOptions(
+        role_members=role_members,
+        eth_balances=eth_balances,
+        token_clones=token_clones,
+        peer_schains=peer_schains,
+        active_users=active_users,
+        time_limits_per_message=time_limits_per_message,
+        extra_contracts=extra_contracts)
+    for name, contract_address, implementation_address, kwargs in _upgradeable_contracts(
+            schain_name, contracts_on_mainnet, options):
+        proxy_generator = generators[name]
+        implementation_generator = proxy_generator.implementation_generator
+        try:
+            _expect(_get_account(accounts, implementation_address).get('code'),
+                    implementation_generator.bytecode, 'implementation code')
+            proxy = _get_account(accounts, contract_address)
+            _expect(proxy.get('code'), proxy_generator.bytecode, 'proxy code')
+            reader = StorageReader(proxy.get('storage', {}))
+            _expect_address(reader.read_address(proxy_generator.ADMIN_SLOT), PROXY_ADMIN_ADDRESS, 'proxy admin')
+            _expect_address(reader.read_address(proxy_generator.IMPLEMENTATION_SLOT), implementation_address,
+                            'implementation')
+            _VERIFIERS[name](reader, type(implementation_generator), deployer_address=owner_address, **kwargs)
+            _expect_all_read(reader)
+        except VerificationError as error:
+            raise VerificationError(f'{name}: {error}') from error
+
+
+def main() -> None:
+    """Main function"""
+    if len(sys.argv) < 3:
+        print('Usage:')
+        print('python -m ima_predeployed.verifier genesis.json config.json [target_key]')
+        sys.exit(1)
+    target_key = sys.argv[3] if len(sys.argv) > 3 else 'alloc'
+    with open(sys.argv[1], encoding='utf-8') as genesis_file:
+        allocations = json.load(genesis_file)[target_key]
+    with open(sys.argv[2], encoding='utf-8') as config_file:
+        config = json.load(config_file)
+    try:
+        verify_contracts(allocations, **schain_config_to_arguments(config))
+    except VerificationError as error:
+        sys.exit(f'Verification failed: {error}')
+    print('IMA predeployed contracts are valid')
+
+
+# private
+
+def _expect(actual, expected, description: str) -> None:
+    if actual != expected:
+        raise VerificationError(f'{description}: {_format(actual)} != {_format(expected)}')
+
+
+def _format(value) -> str:
+    if isinstance(value, bytes):
+        return '0x' + value.hex()
+    return repr(value)
+
+
+def _expect_address(actual: str, expected: str, description: str) -> None:
+    _expect(actual.lower(), expected.lower(), description)
+
+
+def _expect_addresses(actual: List[str], expected: List[str], description: str) -> None:
+    _expect([address.lower() for address in actual], [address.lower() for address in expected], description)
+
+
+def _expect_all_read(reader: StorageReader) -> None:
+    unread_slots = reader.unread_slots()
+    if unread_slots:
+        raise VerificationError(f'unexpected storage slots {[hex(slot) for slot in unread_slots]}')
+
+
+def _get_account(accounts: Dict[str, dict], address: str) -> dict:
+    account = accounts.get(address.lower())
+    if account is None:
+        raise VerificationError(f'{address} is not allocated')
+    return account
+
+
+def _verify_roles(
+        reader: StorageReader,
+        generator: type,
+        roles: Dict[bytes, List[str]],
+        role_members: Optional[Dict[str, List[str]]] = None) -> None:
+    for role, members in generator.merge_role_members(roles, role_members).items():
+        _expect_addresses(reader.get_role_members(generator.ROLE_MEMBERS_SLOT, role), members,
+                          f'members of role {role.hex()}')
+        for member in members:
+            _expect(reader.has_role(generator.ROLES_SLOT, role, member), True, f'{member} has role {role.hex()}')
+
+
+def _verify_initialized(reader: StorageReader, generator: type) -> None:
+    _expect(reader.read_uint256(generator.INITIALIZED_SLOT), 1, 'initialized')
+
+
+def _verify_schain_hash(reader: StorageReader, generator: type, schain_name: str) -> None:
+    _expect(reader.read_bytes32(generator.SCHAIN_HASH_SLOT), slots.keccak256(schain_name.encode()), 'schainHash')
+
+
+def _verify_message_proxy_for_schain(reader: StorageReader, generator: type, **kwargs) -> None:
+    _verify_initialized(reader, generator)
+    _verify_roles(reader, generator, {
+        generator.DEFAULT_ADMIN_ROLE: [kwargs['deployer_address']],
+        generator.CHAIN_CONNECTOR_ROLE: [TOKEN_MANAGER_LINKER_ADDRESS]
+    }, kwargs.get('role_members'))
+    _expect_address(reader.read_address(generator.KEY_STORAGE_SLOT), KEY_STORAGE_ADDRESS, 'keyStorage')
+    _verify_schain_hash(reader, generator, kwargs['schain_name'])
+    mainnet_slot = reader.mapping_value_slot(generator.CONNECTED_CHAINS_SLOT, generator.MAINNET_HASH, 'bytes32')
+    _expect(reader.read_uint256(mainnet_slot), 0, 'incoming messages counter of Mainnet')
+    _expect(reader.read_uint256(mainnet_slot + 1), 0, 'outgoing messages counter of Mainnet')
+    _expect(reader.read_bool(mainnet_slot + 2), True, 'Mainnet is connected')
+    for peer_schain in kwargs.get('peer_schains') or []:
+        peer_slot = reader.mapping_value_slot(
+            generator.CONNECTED_CHAINS_SLOT, slots.keccak256(peer_schain.encode()), 'bytes32')
+        _expect(reader.read_bool(peer_slot + 2), True, f'{peer_schain} is connected')
+    _expect(reader.read_uint256(generator.GAS_LIMIT_SLOT), generator.GAS_LIMIT, 'gasLimit')
+    _expect(reader.read_string(generator.VERSION_SLOT), get_version(), 'version')
+    registered_contracts = {
+        generator.ANY_SCHAIN: [
+            TOKEN_MANAGER_ETH_ADDRESS,
+            TOKEN_MANAGER_ERC20_ADDRESS,
+            TOKEN_MANAGER_ERC721_ADDRESS,
+            TOKEN_MANAGER_ERC1155_ADDRESS,
+            TOKEN_MANAGER_ERC721_WITH_METADATA_ADDRESS,
+            COMMUNITY_LOCKER_ADDRESS
+        ]
+    }
+    for chain, contracts in (kwargs.get('extra_contracts') or {}).items():
+        chain_hash = generator._chain_hash(chain)  # pylint: disable=protected-access
+        registered_contracts[chain_hash] = registered_contracts.get(chain_hash, []) + list(contracts)
+    for chain_hash, contracts in registered_contracts.items():
+        _expect_addresses(
+            reader.read_address_set(
+                reader.mapping_value_slot(generator.REGISTRY_CONTRACTS_SLOT, chain_hash, 'bytes32')),
+            contracts,
+            'contracts registered for any schain' if chain_hash == generator.ANY_SCHAIN else
+            f'contracts registered for chain 0x{chain_hash.hex()}')
+
+
+def _verify_key_storage(reader: StorageReader, generator: type, **kwargs) -> None:
+    _verify_initialized(reader, generator)
+    _verify_roles(reader, generator, {generator.DEFAULT_ADMIN_ROLE: [kwargs['deployer_address']]})
+
+
+def _verify_community_locker(reader: StorageReader, generator: type, **kwargs) -> None:
+    _verify_initialized(reader, generator)
+    _verify_roles(reader, generator, {generator.DEFAULT_ADMIN_ROLE: [kwargs['deployer_address']]})
+    _expect_address(reader.read_address(generator.MESSAGE_PROXY_SLOT), MESSAGE_PROXY_FOR_SCHAIN_ADDRESS,
+                    'messageProxy')
+    _expect_address(reader.read_address(generator.TOKEN_MANAGER_LINKER_SLOT), TOKEN_MANAGER_LINKER_ADDRESS,
+                    'tokenManagerLinker')
+    _expect_address(reader.read_address(generator.COMMUNITY_POOL_SLOT), kwargs['community_pool_address'],
+                    'communityPool')
+    _verify_schain_hash(reader, generator, kwargs['schain_name'])
+    time_limits = {'Mainnet': generator.DEFAULT_TIME_LIMIT_SEC, **(kwargs.get('time_limits_per_message') or {})}
+    for chain_name, time_limit in time_limits.items():
+        _expect(
+            reader.read_uint256(reader.mapping_value_slot(
+                generator.TIME_LIMIT_PER_MESSAGE_SLOT, slots.keccak256(chain_name.encode()), 'bytes32')),
+            time_limit,
+            f'timeLimitPerMessage of {chain_name}')
+    for user in kwargs.get('active_users') or []:
+        _expect(reader.read_bool(reader.mapping_value_slot(generator.ACTIVE_USERS_SLOT, user, 'address')), True,
+                f'{user} is active')
+
+
+def _verify_token_manager_linker(reader: StorageReader, generator: type, **kwargs) -> None:
+    _verify_initialized(reader, generator)
+    _verify_roles(reader, generator, {
+        generator.DEFAULT_ADMIN_ROLE: [kwargs['deployer_address']],
+        generator.REGISTRAR_ROLE: [kwargs['deployer_address']]
+    }, kwargs.get('role_members'))
+    _expect_address(reader.read_address(generator.MESSAGE_PROXY_SLOT), MESSAGE_PROXY_FOR_SCHAIN_ADDRESS,
+                    'messageProxy')
+    _expect_address(reader.read_address(generator.LINKER_ADDRESS_SLOT), kwargs['linker_address'], 'linkerAddress')
+    _expect_addresses(
+        reader.read_addresses_array(generator.TOKEN_MANAGERS_SLOT),
+        [
+            TOKEN_MANAGER_ETH_ADDRESS,
+            TOKEN_MANAGER_ERC20_ADDRESS,
+            TOKEN_MANAGER_ERC721_ADDRESS,
+            TOKEN_MANAGER_ERC1155_ADDRESS,
+            TOKEN_MANAGER_ERC721_WITH_METADATA_ADDRESS
+        ],
+        'tokenManagers')
+
+
+def _verify_token_manager(reader: StorageReader, generator: type, **kwargs) -> None:
+    deployer_address = kwargs['deployer_address']
+    _verify_initialized(reader, generator)
+    _verify_roles(reader, generator, {
+        generator.DEFAULT_ADMIN_ROLE: [deployer_address],
+        generator.AUTOMATIC_DEPLOY_ROLE: [deployer_address],
+        generator.TOKEN_REGISTRAR_ROLE: [deployer_address]
+    }, kwargs.get('role_members'))
+    _expect_address(reader.read_address(generator.MESSAGE_PROXY_SLOT), MESSAGE_PROXY_FOR_SCHAIN_ADDRESS,
+                    'messageProxy')
+    _expect_address(reader.read_address(generator.TOKEN_MANAGER_LINKER_SLOT), TOKEN_MANAGER_LINKER_ADDRESS,
+                    'tokenManagerLinker')
+    _expect_address(reader.read_address(generator.COMMUNITY_LOCKER_SLOT), COMMUNITY_LOCKER_ADDRESS,
+                    'communityLocker')
+    _verify_schain_hash(reader, generator, kwargs['schain_name'])
+    _expect_address(reader.read_address(generator.DEPOSIT_BOX_SLOT), kwargs['deposit_box_address'], 'depositBox')
+    _expect(reader.read_bool(generator.AUTOMATIC_DEPLOY_SLOT, offset=generator.AUTOMATIC_DEPLOY_OFFSET), False,
+            'automaticDeploy')
+    for peer_schain in kwargs.get('peer_schains') or []:
+        _expect_address(
+            reader.read_address(reader.mapping_value_slot(
+                generator.TOKEN_MANAGERS_SLOT, slots.keccak256(peer_schain.encode()), 'bytes32')),
+            kwargs['peer_token_manager_address'],
+            f'token manager of {peer_schain}')
+    if kwargs.get('token_clones'):
+        mainnet_clones_slot = reader.mapping_value_slot(generator.CLONES_SLOT, constants.MAINNET_HASH, 'bytes32')
+        for token, clone in kwargs['token_clones']:
+            _expect_address(reader.read_address(reader.mapping_value_slot(mainnet_clones_slot, token, 'address')),
+                            clone, f'clone of {token}')
+            _expect(reader.read_bool(reader.mapping_value_slot(generator.ADDED_CLONES_SLOT, clone, 'address')), True,
+                    f'{clone} is added')
+
+
+def _verify_token_manager_eth(reader: StorageReader, generator: type, **kwargs) -> None:
+    _verify_token_manager(reader, generator, **kwargs)
+    _expect_address(reader.read_address(generator.ETH_ERC_20_SLOT), ETH_ERC20_ADDRESS, 'ethErc20')
+
+
+def _verify_eth_erc20(reader: StorageReader, generator: type, **kwargs) -> None:
+    _verify_initialized(reader, generator)
+    _verify_roles(reader, generator, {
+        generator.DEFAULT_ADMIN_ROLE: [kwargs['deployer_address']],
+        generator.MINTER_ROLE: [TOKEN_MANAGER_ETH_ADDRESS],
+        generator.BURNER_ROLE: [TOKEN_MANAGER_ETH_ADDRESS]
+    })
+    _expect(reader.read_string(generator.NAME_SLOT), generator.NAME, 'name')
+    _expect(reader.read_string(generator.SYMBOL_SLOT), generator.SYMBOL, 'symbol')
+    _expect(reader.read_uint256(generator.DECIMALS_SLOT), generator.DECIMALS, 'decimals')
+    total_supply = 0
+    for holder, amount in kwargs.get('balances') or []:
+        _expect(reader.read_uint256(reader.mapping_value_slot(generator.BALANCES_SLOT, holder, 'address')), amount,
+                f'balance of {holder}')
+        total_supply += amount
+    _expect(reader.read_uint256(generator.TOTAL_SUPPLY_SLOT), total_supply, 'totalSupply')
+
+
+_VERIFIERS = {
+    'message_proxy_for_schain': _verify_message_proxy_for_schain,
+    'key_storage': _verify_key_storage,
+    'community_locker': _verify_community_locker,
+    'token_manager_linker': _verify_token_manager_linker,
+    'token_manager_eth': _verify_token_manager_eth,
+    'token_manager_erc20': _verify_token_manager,
+    'token_manager_erc721': _verify_token_manager,
+    'token_manager_erc1155': _verify_token_manager,
+    'token_manager_erc721_with_metadata': _verify_token_manager,
+    'eth_erc20': _verify_eth_erc20
+}
+
+
+if __name__ == '__main__':
+    main()
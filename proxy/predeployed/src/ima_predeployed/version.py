@@ -0,0 +1,23 @@
+"""version.py
+
+Version of ima_predeployed package.
+
+The version is emitted into _version.py by scripts/generate_constants.py at build time.
+Installed metadata is used when the package runs from the source tree.
+
+Functions:
+    get_version
+"""
+
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def get_version() -> str:
+    """Return version of ima_predeployed package"""
+    try:
+        from ._version import VERSION  # pylint: disable=import-outside-toplevel
+        return VERSION
+    except ImportError:
+        from importlib.metadata import version  # pylint: disable=import-outside-toplevel
+        return version('ima_predeployed')
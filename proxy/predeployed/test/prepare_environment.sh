@@ -10,6 +10,7 @@ export PYTHONPATH=src
 pip install -r test/requirements.txt
 BLOCKCHAIN_DIR="/tmp/blockchain/"
 python test/generate_genesis.py test/base_genesis.json test/config.json > test/genesis.json
+python -m ima_predeployed.verifier test/genesis.json test/config.json
 rm -r "$BLOCKCHAIN_DIR" || true
 mkdir "$BLOCKCHAIN_DIR"
 geth --datadir "$BLOCKCHAIN_DIR" init test/genesis.json
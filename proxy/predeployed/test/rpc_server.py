@@ -0,0 +1,101 @@
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+
+from eth_tester import EthereumTester, PyEVMBackend
+from eth_utils import to_canonical_address
+from web3 import EthereumTesterProvider
+
+# eth_call is executed from the funded account because the sender has to pay for gas
+CALLER_ADDRESS = '0x' + '0' * 36 + 'ca11'
+CALLER_BALANCE = 10 ** 24
+
+
+def _to_int(value) -> int:
+    if isinstance(value, int):
+        return value
+    return int(value, 16) if value.startswith('0x') else int(value)
+
+
+def _to_genesis_state(alloc: dict) -> dict:
+    return {
+        to_canonical_address(address): {
+            'balance': _to_int(account.get('balance', 0)),
+            'nonce': _to_int(account.get('nonce', 0)),
+            'code': bytes.fromhex(account.get('code', '0x')[2:]),
+            'storage': {_to_int(slot): _to_int(value) for slot, value in account.get('storage', {}).items()}
+        }
+        for address, account in alloc.items()
+    }
+
+
+class LocalRpcServer:
+    """JSON-RPC server with genesis state executed by py-evm.
+
+    Stands in for geth so the checks run without a node.
+    Batch requests are supported
+    """
+
+    def __init__(self, genesis_filename: str, target_key: str = 'alloc', port: int = 0):
+        with open(genesis_filename) as genesis_file:
+            alloc = json.load(genesis_file)[target_key]
+        genesis_state = _to_genesis_state(alloc)
+        genesis_state.setdefault(
+            to_canonical_address(CALLER_ADDRESS),
+            {'balance': CALLER_BALANCE, 'nonce': 0, 'code': b'', 'storage': {}})
+        backend = PyEVMBackend(genesis_state=genesis_state)
+        self.provider = EthereumTesterProvider(EthereumTester(backend))
+        self._lock = Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._create_handler())
+        self._thread = Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self._server.server_address
+        return f'http://{host}:{port}'
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def handle(self, request):
+        if isinstance(request, list):
+            return [self.handle(item) for item in request]
+        method = request['method']
+        params = request.get('params', [])
+        if method in ('eth_call', 'eth_estimateGas') and 'from' not in params[0]:
+            params = [{**params[0], 'from': CALLER_ADDRESS}, *params[1:]]
+        try:
+            with self._lock:
+                response = self.provider.make_request(method, params)
+        except Exception as error:  # pylint: disable=broad-except
+            response = {'error': {'code': -32000, 'message': str(error)}}
+        return {**response, 'id': request.get('id'), 'jsonrpc': '2.0'}
+
+    def _create_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                body = json.dumps(server.handle(request), default=_to_json).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def _to_json(value):
+    if isinstance(value, bytes):
+        return '0x' + value.hex()
+    raise TypeError(f'{type(value)} is not JSON serializable')
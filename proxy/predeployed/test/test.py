@@ -1,3 +1,4 @@
+from contracts.admin_upgradeability_proxy import check_admin_upgradeability_proxy
 from contracts.community_locker import check_community_locker
 from contracts.eth_erc20 import check_eth_erc20
 from contracts.key_storage import check_key_storage
@@ -8,7 +9,14 @@ from contracts.token_manager_erc1155 import check_token_manager_erc1155
 from contracts.token_manager_erc721_with_metadata import check_token_manager_erc721_with_metadata
 from contracts.token_manager_eth import check_token_manager_eth
 from contracts.token_manager_linker import check_token_manager_linker
-from test_generator import check_meta_generator
+from test_generator import check_meta_generator, check_artifact_registry, check_artifact_pack, check_pack, \
+    check_abi_bundle, check_slots, check_storage_layout, check_storage_builder, check_role_members, \
+    check_genesis_writer, check_allocation_cache, check_concurrent_generation, check_generate_contracts_many, \
+    check_cli, check_bundle, check_profiling, check_template, check_diff, check_eth_balances, \
+    check_token_clones, check_peer_schains, check_active_users, check_extra_contracts, check_storage_verifier
+from ima_predeployed.config import schain_config_to_arguments
+from tools import BatchCalls, connect
+import argparse
 import json
 
 with open('config.json') as config_file:
@@ -24,18 +32,60 @@ with open('config.json') as config_file:
     erc721_with_metadata_deposit_box = config['erc721_with_metadata_deposit_box']
 
 
+def check_contracts():
+    calls = BatchCalls()
+    check_admin_upgradeability_proxy(calls)
+    check_message_proxy_for_schain(calls, owner_address, schain_name)
+    check_key_storage(calls, owner_address)
+    check_community_locker(calls, owner_address, schain_name, community_pool)
+    check_token_manager_linker(calls, owner_address, linker_address)
+    check_token_manager_eth(calls, owner_address, eth_deposit_box, schain_name)
+    check_token_manager_erc20(calls, owner_address, erc20_deposit_box, schain_name)
+    check_token_manager_erc721(calls, owner_address, erc721_deposit_box, schain_name)
+    check_token_manager_erc1155(calls, owner_address, erc1155_deposit_box, schain_name)
+    check_token_manager_erc721_with_metadata(calls, owner_address, erc721_with_metadata_deposit_box, schain_name)
+    check_eth_erc20(calls, owner_address)
+    calls.execute()
+
+
 def main():
-    check_message_proxy_for_schain(owner_address, schain_name)
-    check_key_storage(owner_address)
-    check_community_locker(owner_address, schain_name, community_pool)
-    check_token_manager_linker(owner_address, linker_address)
-    check_token_manager_eth(owner_address, eth_deposit_box, schain_name)
-    check_token_manager_erc20(owner_address, erc20_deposit_box, schain_name)
-    check_token_manager_erc721(owner_address, erc721_deposit_box, schain_name)
-    check_token_manager_erc1155(owner_address, erc1155_deposit_box, schain_name)
-    check_token_manager_erc721_with_metadata(owner_address, erc721_with_metadata_deposit_box, schain_name)
-    check_eth_erc20(owner_address)
+    parser = argparse.ArgumentParser(description='Check IMA predeployed contracts')
+    parser.add_argument('--genesis', help='run the checks against a local RPC server with the genesis '
+                                          'instead of the running node')
+    args = parser.parse_args()
+
+    if args.genesis is None:
+        connect()
+        check_contracts()
+    else:
+        from rpc_server import LocalRpcServer
+        with LocalRpcServer(args.genesis) as server:
+            connect(server.endpoint)
+            check_contracts()
     check_meta_generator()
+    check_artifact_registry()
+    check_artifact_pack()
+    check_pack()
+    check_abi_bundle()
+    check_slots()
+    check_storage_layout()
+    check_storage_builder()
+    check_role_members(**schain_config_to_arguments(config))
+    check_genesis_writer()
+    check_allocation_cache()
+    check_concurrent_generation(**schain_config_to_arguments(config))
+    check_generate_contracts_many(**schain_config_to_arguments(config))
+    check_cli(config)
+    check_bundle(config)
+    check_profiling(**schain_config_to_arguments(config))
+    check_template(config)
+    check_diff(**schain_config_to_arguments(config))
+    check_eth_balances(config)
+    check_token_clones(**schain_config_to_arguments(config))
+    check_peer_schains(**schain_config_to_arguments(config))
+    check_active_users(config)
+    check_extra_contracts(**schain_config_to_arguments(config))
+    check_storage_verifier(**schain_config_to_arguments(config))
 
     print('All tests pass')
 
@@ -1,8 +1,38 @@
-from ima_predeployed.generator import generate_meta
+import io
+import json
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from predeployed_generator.openzeppelin.access_control_enumerable_generator import (
+    AccessControlEnumerableGenerator as OpenzeppelinAccessControlEnumerableGenerator
+)
+from web3 import Web3
+
+from ima_predeployed import abi_bundle, artifact_registry, constants, slots, storage_layout
+from ima_predeployed.allocation_cache import AllocationCache
+from ima_predeployed.bundle import BundleReader
+from ima_predeployed.cli import generate_allocations, generate_bundle, read_configs
+from ima_predeployed.config import schain_config_to_arguments
+from ima_predeployed.diff import ADDED, CHANGED, REMOVED, diff_allocations, format_diff
+from ima_predeployed.genesis import write_genesis
+from ima_predeployed.pack import PackError, PackReader, write_pack
+from ima_predeployed.profiling import GenerationStats
+from ima_predeployed.snapshot import AddressesSnapshot, BalancesSnapshot
+from ima_predeployed.storage import StorageBuilder
+from ima_predeployed.template import AllocationTemplate
+from ima_predeployed.verifier import VerificationError, verify_contracts
+from ima_predeployed.contracts.eth_erc20 import EthErc20Generator
+from ima_predeployed.contracts.message_proxy_for_schain import MessageProxyForSchainGenerator
+from ima_predeployed.generator import (
+    generate_abi, generate_contracts, generate_contracts_many, generate_meta, get_abi, write_abi_bundle
+)
 from ima_predeployed.addresses import (
-    MESSAGE_PROXY_FOR_SCHAIN_IMPLEMENTATION_ADDRESS,
+    MESSAGE_PROXY_FOR_SCHAIN_IMPLEMENTATION_ADDRESS, COMMUNITY_LOCKER_ADDRESS,
     MESSAGE_PROXY_FOR_SCHAIN_ADDRESS, TOKEN_MANAGER_ERC1155_ADDRESS,
-    TOKEN_MANAGER_ERC1155_IMPLEMENTATION_ADDRESS
+    TOKEN_MANAGER_ERC1155_IMPLEMENTATION_ADDRESS, PROXY_ADMIN_ADDRESS, ETH_ERC20_ADDRESS,
+    TOKEN_MANAGER_ERC20_ADDRESS, TOKEN_MANAGER_ERC721_ADDRESS
 )
 
 
@@ -12,3 +42,672 @@ def check_meta_generator():
     assert meta[MESSAGE_PROXY_FOR_SCHAIN_ADDRESS]['name'] == 'TransparentUpgradeableProxy'
     assert meta[TOKEN_MANAGER_ERC1155_IMPLEMENTATION_ADDRESS]['name'] == 'TokenManagerERC1155'
     assert meta[TOKEN_MANAGER_ERC1155_ADDRESS]['name'] == 'TransparentUpgradeableProxy'
+
+
+def check_artifact_registry():
+    artifact_registry.clear()
+    artifact_registry.warm()
+    first = MessageProxyForSchainGenerator()
+    second = MessageProxyForSchainGenerator()
+    assert first.bytecode is second.bytecode
+    assert first.get_abi() is second.get_abi()
+    assert first.get_meta() is second.get_meta()
+    artifact_registry.clear()
+    assert MessageProxyForSchainGenerator().bytecode == first.bytecode
+
+
+def check_artifact_pack():
+    with tempfile.TemporaryDirectory() as packed_dir, tempfile.TemporaryDirectory() as plain_dir:
+        for filename in os.listdir(artifact_registry.ARTIFACTS_DIR):
+            if filename.endswith('.json'):
+                shutil.copy(os.path.join(artifact_registry.ARTIFACTS_DIR, filename), packed_dir)
+                shutil.copy(os.path.join(artifact_registry.ARTIFACTS_DIR, filename), plain_dir)
+        artifact_registry.write_artifact_pack(packed_dir)
+        for meta_filename in ['MessageProxyForSchain.meta.json', None]:
+            packed = artifact_registry.get_artifact('MessageProxyForSchain.json', meta_filename, packed_dir)
+            plain = artifact_registry.get_artifact('MessageProxyForSchain.json', meta_filename, plain_dir)
+            assert (packed.bytecode, packed.abi, packed.meta, packed.digest) == \
+                (plain.bytecode, plain.abi, plain.meta, plain.digest)
+        # clear() unmaps the pack, artifacts returned before map it again
+        packed = artifact_registry.get_artifact('KeyStorage.json', 'KeyStorage.meta.json', packed_dir)
+        artifact_registry.clear()
+        plain = artifact_registry.get_artifact('KeyStorage.json', 'KeyStorage.meta.json', plain_dir)
+        assert (packed.abi, packed.meta) == (plain.abi, plain.meta)
+        # without the pack they are read from the JSON artifacts
+        packed = artifact_registry.get_artifact('CommunityLocker.json', 'CommunityLocker.meta.json', packed_dir)
+        artifact_registry.clear()
+        os.remove(os.path.join(packed_dir, artifact_registry.PACK_FILENAME))
+        plain = artifact_registry.get_artifact('CommunityLocker.json', 'CommunityLocker.meta.json', plain_dir)
+        assert (packed.abi, packed.meta) == (plain.abi, plain.meta)
+        artifact_registry.clear()
+
+
+def check_pack():
+    with tempfile.TemporaryDirectory() as directory:
+        path = f'{directory}/test.pack'
+        entries = [('empty', b''), ('one', b'1'), ('long', b'x' * 100000)]
+        write_pack(path, entries, {'version': 'test'})
+        with PackReader(path) as pack:
+            assert pack.meta == {'version': 'test'}
+            assert list(pack) == [name for name, _ in entries]
+            for name, content in entries:
+                assert pack.read(name) == content
+            assert 'other' not in pack
+        with open(path, 'r+b') as pack_file:
+            pack_file.truncate(1000)
+        for damaged_content in [None, b'not a pack']:
+            if damaged_content is not None:
+                with open(path, 'wb') as pack_file:
+                    pack_file.write(damaged_content)
+            try:
+                PackReader(path)
+                raise AssertionError('Damaged pack is read')
+            except PackError:
+                pass
+
+
+def check_abi_bundle():
+    expected = generate_abi()
+    with tempfile.TemporaryDirectory() as directory:
+        path = f'{directory}/abi.pack'
+        write_abi_bundle(path)
+        for key, value in expected.items():
+            if key.endswith('_abi'):
+                assert abi_bundle.load_abi(key[:-len('_abi')], path) == value
+        assert abi_bundle.load_abi('unknown', path) is None
+        abi_bundle.close()
+        assert abi_bundle.load_abi('key_storage', path) == expected['key_storage_abi']
+        # decoded ABIs are not shared between calls
+        abi_bundle.load_abi('key_storage', path).clear()
+        assert abi_bundle.load_abi('key_storage', path) == expected['key_storage_abi']
+        abi_bundle.close()
+    assert get_abi('message_proxy_chain') == expected['message_proxy_chain_abi']
+    get_abi('message_proxy_chain')[0]['name'] = 'modified'
+    generate_abi()['key_storage_abi'].clear()
+    assert generate_abi() == expected
+    try:
+        get_abi('unknown')
+        raise AssertionError('ABI of unknown contract is returned')
+    except KeyError:
+        pass
+
+
+def check_slots():
+    role = Web3.solidity_keccak(['string'], ['CHAIN_CONNECTOR_ROLE'])
+    account = '0xd2001DAb6898127Be2F167B548691C87251D13C3'
+    slots.cache_clear()
+    for _ in range(2):
+        assert slots.calculate_mapping_value_slot(101, role, 'bytes32') == \
+            int.from_bytes(Web3.solidity_keccak(['bytes32', 'uint256'], [role, 101]), 'big')
+        assert slots.calculate_mapping_value_slot(101, account, 'address') == \
+            int.from_bytes(Web3.solidity_keccak(['bytes32', 'uint256'], [int(account, 16).to_bytes(32, 'big'), 101]), 'big')
+        assert slots.calculate_mapping_value_slot(152, 7, 'uint256') == \
+            int.from_bytes(Web3.solidity_keccak(['uint256', 'uint256'], [7, 152]), 'big')
+        assert slots.array_value_slot(209, 3) == int.from_bytes(Web3.solidity_keccak(['uint256'], [209]), 'big') + 3
+    cache_info = slots.cache_info()
+    assert cache_info.misses == 4
+    assert cache_info.hits == 4
+    # slot of CHAIN_CONNECTOR_ROLE in _roles is precomputed
+    assert cache_info.keccak_calls == 3
+    # short bytes32 keys give the same slots as in predeployed_generator
+    assert slots.calculate_mapping_value_slot(101, b'role', 'bytes32') == \
+        OpenzeppelinAccessControlEnumerableGenerator.calculate_mapping_value_slot(101, b'role', 'bytes32')
+
+
+def check_storage_layout():
+    for (slot, key), value_slot in storage_layout.MAPPING_VALUE_SLOTS.items():
+        assert value_slot == int.from_bytes(Web3.solidity_keccak(['bytes32', 'uint256'], [key, slot]), 'big')
+    for slot, data_slot in storage_layout.ARRAY_DATA_SLOTS.items():
+        assert data_slot == int.from_bytes(Web3.solidity_keccak(['uint256'], [slot]), 'big')
+    assert MessageProxyForSchainGenerator.VERSION_SLOT == 210
+
+
+def check_storage_builder():
+    builder = StorageBuilder()
+    expected = {}
+    writes = [
+        ('_write_uint256', 0, 1),
+        ('_write_uint256', 0x123, 0),
+        ('_write_uint256', 2 ** 256 - 1, 0x1234),
+        ('_write_uint256', 5, 2 ** 256 - 1),
+        ('_write_address', 7, '0xd2001DAb6898127Be2F167B548691C87251D13C3'),
+        ('_write_address', 8, '0x0000000000000000000000000000000000000001'),
+        ('_write_bytes32', 9, bytes(31) + b'\x01'),
+        ('_write_bytes32', 10, b'\x00\x01\x02'),
+        ('_write_bytes32', 11, b''),
+        ('_write_uint256', 0x123, 5)
+    ]
+    # records span several chunks
+    writes += [('_write_uint256', 0x1000 + index, index) for index in range(1000)]
+    for writer, slot, value in writes:
+        getattr(MessageProxyForSchainGenerator, writer)(builder, slot, value)
+        getattr(OpenzeppelinAccessControlEnumerableGenerator, writer)(expected, slot, value)
+    for value in ['', 'a' * 31, 'a' * 32, 'a' * 100]:
+        MessageProxyForSchainGenerator._write_string(builder, 0x100, value)
+        OpenzeppelinAccessControlEnumerableGenerator._write_string(expected, 0x100, value)
+    assert len(builder) > len(writes)
+    assert list(builder.emit({'0x00': '0x02', '0x01': '0x03'}).items()) == \
+        list({'0x00': '0x02', '0x01': '0x03', **expected}.items())
+    assert len(builder) == 0
+    assert not builder.emit()
+
+
+def check_role_members(owner_address, schain_name, contracts_on_mainnet):
+    roles_slots = MessageProxyForSchainGenerator.RolesSlots(roles=101, role_members=151)
+    for members in [0, 1, slots.MAX_CACHED_BATCH + 1]:
+        accounts = [f'0x{index + 1:040X}' for index in range(members)]
+        storage = StorageBuilder()
+        expected = {}
+        MessageProxyForSchainGenerator._setup_role(storage, roles_slots, constants.CHAIN_CONNECTOR_ROLE, accounts)
+        OpenzeppelinAccessControlEnumerableGenerator._setup_role(
+            expected, roles_slots, constants.CHAIN_CONNECTOR_ROLE, accounts)
+        assert list(storage.emit().items()) == list(expected.items())
+
+    accounts = [f'0x{index + 1:040x}' for index in range(100)]
+    role_members = {
+        'message_proxy_for_schain': {
+            'DEFAULT_ADMIN_ROLE': [owner_address, accounts[0]],
+            'EXTRA_CONTRACT_REGISTRAR_ROLE': accounts
+        },
+        'token_manager_linker': {'REGISTRAR_ROLE': accounts[:3]},
+        'token_manager_erc20': {'TOKEN_REGISTRAR_ROLE': accounts, 'AUTOMATIC_DEPLOY_ROLE': accounts[:1]}
+    }
+    allocations = generate_contracts(owner_address, schain_name, contracts_on_mainnet, role_members=role_members)
+    verify_contracts(allocations, owner_address, schain_name, contracts_on_mainnet, role_members=role_members)
+    try:
+        verify_contracts(allocations, owner_address, schain_name, contracts_on_mainnet)
+        raise AssertionError('Additional role members are not detected')
+    except VerificationError:
+        pass
+    for wrong_role_members in [
+            {'key_storage': {'DEFAULT_ADMIN_ROLE': accounts}},
+            {'token_manager_erc20': {'MINTER_ROLE': accounts}},
+            {'proxy_admin': {'DEFAULT_ADMIN_ROLE': accounts}}]:
+        try:
+            generate_contracts(owner_address, schain_name, contracts_on_mainnet, role_members=wrong_role_members)
+            raise AssertionError(f'{wrong_role_members} are accepted')
+        except ValueError:
+            pass
+
+
+def check_genesis_writer():
+    base_genesis = json.dumps({
+        'config': {'alloc': {}},
+        'alloc': {
+            '0x0000000000000000000000000000000000000001': {'balance': '0x1'},
+            '0x0000000000000000000000000000000000000002': {'balance': '0x2', 'storage': {'0x0': '0x1'}}
+        }
+    }, indent=2)
+    allocations = {
+        '0x0000000000000000000000000000000000000002': {'balance': '0x3'},
+        '0x0000000000000000000000000000000000000003': {'code': '0x00', 'storage': {'0x0': '0x2'}}
+    }
+    expected = json.loads(base_genesis)
+    expected['alloc'].update(allocations)
+    for compact in [False, True]:
+        for chunk_size in [1, 5, 1 << 16]:
+            output = io.StringIO()
+            write_genesis(io.StringIO(base_genesis), output, allocations, compact=compact, chunk_size=chunk_size)
+            assert json.loads(output.getvalue()) == expected
+            assert compact != ('\n' in output.getvalue())
+
+    # numbers are not cut at the end of a small chunk
+    base_genesis = json.dumps({
+        'alloc': {
+            '0x0000000000000000000000000000000000000001': {'balance': '0x1'},
+            'float': -25000000000.0,
+            'exponent': 1e+100,
+            'small': 1.5e-07,
+            'integer': -12345678901234567890,
+            'literal': True
+        },
+        'numbers': [-25000000000.0, 1e+100, 0.5, None]
+    }, indent=4)
+    expected = json.loads(base_genesis)
+    expected['alloc'].update(allocations)
+    for compact in [False, True]:
+        for chunk_size in range(1, 70):
+            output = io.StringIO()
+            write_genesis(io.StringIO(base_genesis), output, allocations, compact=compact, chunk_size=chunk_size)
+            assert json.loads(output.getvalue()) == expected
+
+
+def check_allocation_cache():
+    owner_address = '0xd2001DAb6898127Be2F167B548691C87251D13C3'
+    contracts_on_mainnet = {
+        'deposit_box_eth_address': '0x' + '1' * 40,
+        'deposit_box_erc20_address': '0x' + '2' * 40,
+        'deposit_box_erc721_address': '0x' + '3' * 40,
+        'deposit_box_erc1155_address': '0x' + '4' * 40,
+        'linker_address': '0x' + '5' * 40,
+        'community_pool_address': '0x' + '6' * 40,
+        'deposit_box_erc721_with_metadata_address': '0x' + '7' * 40
+    }
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = AllocationCache(cache_dir)
+        expected = generate_contracts(owner_address, 'cache', contracts_on_mainnet)
+        assert generate_contracts(owner_address, 'cache', contracts_on_mainnet, cache=cache) == expected
+        assert len(cache.recomputed) == 11
+        assert generate_contracts(owner_address, 'cache', contracts_on_mainnet, cache=cache) == expected
+        assert cache.recomputed == []
+        contracts_on_mainnet['deposit_box_erc20_address'] = '0x' + '8' * 40
+        assert generate_contracts(owner_address, 'cache', contracts_on_mainnet, cache=cache) == \
+            generate_contracts(owner_address, 'cache', contracts_on_mainnet)
+        assert cache.recomputed == ['token_manager_erc20']
+
+
+def check_concurrent_generation(owner_address, schain_name, contracts_on_mainnet):
+    expected = generate_contracts(owner_address, schain_name, contracts_on_mainnet)
+    for executor_class in [ThreadPoolExecutor, ProcessPoolExecutor]:
+        with executor_class(max_workers=4) as executor, tempfile.TemporaryDirectory() as cache_dir:
+            allocations = generate_contracts(owner_address, schain_name, contracts_on_mainnet, executor=executor)
+            assert allocations == expected
+            assert list(allocations) == list(expected)
+            cache = AllocationCache(cache_dir)
+            assert generate_contracts(
+                owner_address, schain_name, contracts_on_mainnet, cache=cache, executor=executor) == expected
+            assert len(cache.recomputed) == 11
+            assert generate_contracts(
+                owner_address, schain_name, contracts_on_mainnet, cache=cache, executor=executor) == expected
+            assert cache.recomputed == []
+
+    balances = [(f'0x{index:040x}', index) for index in range(1, 10)]
+    expected = generate_contracts(owner_address, schain_name, contracts_on_mainnet, eth_balances=balances)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        assert generate_contracts(
+            owner_address, schain_name, contracts_on_mainnet, executor=executor, eth_balances=iter(balances)) == expected
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        assert generate_contracts(
+            owner_address, schain_name, contracts_on_mainnet, executor=executor, eth_balances=balances) == expected
+        try:
+            generate_contracts(
+                owner_address, schain_name, contracts_on_mainnet, executor=executor, eth_balances=iter(balances))
+            raise AssertionError('Iterator is sent to worker processes')
+        except ValueError:
+            pass
+
+
+def check_generate_contracts_many(owner_address, schain_name, contracts_on_mainnet):
+    schain_configs = [
+        {'owner_address': owner_address, 'schain_name': f'{schain_name}-{index}',
+         'contracts_on_mainnet': contracts_on_mainnet}
+        for index in range(6)
+    ]
+    schain_configs[1]['peer_schains'] = [schain_configs[2]['schain_name']]
+    schain_configs[2]['eth_balances'] = [(f'0x{index:040x}', index) for index in range(1, 10)]
+    schain_configs[3]['role_members'] = {'message_proxy_for_schain': {'CONSTANT_SETTER_ROLE': [owner_address]}}
+    expected = [generate_contracts(**schain_config) for schain_config in schain_configs]
+    for workers in [1, 3]:
+        allocations = list(generate_contracts_many(schain_configs, workers))
+        assert allocations == expected
+        assert [list(allocation) for allocation in allocations] == [list(allocation) for allocation in expected]
+
+    streamed_config = {**schain_configs[2], 'eth_balances': iter(schain_configs[2]['eth_balances'])}
+    assert list(generate_contracts_many([streamed_config])) == [expected[2]]
+    wrong_configs = [
+        {**schain_configs[0], 'cache': None},
+        {**schain_configs[0], 'stats': GenerationStats()},
+        {key: value for key, value in schain_configs[0].items() if key != 'schain_name'}
+    ]
+    for wrong_config, workers in [(config, 1) for config in wrong_configs] + [(streamed_config, 2)]:
+        try:
+            list(generate_contracts_many([wrong_config], workers))
+            raise AssertionError(f'{sorted(wrong_config)} is accepted')
+        except ValueError:
+            pass
+
+
+def check_cli(config):
+    configs = io.StringIO(''.join(
+        json.dumps({**config, 'schain_name': f'cli-{index}'}) + '\n' + '\n' * (index % 2) for index in range(3)))
+    output = io.StringIO()
+    progress = io.StringIO()
+    assert generate_allocations(read_configs(configs), output, progress=progress) == 3
+    lines = output.getvalue().splitlines()
+    assert len(lines) == 3
+    for index, line in enumerate(lines):
+        arguments = schain_config_to_arguments({**config, 'schain_name': f'cli-{index}'})
+        assert json.loads(line) == generate_contracts(**arguments)
+    assert progress.getvalue().split('\r')[-1].startswith('3 schains generated')
+    try:
+        list(read_configs(io.StringIO('{"schain_name": "cli"}\n')))
+        raise AssertionError('Wrong config is accepted')
+    except ValueError:
+        pass
+
+
+def check_bundle(config):
+    configs = [
+        {**config, 'schain_name': f'bundle-{index}', 'schain_owner': f'0x{index + 1:040x}'} for index in range(4)]
+    configs.append({**configs[0], 'schain_name': 'bundle-roles', 'role_members': {
+        'message_proxy_for_schain': {'EXTRA_CONTRACT_REGISTRAR_ROLE': [f'0x{index + 0x100:040x}' for index in range(5)]}
+    }})
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'allocations.pack')
+        assert generate_bundle(map(schain_config_to_arguments, configs), path) == len(configs)
+        with BundleReader(path) as bundle:
+            assert bundle.schain_names() == [schain_config['schain_name'] for schain_config in configs]
+            for schain_config in configs:
+                allocations = generate_contracts(**schain_config_to_arguments(schain_config))
+                # order of accounts and slots is restored too
+                assert json.dumps(bundle.read_allocations(schain_config['schain_name'])) == json.dumps(allocations)
+            assert 'bundle-unknown' not in bundle
+        with PackReader(path) as pack:
+            blobs = [name for name in pack if name.startswith('blob:')]
+        # code and shared storage are stored once, only few fragments are schain specific
+        assert len(blobs) < 3 * len(generate_contracts(**schain_config_to_arguments(configs[0]))) + 5 * len(configs)
+
+
+def check_profiling(owner_address, schain_name, contracts_on_mainnet):
+    stats = GenerationStats()
+    allocations = generate_contracts(owner_address, schain_name, contracts_on_mainnet, stats=stats)
+    assert allocations == generate_contracts(owner_address, schain_name, contracts_on_mainnet)
+    total = stats.total('contracts')
+    assert total.calls == 11
+    assert total.slots_written == sum(len(account.get('storage', {})) for account in allocations.values())
+    assert total.code_bytes == sum((len(account['code']) - 2) // 2 for account in allocations.values())
+    assert total.keccak_calls >= 0 and total.seconds > 0
+    with ThreadPoolExecutor(2) as executor:
+        generate_contracts(owner_address, schain_name, contracts_on_mainnet, executor=executor, stats=stats)
+    assert stats.total('contracts').calls == 22
+    assert stats.total('contracts').slots_written == 2 * total.slots_written
+    generate_abi(stats)
+    generate_meta(stats)
+    exported = json.loads(stats.to_json())
+    assert set(exported) == {'setup', 'contracts', 'abi', 'meta'}
+    assert exported['contracts']['contracts']['message_proxy_for_schain']['calls'] == 2
+    assert exported['abi']['total']['calls'] == 14
+    assert len(exported['meta']['contracts']) == len(generate_meta())
+
+
+def check_template(config):
+    template = AllocationTemplate.compile()
+    configs = [
+        {**config, 'schain_name': f'template-{index}', 'schain_owner': f'0x{index * 0x1111 + 1:040X}'}
+        for index in range(3)]
+    for schain_config in configs:
+        arguments = schain_config_to_arguments(schain_config)
+        expected = generate_contracts(**arguments)
+        assert template.render(**arguments) == json.dumps(expected, separators=(',', ':'))
+        assert template.render_allocations(**arguments) == expected
+    # schains with role_members are generated by workers between rendered ones
+    configs.insert(1, {**config, 'schain_name': 'template-roles', 'role_members': {
+        'token_manager_linker': {'REGISTRAR_ROLE': ['0x' + 'ab' * 20]}
+    }})
+    arguments = [schain_config_to_arguments(schain_config) for schain_config in configs]
+    arguments.append({**arguments[0], 'schain_name': 'template-empty', 'peer_schains': []})
+    expected = [generate_contracts(**schain_arguments) for schain_arguments in arguments]
+    for workers in [1, 2]:
+        output = io.StringIO()
+        assert generate_allocations(iter(arguments), output, workers, template=template) == len(arguments)
+        assert [json.loads(line) for line in output.getvalue().splitlines()] == expected
+    try:
+        template.render(**schain_config_to_arguments({**config, 'schain_owner': '0x1234'}))
+        raise AssertionError('Wrong address is accepted')
+    except ValueError:
+        pass
+
+
+def check_diff(owner_address, schain_name, contracts_on_mainnet):
+    old = generate_contracts(owner_address, schain_name, contracts_on_mainnet)
+    assert not diff_allocations(old, json.loads(json.dumps(old)))
+
+    new = generate_contracts(owner_address, schain_name + '-new', contracts_on_mainnet)
+    new[PROXY_ADMIN_ADDRESS]['balance'] = '0x10'
+    new[PROXY_ADMIN_ADDRESS.lower()] = new.pop(PROXY_ADMIN_ADDRESS)
+    new['0x' + '1' * 40] = {'code': '0x00', 'balance': '0x0', 'nonce': '0x0', 'storage': {'0x1': '0x1'}}
+    removed = old[ETH_ERC20_ADDRESS]
+    del new[ETH_ERC20_ADDRESS]
+    storage = new[COMMUNITY_LOCKER_ADDRESS]['storage']
+    storage['0x00'] = '0x0001'  # the same value in another format
+    storage['0xcd'] = '0x1'
+    diffs = {account_diff.address.lower(): account_diff for account_diff in diff_allocations(old, new)}
+
+    assert diffs[PROXY_ADMIN_ADDRESS.lower()].balance == ('0x0', '0x10')
+    assert not diffs[PROXY_ADMIN_ADDRESS.lower()].storage
+    assert diffs['0x' + '1' * 40].status == ADDED
+    assert diffs[ETH_ERC20_ADDRESS.lower()].status == REMOVED
+    assert len(diffs[ETH_ERC20_ADDRESS.lower()].storage) == len(removed['storage'])
+    assert diffs[ETH_ERC20_ADDRESS.lower()].code_hash[1] is None
+    locker = diffs[COMMUNITY_LOCKER_ADDRESS.lower()]
+    assert locker.status == CHANGED and locker.code_hash is None
+    changes = {change.label: change for change in locker.storage}
+    assert set(changes) == {'schainHash', '_deprecatedTimeLimitPerMessage'}
+    assert changes['_deprecatedTimeLimitPerMessage'].old is None
+    assert [change.slot for change in locker.storage] == sorted(change.slot for change in locker.storage)
+    assert diffs[MESSAGE_PROXY_FOR_SCHAIN_ADDRESS.lower()].storage[0].label == 'schainHash'
+    assert any('(schainHash)' in line for line in format_diff(list(diffs.values())))
+    json.dumps([account_diff.to_dict() for account_diff in diffs.values()])
+
+    storage['0x0cd'] = '0x2'
+    try:
+        diff_allocations(old, new)
+        raise AssertionError('Storage with several keys of one slot is compared')
+    except ValueError:
+        pass
+
+
+def check_eth_balances(config):
+    holders = ['0x' + f'{index:040x}' for index in range(1, 101)]
+    balances = [(holder, index * 10 ** 18) for index, holder in enumerate(holders)]
+    generator = EthErc20Generator
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, 'balances.csv')
+        with open(csv_path, 'w', encoding='utf-8') as csv_file:
+            csv_file.write('address,balance\n')
+            csv_file.writelines(f'{holder},{amount}\n' for holder, amount in balances)
+        jsonl_path = os.path.join(directory, 'balances.jsonl')
+        with open(jsonl_path, 'w', encoding='utf-8') as jsonl_file:
+            jsonl_file.writelines(
+                json.dumps({'address': holder, 'balance': hex(amount)}) + '\n' for holder, amount in balances)
+        assert list(BalancesSnapshot(csv_path)) == balances
+        assert list(BalancesSnapshot(jsonl_path)) == balances
+
+        arguments = schain_config_to_arguments({**config, 'eth_balances_snapshot': csv_path})
+        allocations = generate_contracts(**arguments)
+        storage = allocations[ETH_ERC20_ADDRESS]['storage']
+        values = {int(slot, 16): int(value, 16) for slot, value in storage.items()}
+        for holder, amount in balances[1:]:
+            slot = Web3.solidity_keccak(['uint256', 'uint256'], [int(holder, 16), generator.BALANCES_SLOT])
+            assert values[int.from_bytes(slot, 'big')] == amount
+        # the zero balance is not written, _totalSupply is
+        plain_storage = generate_contracts(**schain_config_to_arguments(config))[ETH_ERC20_ADDRESS]['storage']
+        assert len(storage) == len(plain_storage) + len(balances)
+        assert values[generator.TOTAL_SUPPLY_SLOT] == sum(amount for _, amount in balances)
+        verify_contracts(allocations, **arguments)
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            assert generate_contracts(**arguments, executor=executor) == allocations
+        assert generate_contracts(**{**arguments, 'eth_balances': BalancesSnapshot(jsonl_path)}) == allocations
+        try:
+            verify_contracts(allocations, **{**arguments, 'eth_balances': balances[:-1]})
+            raise AssertionError('Wrong total supply is not detected')
+        except VerificationError:
+            pass
+
+        for rows in (['0x' + '1' * 40 + ',1', '0x' + '1' * 40 + ',2'], ['0x1,1'], ['0x' + '1' * 40 + ',-1']):
+            with open(csv_path, 'w', encoding='utf-8') as csv_file:
+                csv_file.write('\n'.join(rows) + '\n')
+            try:
+                generate_contracts(**arguments)
+                raise AssertionError(f'Invalid snapshot {rows} is not detected')
+            except ValueError:
+                pass
+
+    # holders are checked across batches, batches of zero balances do not stop minting
+    zero_batch = [(holder, 0) for holder in holders[:1]] * generator.BALANCES_BATCH_SIZE
+    arguments = schain_config_to_arguments(config)
+    storage = generate_contracts(**arguments, eth_balances=zero_batch + balances[1:2])[ETH_ERC20_ADDRESS]['storage']
+    values = {int(slot, 16): int(value, 16) for slot, value in storage.items()}
+    assert values[generator.TOTAL_SUPPLY_SLOT] == balances[1][1]
+    try:
+        generate_contracts(**arguments, eth_balances=balances[1:2] + zero_batch + balances[1:2])
+        raise AssertionError('Holder repeated in another batch is not detected')
+    except ValueError:
+        pass
+
+
+def check_token_clones(owner_address, schain_name, contracts_on_mainnet):
+    tokens = [f'0x{index:040x}' for index in range(1, 201)]
+    clones = [f'0x{index:040X}' for index in range(1001, 1201)]
+    token_clones = {
+        'token_manager_erc20': list(zip(tokens, clones)),
+        'token_manager_erc1155': [(tokens[0], clones[0])]
+    }
+    allocations = generate_contracts(owner_address, schain_name, contracts_on_mainnet, token_clones=token_clones)
+    storage = allocations[TOKEN_MANAGER_ERC20_ADDRESS]['storage']
+    values = {int(slot, 16): int(value, 16) for slot, value in storage.items()}
+    mainnet_clones_slot = Web3.solidity_keccak(['bytes32', 'uint256'], [constants.MAINNET_HASH, 210])
+    for token, clone in zip(tokens, clones):
+        clone_slot = Web3.solidity_keccak(['uint256', 'bytes32'], [int(token, 16), mainnet_clones_slot])
+        assert values[int.from_bytes(clone_slot, 'big')] == int(clone, 16)
+        added_clone_slot = Web3.solidity_keccak(['uint256', 'uint256'], [int(clone, 16), 209])
+        assert values[int.from_bytes(added_clone_slot, 'big')] == 1
+    erc1155_storage = allocations[TOKEN_MANAGER_ERC1155_ADDRESS]['storage']
+    erc721_storage = allocations[TOKEN_MANAGER_ERC721_ADDRESS]['storage']
+    assert len(erc1155_storage) == len(erc721_storage) + 2
+    verify_contracts(allocations, owner_address, schain_name, contracts_on_mainnet, token_clones=token_clones)
+    try:
+        verify_contracts(allocations, owner_address, schain_name, contracts_on_mainnet)
+        raise AssertionError('Clones of tokens are not detected')
+    except VerificationError:
+        pass
+    for wrong_token_clones in [
+            {'token_manager_eth': [(tokens[0], clones[0])]},
+            {'token_manager_erc721': [(tokens[0], clones[0]), (tokens[0], clones[1])]},
+            {'token_manager_erc721': [(tokens[0], clones[0]), (tokens[1], clones[0])]},
+            {'token_manager_erc721': [(tokens[0], '0x' + '0' * 40)]}]:
+        try:
+            generate_contracts(owner_address, schain_name, contracts_on_mainnet, token_clones=wrong_token_clones)
+            raise AssertionError(f'{wrong_token_clones} are accepted')
+        except ValueError:
+            pass
+
+
+def check_peer_schains(owner_address, schain_name, contracts_on_mainnet):
+    peer_schains = [f'peer-schain-{index}' for index in range(50)]
+    allocations = generate_contracts(owner_address, schain_name, contracts_on_mainnet, peer_schains=peer_schains)
+    message_proxy = {
+        int(slot, 16): int(value, 16)
+        for slot, value in allocations[MESSAGE_PROXY_FOR_SCHAIN_ADDRESS]['storage'].items()}
+    token_manager = {
+        int(slot, 16): int(value, 16)
+        for slot, value in allocations[TOKEN_MANAGER_ERC20_ADDRESS]['storage'].items()}
+    for peer_schain in peer_schains:
+        peer_hash = Web3.solidity_keccak(['string'], [peer_schain])
+        connected_chain_info_slot = Web3.solidity_keccak(['bytes32', 'uint256'], [peer_hash, 201])
+        assert message_proxy[int.from_bytes(connected_chain_info_slot, 'big') + 2] == 1
+        token_manager_slot = Web3.solidity_keccak(['bytes32', 'uint256'], [peer_hash, 206])
+        assert token_manager[int.from_bytes(token_manager_slot, 'big')] == int(TOKEN_MANAGER_ERC20_ADDRESS, 16)
+    verify_contracts(allocations, owner_address, schain_name, contracts_on_mainnet, peer_schains=peer_schains)
+    try:
+        verify_contracts(allocations, owner_address, schain_name, contracts_on_mainnet, peer_schains=peer_schains[1:])
+        raise AssertionError('Additional connected schain is not detected')
+    except VerificationError:
+        pass
+    for wrong_peer_schains in [[schain_name], ['Mainnet'], peer_schains + peer_schains[:1]]:
+        try:
+            generate_contracts(owner_address, schain_name, contracts_on_mainnet, peer_schains=wrong_peer_schains)
+            raise AssertionError(f'{wrong_peer_schains} are accepted')
+        except ValueError:
+            pass
+
+
+def check_active_users(config):
+    users = [f'0x{index:040x}' for index in range(1, 10001)]
+    time_limits = {'Mainnet': 60, 'peer-schain': 10}
+    with tempfile.TemporaryDirectory() as directory:
+        users_path = os.path.join(directory, 'users.csv')
+        with open(users_path, 'w', encoding='utf-8') as users_file:
+            users_file.write('address\n')
+            users_file.writelines(f'{user}\n' for user in users + users[:1])
+        assert list(AddressesSnapshot(users_path)) == users + users[:1]
+
+        arguments = schain_config_to_arguments({
+            **config, 'active_users_snapshot': users_path, 'time_limits_per_message': time_limits})
+        allocations = generate_contracts(**arguments)
+        storage = allocations[COMMUNITY_LOCKER_ADDRESS]['storage']
+        values = {int(slot, 16): int(value, 16) for slot, value in storage.items()}
+        for user in users:
+            active_user_slot = Web3.solidity_keccak(['uint256', 'uint256'], [int(user, 16), 206])
+            assert values[int.from_bytes(active_user_slot, 'big')] == 1
+        for chain_name, time_limit in time_limits.items():
+            time_limit_slot = Web3.solidity_keccak(
+                ['bytes32', 'uint256'], [Web3.solidity_keccak(['string'], [chain_name]), 210])
+            assert values[int.from_bytes(time_limit_slot, 'big')] == time_limit
+        plain_storage = generate_contracts(**schain_config_to_arguments(config))[COMMUNITY_LOCKER_ADDRESS]['storage']
+        assert len(storage) == len(plain_storage) + len(users) + 1
+        verify_contracts(allocations, **arguments)
+        try:
+            verify_contracts(allocations, **{**arguments, 'time_limits_per_message': {'peer-schain': 10}})
+            raise AssertionError('Wrong time limit of Mainnet is not detected')
+        except VerificationError:
+            pass
+
+        with open(users_path, 'w', encoding='utf-8') as users_file:
+            users_file.write(users[0] + '\n0x1234\n')
+        wrong_time_limits = [{'a': -1}, {'a': True}, {'Mainnet': 1.5}]
+        for wrong_arguments in [arguments] + [
+                {**arguments, 'active_users': None, 'time_limits_per_message': time_limits}
+                for time_limits in wrong_time_limits]:
+            try:
+                generate_contracts(**wrong_arguments)
+                raise AssertionError(f'{wrong_arguments} are accepted')
+            except ValueError:
+                pass
+
+
+def check_extra_contracts(owner_address, schain_name, contracts_on_mainnet):
+    contracts = [f'0x{index:040x}' for index in range(1, 3001)]
+    other_hash = '0x' + bytes(Web3.solidity_keccak(['string'], ['other-schain'])).hex()
+    extra_contracts = {
+        'ANY_SCHAIN': contracts[:1000],
+        'peer-schain': contracts[1000:2000],
+        other_hash: contracts[2000:]
+    }
+    allocations = generate_contracts(
+        owner_address, schain_name, contracts_on_mainnet, extra_contracts=extra_contracts)
+    values = {
+        int(slot, 16): int(value, 16)
+        for slot, value in allocations[MESSAGE_PROXY_FOR_SCHAIN_ADDRESS]['storage'].items()}
+    any_schain_set = int.from_bytes(Web3.solidity_keccak(['bytes32', 'uint256'], [bytes(32), 209]), 'big')
+    any_schain_data = int.from_bytes(Web3.solidity_keccak(['uint256'], [any_schain_set]), 'big')
+    assert values[any_schain_set] == 1006
+    assert values[any_schain_data + 6] == int(contracts[0], 16)
+    index_slot = Web3.solidity_keccak(['uint256', 'uint256'], [int(contracts[999], 16), any_schain_set + 1])
+    assert values[int.from_bytes(index_slot, 'big')] == 1006
+    peer_set = int.from_bytes(Web3.solidity_keccak(
+        ['bytes32', 'uint256'], [Web3.solidity_keccak(['string'], ['peer-schain']), 209]), 'big')
+    assert values[peer_set] == 1000
+    verify_contracts(allocations, owner_address, schain_name, contracts_on_mainnet, extra_contracts=extra_contracts)
+    try:
+        verify_contracts(allocations, owner_address, schain_name, contracts_on_mainnet)
+        raise AssertionError('Extra contracts are not detected')
+    except VerificationError:
+        pass
+    for wrong_extra_contracts in [
+            {'ANY_SCHAIN': [TOKEN_MANAGER_ERC20_ADDRESS]},
+            {'ANY_SCHAIN': contracts[:1], 'peer-schain': contracts[:1]},
+            {'peer-schain': contracts[:1] + contracts[:1]},
+            {schain_name: contracts[:1]}]:
+        try:
+            generate_contracts(
+                owner_address, schain_name, contracts_on_mainnet, extra_contracts=wrong_extra_contracts)
+            raise AssertionError(f'{wrong_extra_contracts} are accepted')
+        except ValueError:
+            pass
+
+
+def check_storage_verifier(owner_address, schain_name, contracts_on_mainnet):
+    allocations = generate_contracts(owner_address, schain_name, contracts_on_mainnet)
+    verify_contracts(allocations, owner_address, schain_name, contracts_on_mainnet)
+    try:
+        verify_contracts(allocations, owner_address, schain_name + '-other', contracts_on_mainnet)
+        raise AssertionError('Wrong schain name is not detected')
+    except VerificationError:
+        pass
+    allocations[COMMUNITY_LOCKER_ADDRESS]['storage']['0x1'] = '0x1'
+    try:
+        verify_contracts(allocations, owner_address, schain_name, contracts_on_mainnet)
+        raise AssertionError('Unexpected slot is not detected')
+    except VerificationError:
+        pass
@@ -1,21 +1,95 @@
-import json
-import os
-from web3 import Web3
+from concurrent.futures import ThreadPoolExecutor
 from time import sleep
+from typing import Any, Callable, List, NamedTuple, Optional
+
+from web3 import Web3
+
+from ima_predeployed.artifact_registry import get_artifact
+
+# calls per one JSON-RPC batch request
+BATCH_SIZE = 64
+# batch requests sent concurrently
+WORKERS = 4
 
 w3 = Web3()
 
-wait_connection_seconds = 20
-while not w3.is_connected():
-    if wait_connection_seconds > 0:
-        sleep( 1 )
-        wait_connection_seconds -= 1
-    else:
-        raise ConnectionError("Can't connect to geth")
+
+def connect(endpoint: Optional[str] = None, wait_connection_seconds: int = 20) -> None:
+    if endpoint is not None:
+        w3.provider = Web3.HTTPProvider(endpoint)
+    while not w3.is_connected():
+        if wait_connection_seconds > 0:
+            sleep( 1 )
+            wait_connection_seconds -= 1
+        else:
+            raise ConnectionError("Can't connect to the node")
 
 
 def load_abi(filename: str) -> list:
-    artifacts_dir = os.path.join(os.path.dirname(__file__), '../src/ima_predeployed/artifacts')
-    artifact_path = os.path.join(artifacts_dir, filename)
-    with open(artifact_path) as file:
-        return json.load(file)['abi']
+    return get_artifact(filename).abi
+
+
+class Expectation(NamedTuple):
+    call: Any
+    check: Callable[[Any], bool]
+    description: str
+
+
+class BatchCalls:
+    """Collects contract calls with expected results
+    and sends them in JSON-RPC batch requests.
+
+    Each batch is sent by a separate worker
+    so all checks take a few round trips instead of one per call
+    """
+
+    def __init__(self, batch_size: int = BATCH_SIZE, workers: int = WORKERS):
+        self.batch_size = batch_size
+        self.workers = workers
+        self.expectations: List[Expectation] = []
+
+    def expect(self, call, expected, description: Optional[str] = None) -> None:
+        self.expect_that(call, lambda result: result == expected, description or f'{call} == {expected!r}')
+
+    def expect_that(self, call, check: Callable[[Any], bool], description: Optional[str] = None) -> None:
+        self.expectations.append(Expectation(call, check, description or str(call)))
+
+    def execute(self) -> None:
+        batches = [
+            self.expectations[start:start + self.batch_size]
+            for start in range(0, len(self.expectations), self.batch_size)
+        ]
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            failures = [failure for batch_failures in executor.map(_execute_batch, batches)
+                        for failure in batch_failures]
+        self.expectations = []
+        if failures:
+            raise AssertionError('\n'.join(failures))
+
+
+# private
+
+def _execute_batch(expectations: List[Expectation]) -> List[str]:
+    try:
+        with w3.batch_requests() as batch:
+            for expectation in expectations:
+                batch.add(expectation.call)
+            results = batch.execute()
+    except Exception:  # pylint: disable=broad-except
+        # one failed call fails the whole batch, find it by sending the calls one by one
+        return [failure for expectation in expectations for failure in _execute_one(expectation)]
+    return [
+        f'{expectation.description}: got {result!r}'
+        for expectation, result in zip(expectations, results)
+        if not expectation.check(result)
+    ]
+
+
+def _execute_one(expectation: Expectation) -> List[str]:
+    try:
+        result = expectation.call.call()
+    except Exception as error:  # pylint: disable=broad-except
+        return [f'{expectation.description}: {error}']
+    if not expectation.check(result):
+        return [f'{expectation.description}: got {result!r}']
+    return []